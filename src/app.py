@@ -2,11 +2,23 @@
 OCR盒子应用程序主模块
 """
 import sys
-from PyQt5.QtWidgets import QApplication
-from src.ui.main_window import MainWindow
 
-def run_app():
-    """运行OCR盒子应用程序"""
+def run_app(argv=None):
+    """
+    运行OCR盒子应用程序
+    
+    Args:
+        argv: 命令行参数, 第一个参数为serve时以本地OCR服务模式运行
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "serve":
+        from src.models.ocr_service import main as run_service
+        return run_service(argv[1:])
+
+    # 界面模块会导入pyautogui, 没有显示器时导入即失败, 服务模式不能依赖它们
+    from PyQt5.QtWidgets import QApplication
+    from src.ui.main_window import MainWindow
+
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
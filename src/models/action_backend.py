@@ -0,0 +1,365 @@
+import sys
+import time
+import shutil
+import subprocess
+
+
+# 按键名称到xdotool按键名的映射
+XDOTOOL_KEYS = {
+    "enter": "Return",
+    "return": "Return",
+    "tab": "Tab",
+    "esc": "Escape",
+    "escape": "Escape",
+    "space": "space",
+    "backspace": "BackSpace",
+}
+
+
+class ActionBackend:
+    """
+    模拟输入后端的基类
+
+    子类实现点击、输入文本、按键和等待目标窗口就绪, ActionSequence按顺序调用这些操作。
+    """
+
+    name = "base"
+
+    def click(self, x, y):
+        """在屏幕坐标(x, y)处单击鼠标左键"""
+        raise NotImplementedError
+
+    def type_text(self, text):
+        """直接输入文本(包括中文等非ASCII字符)"""
+        raise NotImplementedError
+
+    def press(self, key):
+        """按下并释放一个按键, 按键名称使用pyautogui的写法, 如enter"""
+        raise NotImplementedError
+
+    def wait_ready(self, timeout):
+        """
+        等待点击后的目标窗口获得焦点
+
+        Args:
+            timeout: 最长等待时间(秒)
+
+        Returns:
+            bool: 超时前是否已就绪
+        """
+        return True
+
+
+class XdotoolBackend(ActionBackend):
+    """
+    基于xdotool(XTest扩展)的Linux输入后端
+
+    文本通过xdotool type直接按Unicode字符输入, 不经过剪贴板; 就绪等待通过轮询
+    当前焦点窗口是否为鼠标下的窗口实现, 窗口一获得焦点就立即返回。
+    """
+
+    name = "xdotool"
+
+    def __init__(self, xdotool_path=None, poll_interval=0.005, max_poll_interval=0.05):
+        """
+        初始化xdotool后端
+
+        Args:
+            xdotool_path: xdotool可执行文件路径, 为None时从PATH中查找
+            poll_interval: 就绪等待的初始轮询间隔(秒)
+            max_poll_interval: 就绪等待的最大轮询间隔(秒), 每次轮询后间隔加倍直到该值
+        """
+        self.xdotool = xdotool_path or shutil.which("xdotool")
+        if not self.xdotool:
+            raise RuntimeError("未找到xdotool")
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+
+    def _run(self, *args):
+        result = subprocess.run(
+            [self.xdotool, *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True
+        )
+        return result.stdout.decode("utf-8", "replace").strip()
+
+    def click(self, x, y):
+        self._run("mousemove", "--sync", str(x), str(y), "click", "1")
+
+    def type_text(self, text):
+        self._run("type", "--clearmodifiers", "--delay", "0", "--", text)
+
+    def press(self, key):
+        self._run("key", "--clearmodifiers", XDOTOOL_KEYS.get(key.lower(), key))
+
+    def wait_ready(self, timeout):
+        # getmouselocation和不带-f的getwindowfocus都从实际窗口向上找到带WM_STATE的客户端窗口,
+        # 两者处在同一层级可以直接比较; getactivewindow返回的是窗口管理器记录的窗口, 与鼠标下的
+        # 窗口层级可能不同, 不能用来比较
+        target = None
+        for line in self._run("getmouselocation", "--shell").splitlines():
+            if line.startswith("WINDOW="):
+                target = line.split("=", 1)[1]
+        if not target:
+            return True
+
+        deadline = time.monotonic() + timeout
+        interval = self.poll_interval
+        while True:
+            try:
+                if self._run("getwindowfocus") == target:
+                    return True
+            except subprocess.CalledProcessError:
+                # 没有焦点窗口时xdotool返回非零, 继续等待
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            # 窗口通常在几毫秒内获得焦点, 之后逐渐放宽间隔, 避免长时间等待时频繁启动xdotool
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, self.max_poll_interval)
+
+
+class PyAutoGUIBackend(ActionBackend):
+    """
+    基于pyautogui的通用输入后端
+
+    ASCII文本直接逐键输入; pyautogui无法直接输入的非ASCII文本退回到剪贴板粘贴,
+    粘贴后恢复原剪贴板内容。就绪等待在能查询窗口的平台上(Windows, 通过pygetwindow)
+    轮询前台窗口, 直到点击位置最上层的窗口成为前台窗口; 其他平台等待固定时间。
+    """
+
+    name = "pyautogui"
+
+    def __init__(self, paste_settle=0.05, settle_delay=0.5, poll_interval=0.01):
+        """
+        初始化pyautogui后端
+
+        Args:
+            paste_settle: 粘贴后等待目标程序读取剪贴板的时间(秒), 仅非ASCII文本使用
+            settle_delay: 无法查询前台窗口时, 点击后等待目标窗口获得焦点的固定时间(秒)
+            poll_interval: 查询前台窗口的轮询间隔(秒)
+        """
+        import pyautogui
+
+        self.pyautogui = pyautogui
+        self.paste_settle = paste_settle
+        self.settle_delay = settle_delay
+        self.poll_interval = poll_interval
+        self._last_click = None
+
+    def click(self, x, y):
+        self.pyautogui.click(x, y, _pause=False)
+        self._last_click = (x, y)
+
+    def type_text(self, text):
+        if text.isascii():
+            self.pyautogui.write(text, _pause=False)
+            return
+        import pyperclip
+
+        original_clipboard = pyperclip.paste()
+        pyperclip.copy(text)
+        try:
+            self.pyautogui.hotkey("command" if sys.platform == "darwin" else "ctrl", "v", _pause=False)
+            time.sleep(self.paste_settle)
+        finally:
+            pyperclip.copy(original_clipboard)
+
+    def press(self, key):
+        self.pyautogui.press(key, _pause=False)
+
+    def _clicked_window_active(self):
+        """
+        点击位置最上层的窗口是否已成为前台窗口
+
+        Returns:
+            bool: 是否已就绪, 无法查询窗口时返回None
+        """
+        get_active = getattr(self.pyautogui, "getActiveWindow", None)
+        get_windows_at = getattr(self.pyautogui, "getWindowsAt", None)
+        if get_active is None or get_windows_at is None or self._last_click is None:
+            return None
+        try:
+            windows = get_windows_at(*self._last_click)
+            active = get_active()
+        except Exception:
+            return None
+        if not windows or active is None:
+            return None
+        return windows[0] == active
+
+    def wait_ready(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            ready = self._clicked_window_active()
+            if ready is None:
+                # 无法查询前台窗口, 等待固定时间
+                time.sleep(max(0.0, min(self.settle_delay, deadline - time.monotonic())))
+                return True
+            if ready:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(self.poll_interval, remaining))
+
+
+class RecordingBackend(ActionBackend):
+    """
+    只记录操作、不产生真实输入的后端, 用于测量动作延迟
+
+    每个操作记录为(时间戳, 操作名, 参数)追加到events中。
+    """
+
+    name = "recording"
+
+    def __init__(self, ready=True, clock=time.perf_counter):
+        """
+        初始化记录后端
+
+        Args:
+            ready: wait_ready的返回值, 用于模拟窗口未能就绪的情况
+            clock: 时间戳函数
+        """
+        self.ready = ready
+        self.clock = clock
+        self.events = []
+
+    def _record(self, action, *args):
+        self.events.append((self.clock(), action, args))
+
+    def click(self, x, y):
+        self._record("click", x, y)
+
+    def type_text(self, text):
+        self._record("type_text", text)
+
+    def press(self, key):
+        self._record("press", key)
+
+    def wait_ready(self, timeout):
+        self._record("wait_ready", timeout)
+        return self.ready
+
+    def actions(self):
+        """不带时间戳的操作列表"""
+        return [(action, args) for _, action, args in self.events]
+
+    def clear(self):
+        self.events = []
+
+
+class ActionStep:
+    """动作序列中的一步"""
+
+    name = "step"
+
+    def run(self, backend):
+        """
+        在后端上执行这一步
+
+        Returns:
+            bool: 是否成功(就绪等待超时时为False)
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(repr(v) for v in vars(self).values())})"
+
+
+class Click(ActionStep):
+    name = "click"
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    def run(self, backend):
+        backend.click(self.x, self.y)
+        return True
+
+
+class TypeText(ActionStep):
+    name = "type_text"
+
+    def __init__(self, text):
+        self.text = text
+
+    def run(self, backend):
+        if self.text:
+            backend.type_text(self.text)
+        return True
+
+
+class PressKey(ActionStep):
+    name = "press"
+
+    def __init__(self, key):
+        self.key = key
+
+    def run(self, backend):
+        backend.press(self.key)
+        return True
+
+
+class WaitReady(ActionStep):
+    name = "wait_ready"
+
+    def __init__(self, timeout=1.0):
+        self.timeout = timeout
+
+    def run(self, backend):
+        return backend.wait_ready(self.timeout)
+
+
+class ActionSequence:
+    """
+    可组合的多步动作, 多个序列可以用+拼接
+    """
+
+    def __init__(self, steps=()):
+        self.steps = list(steps)
+
+    def __add__(self, other):
+        return ActionSequence(self.steps + list(other.steps))
+
+    def __len__(self):
+        return len(self.steps)
+
+    def run(self, backend):
+        """
+        按顺序执行所有步骤
+
+        Args:
+            backend: ActionBackend实例
+
+        Returns:
+            list: 每一步的(步骤名, 是否成功, 耗时(秒))
+        """
+        timings = []
+        for step in self.steps:
+            start = time.perf_counter()
+            ok = step.run(backend)
+            timings.append((step.name, ok, time.perf_counter() - start))
+        return timings
+
+
+def create_backend(name="auto"):
+    """
+    创建输入后端
+
+    Args:
+        name: "auto"、"xdotool"、"pyautogui"或"recording", auto时Linux下优先使用xdotool
+
+    Returns:
+        ActionBackend: 输入后端
+    """
+    if name == "auto":
+        use_xdotool = sys.platform.startswith("linux") and shutil.which("xdotool")
+        name = "xdotool" if use_xdotool else "pyautogui"
+    if name == "xdotool":
+        return XdotoolBackend()
+    if name == "pyautogui":
+        return PyAutoGUIBackend()
+    if name == "recording":
+        return RecordingBackend()
+    raise ValueError(f"未知的输入后端: {name}")
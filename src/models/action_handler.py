@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pyautogui
 from PyQt5.QtWidgets import (
     QVBoxLayout,
@@ -8,7 +10,17 @@ from PyQt5.QtWidgets import (
     QPushButton,
     QSpinBox,
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+
+from src.models.action_backend import (
+    ActionSequence,
+    Click,
+    PressKey,
+    TypeText,
+    WaitReady,
+    create_backend,
+)
+from src.models.template_matcher import TemplateMatcher
 
 
 class ActionHandler:
@@ -17,13 +29,45 @@ class ActionHandler:
     负责根据识别的文本执行相应的自动化操作
     """
 
-    def __init__(self, signals):
+    def __init__(self, signals, backend=None):
+        """
+        初始化动作处理器
+
+        Args:
+            signals: OCRSignals实例
+            backend: ActionBackend输入后端, 为None时按平台自动选择
+        """
         self.signals = signals
+        self.backend = backend if backend is not None else create_backend()
         # 默认关键字和动作配置
         self.keyword = "测试"
         self.action_x = 1000
         self.action_y = 500
         self.action_text = "哈哈"
+        # 点击后等待目标窗口获得焦点的最长时间(秒)
+        self.ready_timeout = 1.0
+        # 最近一次动作每一步的(步骤名, 是否成功, 耗时)
+        self.last_timings = []
+        # 动作在单独的线程中按顺序执行, 等待窗口就绪时不阻塞界面
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="action")
+        # 各关键字的参考图像, 由OCR处理器在识别前匹配
+        self.template_matcher = TemplateMatcher()
+        # 截取参考图像的函数, 返回当前区域的截图, 由主窗口设置
+        self.template_source = None
+        # 关键字停止输入一段时间后才通知规则变化(毫秒), 避免每次按键都重新生成关键字约束
+        self.rules_delay = 500
+        self.rules_timer = None
+        # 最近一次通知的关键字
+        self.applied_keywords = self.get_keywords()
+
+    def get_keywords(self):
+        """
+        获取当前动作规则中的关键字
+        
+        Returns:
+            list: 关键字列表
+        """
+        return [self.keyword] if self.keyword.strip() else []
 
     def process_text(self, text):
         # 根据配置的关键字匹配文本
@@ -31,31 +75,77 @@ class ActionHandler:
             self.signals.log_message.emit(f"检测到关键词'{self.keyword}', 执行模拟操作")
             self.__perform_action()
 
+    def process_template_match(self, keywords):
+        """
+        参考图像匹配到关键字时直接执行动作(在主线程中调用)
+        
+        Args:
+            keywords: 匹配到的关键字列表
+        """
+        matched = [keyword for keyword in keywords if keyword in self.get_keywords()]
+        if matched:
+            self.signals.log_message.emit(f"模板匹配到关键词'{matched[0]}', 执行模拟操作")
+            self.__perform_action()
+
+    def process_delta(self, delta):
+        """
+        只对新增或修改的行执行匹配
+        
+        Args:
+            delta: TextDelta行级差异
+        """
+        self.process_text("\n".join(delta.added_lines))
+
+    def build_sequence(self):
+        """
+        根据当前配置生成动作序列: 点击目标位置, 等待窗口就绪, 输入文本, 按回车
+
+        Returns:
+            ActionSequence: 动作序列
+        """
+        return ActionSequence([
+            Click(self.action_x, self.action_y),
+            WaitReady(self.ready_timeout),
+            TypeText(self.action_text),
+            PressKey("enter"),
+        ])
+
     def __perform_action(self):
-        """执行自动化操作(在主线程中调用)"""
-        try:
-            # 使用配置的坐标执行点击
-            pyautogui.click(self.action_x, self.action_y)
-            # 添加短暂延迟，确保点击后窗口已获得焦点
-            import time
+        """
+        执行自动化操作(在主线程中调用)
 
-            time.sleep(0.5)
-            # 对于中文等非ASCII文本，使用pyperclip+热键组合
-            import pyperclip
-
-            original_clipboard = pyperclip.paste()
-            pyperclip.copy(self.action_text)
-            pyautogui.hotkey("ctrl", "v")
-            time.sleep(0.2)
-            pyperclip.copy(original_clipboard)
-            # 按回车键
-            time.sleep(0.2)
-            pyautogui.press("enter")
+        动作序列按当前配置生成后交给动作线程执行, 立即返回; 多次触发的动作依次执行。
+
+        Returns:
+            Future: 动作执行结果, 值为是否执行成功
+        """
+        return self.executor.submit(self.run_sequence, self.build_sequence())
+
+    def run_sequence(self, sequence):
+        """
+        执行动作序列并记录每一步的耗时(在动作线程中调用)
+
+        Args:
+            sequence: ActionSequence动作序列
+
+        Returns:
+            bool: 是否执行成功
+        """
+        try:
+            self.last_timings = sequence.run(self.backend)
+            total = sum(elapsed for _, _, elapsed in self.last_timings)
+            if not all(ok for _, ok, _ in self.last_timings):
+                self.signals.log_message.emit("等待目标窗口获得焦点超时, 已继续输入")
+            self.signals.log_message.emit(f"动作已执行({self.backend.name}), 耗时 {total * 1000:.1f}ms")
             return True
         except Exception as e:
             self.signals.error_message.emit(f"执行操作出错: {str(e)}")
             return False
 
+    def shutdown(self):
+        """停止动作线程, 不等待正在执行的动作"""
+        self.executor.shutdown(wait=False)
+
     def create_config_ui(self):
         """创建关键字和自动操作配置的UI视图"""
         # 创建配置分组
@@ -68,6 +158,11 @@ class ActionHandler:
         self.keyword_edit = QLineEdit(self.keyword)
         self.keyword_edit.setPlaceholderText("输入要匹配的关键字")
         self.keyword_edit.textChanged.connect(self.update_keyword)
+        self.keyword_edit.editingFinished.connect(self.apply_keyword_rules)
+        self.rules_timer = QTimer(config_group)
+        self.rules_timer.setSingleShot(True)
+        self.rules_timer.setInterval(self.rules_delay)
+        self.rules_timer.timeout.connect(self.apply_keyword_rules)
         keyword_layout.addWidget(self.keyword_edit)
 
         # 点击坐标设置
@@ -102,6 +197,16 @@ class ActionHandler:
         self.action_text_edit.textChanged.connect(self.update_action_text)
         text_layout.addWidget(self.action_text_edit)
 
+        # 参考图像设置
+        template_layout = QHBoxLayout()
+        template_layout.addWidget(QLabel("参考图像:"))
+        self.capture_template_btn = QPushButton("从当前区域截取")
+        self.capture_template_btn.clicked.connect(self.capture_template)
+        template_layout.addWidget(self.capture_template_btn)
+        self.clear_template_btn = QPushButton("清除")
+        self.clear_template_btn.clicked.connect(self.clear_templates)
+        template_layout.addWidget(self.clear_template_btn)
+
         # 测试按钮
         test_layout = QHBoxLayout()
         self.test_btn = QPushButton("测试动作")
@@ -112,15 +217,54 @@ class ActionHandler:
         config_layout.addLayout(keyword_layout)
         config_layout.addLayout(coord_layout)
         config_layout.addLayout(text_layout)
+        config_layout.addLayout(template_layout)
         config_layout.addLayout(test_layout)
 
         config_group.setLayout(config_layout)
         return config_group
 
     def update_keyword(self, text):
-        """更新关键字配置"""
+        """更新关键字配置, 规则变化在停止输入后由apply_keyword_rules统一通知"""
         self.keyword = text
-        self.signals.log_message.emit(f"关键字已更新为: {text}")
+        if self.rules_timer is None:
+            self.apply_keyword_rules()
+        else:
+            self.rules_timer.start()
+
+    def apply_keyword_rules(self):
+        """通知关键字规则变化(输入停止或编辑完成时调用)"""
+        if self.rules_timer is not None:
+            self.rules_timer.stop()
+        keywords = self.get_keywords()
+        if keywords == self.applied_keywords:
+            return
+        self.applied_keywords = keywords
+        self.signals.log_message.emit(f"关键字已更新为: {self.keyword}")
+        # 参考图像属于旧关键字时不再使用
+        for keyword in self.template_matcher.keywords():
+            if keyword not in keywords:
+                self.template_matcher.remove(keyword)
+        self.signals.rules_changed.emit(keywords)
+
+    def capture_template(self):
+        """把当前区域的截图登记为关键字的参考图像, 区域应刚好框住按钮或横幅上的文字"""
+        keywords = self.get_keywords()
+        if not keywords:
+            self.signals.error_message.emit("请先设置关键字")
+            return
+        if self.template_source is None:
+            self.signals.error_message.emit("无法截取参考图像")
+            return
+        try:
+            self.template_matcher.register(keywords[0], self.template_source())
+            self.signals.log_message.emit(f"已登记关键字'{keywords[0]}'的参考图像")
+        except Exception as e:
+            self.signals.error_message.emit(f"截取参考图像失败: {str(e)}")
+
+    def clear_templates(self):
+        """清除所有参考图像"""
+        self.template_matcher.clear()
+        self.signals.log_message.emit("已清除参考图像")
 
     def update_action_x(self, value):
         """更新X坐标"""
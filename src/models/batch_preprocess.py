@@ -0,0 +1,185 @@
+import functools
+import itertools
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from src.models.color_key import isolate_text
+
+
+# 锐化卷积核, 逐帧和批量预处理共用
+SHARPEN_KERNEL = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
+
+
+def iter_chunks(frames, chunk_size):
+    """
+    把一组画面切分成固定大小的批次
+
+    Args:
+        frames: (N, H, W, C)的ndarray, 或逐帧产生(H, W, C)画面的可迭代对象(如生成器)
+        chunk_size: 每批的帧数
+
+    Returns:
+        generator: 逐批产生(n, H, W, C)的ndarray, ndarray输入时为切片视图, 不复制数据
+    """
+    if chunk_size < 1:
+        raise ValueError(f"批次大小应大于0: {chunk_size}")
+    if isinstance(frames, np.ndarray):
+        for start in range(0, len(frames), chunk_size):
+            yield frames[start:start + chunk_size]
+        return
+    iterator = iter(frames)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield np.stack([np.asarray(frame) for frame in chunk])
+
+
+def resize_stack(stack, scale):
+    """
+    缩放一批画面
+
+    OpenCV不能把多帧当作一张图像缩放: 把帧拼在通道上时非整数倍率的舍入与单帧不同, INTER_AREA
+    最多只支持4个通道。因此逐帧调用cv2.resize, 结果直接写入预先分配的数组。
+
+    Args:
+        stack: (N, H, W, C)的uint8数组
+        scale: 缩放倍数
+
+    Returns:
+        ndarray: 缩放后的(N, H', W', C)数组
+    """
+    if scale == 1.0:
+        return stack
+    interpolation = cv2.INTER_CUBIC if scale > 1.0 else cv2.INTER_AREA
+    first = cv2.resize(stack[0], None, fx=scale, fy=scale, interpolation=interpolation)
+    out = np.empty((len(stack),) + first.shape, dtype=stack.dtype)
+    out[0] = first
+    for i in range(1, len(stack)):
+        # 指定dsize时OpenCV按尺寸之比重新计算倍率, 与单帧的舍入不同, 因此只传fx/fy
+        cv2.resize(stack[i], None, dst=out[i], fx=scale, fy=scale, interpolation=interpolation)
+    return out
+
+
+@functools.lru_cache(maxsize=8)
+def contrast_table(factor):
+    """
+    获取对比度增强的查找表
+
+    ImageEnhance.Contrast把每个像素与该帧灰度均值按factor混合, 结果只取决于(均值, 像素值),
+    因此用Image.blend本身算出全部256x256种组合, 与逐帧增强完全一致。
+
+    Args:
+        factor: 对比度增强倍数
+
+    Returns:
+        ndarray: 256x256的uint8数组, [均值, 像素值] -> 增强后的像素值
+    """
+    values = np.arange(256, dtype=np.uint8)
+    degenerate = Image.fromarray(np.ascontiguousarray(np.broadcast_to(values[:, None], (256, 256))))
+    image = Image.fromarray(np.ascontiguousarray(np.broadcast_to(values[None, :], (256, 256))))
+    return np.asarray(Image.blend(degenerate, image, factor))
+
+
+def to_gray_stack(stack):
+    """
+    把一批RGB画面转换为灰度, 结果与逐帧convert('L')一致
+
+    灰度转换是逐像素运算, 把整批画面纵向拼成一张图像后只需一次convert。
+
+    Args:
+        stack: (N, H, W, 3)的uint8数组
+
+    Returns:
+        ndarray: (N, H, W)的uint8数组
+    """
+    count, height, width = stack.shape[:3]
+    tall = Image.fromarray(np.ascontiguousarray(stack).reshape(count * height, width, 3))
+    return np.asarray(tall.convert("L")).reshape(count, height, width)
+
+
+def enhance_contrast_stack(stack, factor):
+    """
+    增强一批RGB画面的对比度, 结果与逐帧使用PIL.ImageEnhance.Contrast完全一致
+
+    Args:
+        stack: (N, H, W, 3)的uint8数组
+        factor: 对比度增强倍数
+
+    Returns:
+        ndarray: (N, H, W, 3)的uint8数组
+    """
+    gray = to_gray_stack(stack).reshape(len(stack), -1)
+    # 与ImageStat一致: 整数和除以像素数后四舍五入
+    means = (gray.sum(axis=1, dtype=np.int64) / gray.shape[1] + 0.5).astype(np.intp)
+    # 查表比按像素做浮点混合快得多; 每帧只有一个均值, 逐帧用cv2.LUT查表比四维花式索引快
+    table = contrast_table(factor)
+    out = np.empty_like(stack)
+    for frame, mean, dst in zip(stack, means, out):
+        cv2.LUT(frame, table[mean], dst=dst)
+    return out
+
+
+def threshold_stack(stack):
+    """
+    把一批RGB画面转换为灰度后二值化, 结果与逐帧convert('L')再point(..., '1')一致
+
+    Args:
+        stack: (N, H, W, 3)的uint8数组
+
+    Returns:
+        ndarray: (N, H, W)的bool数组, 与np.asarray(1位图像)相同
+    """
+    return to_gray_stack(stack) >= 128
+
+
+def preprocess_stack(stack, preprocessing, scale, color_key=None):
+    """
+    对一批同样大小的RGB画面执行与OCRProcessor.preprocess_image相同的预处理
+
+    缩放、降噪和锐化需要邻域像素, 逐帧调用OpenCV; 对比度增强、灰度转换和二值化是逐像素运算,
+    对整批画面一次完成。
+
+    Args:
+        stack: (N, H, W, 3)的uint8数组, RGB格式
+        preprocessing: config["image_preprocessing"]
+        scale: 缩放倍数
+        color_key: config["color_key"], 为None时不按颜色提取文字
+
+    Returns:
+        ndarray: 二值化或按颜色提取时为(N, H', W')数组(二值化为bool, 颜色提取为uint8),
+            否则为(N, H', W', 3)的uint8数组; 对每一帧调用Image.fromarray即得到与单帧预处理相同的图像
+    """
+    stack = np.asarray(stack)
+    if stack.ndim != 4 or stack.shape[3] != 3 or not len(stack):
+        raise ValueError(f"批量预处理需要至少一帧(N, H, W, 3)的RGB画面: {stack.shape}")
+    if not preprocessing["enabled"]:
+        return stack
+
+    stack = resize_stack(stack, scale)
+
+    if color_key and color_key["enabled"] and color_key["keys"]:
+        return np.stack([
+            isolate_text(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR), color_key["keys"], color_key["cleanup"])
+            for frame in stack
+        ])
+
+    if preprocessing["denoise"] or preprocessing["sharpen"]:
+        stack = stack.copy()
+        for frame in stack:
+            # 降噪在Lab空间进行, 与单帧路径一样按BGR顺序传入
+            bgr = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+            if preprocessing["denoise"]:
+                bgr = cv2.fastNlMeansDenoisingColored(bgr, None, 10, 10, 7, 21)
+            if preprocessing["sharpen"]:
+                bgr = cv2.filter2D(bgr, -1, SHARPEN_KERNEL)
+            cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=frame)
+
+    if preprocessing["contrast"] != 1.0:
+        stack = enhance_contrast_stack(stack, preprocessing["contrast"])
+
+    if preprocessing["threshold"]:
+        return threshold_stack(stack)
+    return stack
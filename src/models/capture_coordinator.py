@@ -0,0 +1,134 @@
+import time
+import threading
+
+import numpy as np
+
+
+def bbox_area(bbox):
+    """区域(left, top, right, bottom)的面积"""
+    return max(0, bbox[2] - bbox[0]) * max(0, bbox[3] - bbox[1])
+
+
+def bbox_union(a, b):
+    """两个区域的外接矩形"""
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+class CaptureCoordinator:
+    """
+    截图合并器
+
+    同一时刻到期的多个区域只截取一次它们的外接矩形, 再为每个区域返回指向这次截图的
+    ndarray视图(不复制像素)。一次截图的开销按"固定开销 + 面积"估算: 合并两组区域
+    省下的固定开销大于外接矩形多截取的面积时才合并, 相距较远的区域仍分别截取。
+    """
+
+    def __init__(self, source, grab_overhead=300000):
+        """
+        初始化截图合并器
+
+        Args:
+            source: 截图来源, 提供grab(bbox)方法, 返回PIL.Image
+            grab_overhead: 每次截图的固定开销, 以等价的像素数表示
+        """
+        self.source = source
+        self.grab_overhead = grab_overhead
+        self.stats = {"ticks": 0, "regions": 0, "grabs": 0, "grabbed_pixels": 0, "used_pixels": 0}
+        self._lock = threading.Lock()
+
+    def cost(self, bbox):
+        """估算截取一个区域的开销"""
+        return self.grab_overhead + bbox_area(bbox)
+
+    def plan(self, bboxes):
+        """
+        把区域分组, 每组截取一次外接矩形
+
+        反复合并节省开销最多的两组, 直到任何合并都不再节省开销。
+
+        Args:
+            bboxes: 区域标识 -> (left, top, right, bottom)
+
+        Returns:
+            list: [(外接矩形, [区域标识, ...]), ...]
+        """
+        groups = [(bbox, [key]) for key, bbox in bboxes.items()]
+        while len(groups) > 1:
+            best = None
+            for i in range(len(groups)):
+                for j in range(i + 1, len(groups)):
+                    union = bbox_union(groups[i][0], groups[j][0])
+                    saving = self.cost(groups[i][0]) + self.cost(groups[j][0]) - self.cost(union)
+                    if saving > 0 and (best is None or saving > best[0]):
+                        best = (saving, i, j, union)
+            if best is None:
+                break
+            _, i, j, union = best
+            merged = (union, groups[i][1] + groups[j][1])
+            groups = [group for k, group in enumerate(groups) if k not in (i, j)] + [merged]
+        return groups
+
+    def capture(self, bboxes):
+        """
+        按分组截图
+
+        Args:
+            bboxes: 区域标识 -> (left, top, right, bottom), 无效区域会被跳过
+
+        Returns:
+            dict: 区域标识 -> RGB格式的ndarray(外接矩形截图的视图)
+        """
+        valid = {key: tuple(bbox) for key, bbox in bboxes.items() if bbox and bbox_area(bbox) > 0}
+        frames = {}
+        grabbed = 0
+        plan = self.plan(valid)
+        for union, keys in plan:
+            pixels = np.asarray(self.source.grab(union))
+            grabbed += bbox_area(union)
+            for key in keys:
+                left, top, right, bottom = valid[key]
+                frames[key] = pixels[top - union[1]:bottom - union[1], left - union[0]:right - union[0]]
+
+        with self._lock:
+            self.stats["ticks"] += 1
+            self.stats["regions"] += len(frames)
+            self.stats["grabs"] += len(plan)
+            self.stats["grabbed_pixels"] += grabbed
+            self.stats["used_pixels"] += sum(bbox_area(bbox) for bbox in valid.values())
+        return frames
+
+    def calibrate(self, small=(0, 0, 64, 64), large=(0, 0, 1024, 768), repeat=5):
+        """
+        测量截取小区域和大区域的耗时, 据此估算固定开销对应的像素数
+
+        Args:
+            small: 小区域
+            large: 大区域
+            repeat: 每个区域的截图次数
+
+        Returns:
+            int: 估算出的grab_overhead, 同时更新到本对象
+        """
+        def timed(bbox):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                self.source.grab(bbox)
+            return (time.perf_counter() - start) / repeat
+
+        small_time, large_time = timed(small), timed(large)
+        per_pixel = max(large_time - small_time, 1e-9) / max(1, bbox_area(large) - bbox_area(small))
+        fixed = max(0.0, small_time - per_pixel * bbox_area(small))
+        self.grab_overhead = int(fixed / per_pixel)
+        return self.grab_overhead
+
+    def get_stats(self):
+        """
+        获取合并统计
+
+        Returns:
+            dict: {"ticks", "regions", "grabs", "saved", "grabbed_pixels", "used_pixels"}
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        stats["saved"] = stats["regions"] - stats["grabs"]
+        return stats
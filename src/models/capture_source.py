@@ -0,0 +1,150 @@
+import random
+import threading
+
+from PIL import Image, ImageDraw, ImageFont, ImageGrab
+
+
+class ScreenCaptureSource:
+    """
+    屏幕截图来源, 截取真实屏幕区域
+    """
+
+    def grab(self, bbox):
+        """
+        截取屏幕区域
+
+        Args:
+            bbox: 屏幕区域(left, top, right, bottom)
+
+        Returns:
+            PIL.Image: RGB截图
+        """
+        return ImageGrab.grab(bbox=bbox)
+
+
+# 合成画面默认使用的文本
+DEFAULT_TEXTS = [
+    "Hello World",
+    "OCR box synthetic frame",
+    "测试文字识别",
+    "系统运行正常",
+    "Error 404 not found",
+    "警告: 磁盘空间不足",
+]
+
+
+def load_font(font_path=None, font_size=24):
+    """
+    加载绘制文字用的字体
+
+    Args:
+        font_path: TrueType字体路径, 绘制中文时需要指定支持中文的字体
+        font_size: 字号
+
+    Returns:
+        PIL.ImageFont: 字体
+    """
+    if font_path:
+        return ImageFont.truetype(font_path, font_size)
+    try:
+        return ImageFont.load_default(size=font_size)
+    except TypeError:
+        # Pillow 10.1之前的版本默认字体不支持指定字号
+        return ImageFont.load_default()
+
+
+class SyntheticCaptureSource:
+    """
+    合成截图来源, 用PIL在纯色背景上绘制文字, 用于长时间运行测试和压力测试
+
+    画面每隔change_every帧更换一次文字, 其余帧返回相同内容, 模拟真实屏幕的变化节奏。
+    通过add_region登记的区域相当于屏幕上固定位置的文字块, 按屏幕绝对坐标绘制: 截取的范围
+    覆盖多个区域(如合并截图)时, 每个区域的文字出现在各自的位置上。没有登记区域的范围按
+    范围本身作为一个文字块绘制。
+    """
+
+    def __init__(self, texts=None, font_path=None, font_size=24, lines=3, change_every=1, seed=None):
+        """
+        初始化合成截图来源
+
+        Args:
+            texts: 可选的文本列表, 每帧从中随机挑选
+            font_path: TrueType字体路径
+            font_size: 字号
+            lines: 每帧绘制的行数
+            change_every: 每隔多少帧更换一次内容
+            seed: 随机数种子, 用于复现
+        """
+        self.texts = list(texts or DEFAULT_TEXTS)
+        self.font = load_font(font_path, font_size)
+        self.font_size = font_size
+        self.lines = lines
+        self.change_every = max(1, change_every)
+        self.frame_count = 0
+        self._random = random.Random(seed)
+        self._current = {}
+        self._regions = set()
+        self._lock = threading.Lock()
+
+    def add_region(self, bbox):
+        """
+        登记一个文字块的屏幕位置
+
+        Args:
+            bbox: 区域(left, top, right, bottom)
+        """
+        with self._lock:
+            self._regions.add(tuple(bbox))
+
+    def clear_regions(self):
+        """清除登记的文字块"""
+        with self._lock:
+            self._regions.clear()
+            self._current.clear()
+
+    def grab(self, bbox):
+        """
+        生成与区域大小相同的合成画面
+
+        Args:
+            bbox: 区域(left, top, right, bottom)
+
+        Returns:
+            PIL.Image: RGB画面
+        """
+        bbox = tuple(bbox)
+        with self._lock:
+            self.frame_count += 1
+            blocks = [
+                region for region in sorted(self._regions)
+                if region[0] < bbox[2] and bbox[0] < region[2] and region[1] < bbox[3] and bbox[1] < region[3]
+            ] or [bbox]
+            for key in blocks:
+                if key not in self._current or self.frame_count % self.change_every == 0:
+                    self._current[key] = [self._random.choice(self.texts) for _ in range(self.lines)]
+            contents = [(key, self._current[key]) for key in blocks]
+        image = Image.new("RGB", (bbox[2] - bbox[0], bbox[3] - bbox[1]), (255, 255, 255))
+        for (left, top, right, bottom), lines in contents:
+            # 文字块超出截取范围的部分被裁掉, 与截取真实屏幕一致
+            block = self.render(lines, right - left, bottom - top)
+            image.paste(block, (left - bbox[0], top - bbox[1]))
+        return image
+
+    def render(self, lines, width, height):
+        """
+        在白色背景上绘制多行黑色文字
+
+        Args:
+            lines: 文本行列表
+            width: 画面宽度
+            height: 画面高度
+
+        Returns:
+            PIL.Image: RGB画面
+        """
+        image = Image.new("RGB", (width, height), (255, 255, 255))
+        draw = ImageDraw.Draw(image)
+        line_height = int(self.font_size * 1.6)
+        for index, line in enumerate(lines):
+            draw.text((10, 10 + index * line_height), line, fill=(0, 0, 0), font=self.font)
+        return image
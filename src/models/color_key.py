@@ -0,0 +1,91 @@
+import cv2
+import numpy as np
+
+
+def normalize_key(key):
+    """
+    把颜色键统一为(h1, s1, v1, h2, s2, v2)的整数元组
+
+    Args:
+        key: HSV范围, OpenCV取值范围(H: 0~179, S/V: 0~255); h1大于h2时表示跨过0的色相,
+            例如红色(170, 80, 80, 10, 255, 255)
+
+    Returns:
+        tuple: 颜色键
+    """
+    if len(key) != 6:
+        raise ValueError(f"颜色键应为6个数值(h1, s1, v1, h2, s2, v2): {key}")
+    h1, s1, v1, h2, s2, v2 = (int(value) for value in key)
+    return (min(max(h1, 0), 179), min(max(s1, 0), 255), min(max(v1, 0), 255),
+            min(max(h2, 0), 179), min(max(s2, 0), 255), min(max(v2, 0), 255))
+
+
+def key_from_color(rgb, hue_tolerance=10, saturation_tolerance=80, value_tolerance=80):
+    """
+    由取色得到的颜色生成颜色键
+
+    Args:
+        rgb: (r, g, b)颜色
+        hue_tolerance: 色相容差
+        saturation_tolerance: 饱和度容差
+        value_tolerance: 亮度容差
+
+    Returns:
+        tuple: 颜色键(h1, s1, v1, h2, s2, v2)
+    """
+    pixel = np.array([[rgb]], dtype=np.uint8)
+    h, s, v = (int(value) for value in cv2.cvtColor(pixel, cv2.COLOR_RGB2HSV)[0, 0])
+    # 灰色、白色、黑色文字的色相没有意义, 不限制色相; 容差达到90时已覆盖全部色相,
+    # 按取模计算的上下限会重合成一个值
+    if s < 40 or hue_tolerance >= 90:
+        h1, h2 = 0, 179
+    else:
+        h1, h2 = (h - hue_tolerance) % 180, (h + hue_tolerance) % 180
+    return normalize_key((h1, s - saturation_tolerance, v - value_tolerance,
+                          h2, s + saturation_tolerance, v + value_tolerance))
+
+
+def build_text_mask(image_bgr, keys, cleanup=0):
+    """
+    按颜色键生成文字掩码
+
+    Args:
+        image_bgr: BGR格式的图像
+        keys: 颜色键列表
+        cleanup: 去除孤立噪点的开运算核大小, 0表示不处理
+
+    Returns:
+        ndarray: 掩码, 文字为255, 其余为0
+    """
+    hsv = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2HSV)
+    mask = None
+    for key in keys:
+        h1, s1, v1, h2, s2, v2 = normalize_key(key)
+        if h1 <= h2:
+            part = cv2.inRange(hsv, (h1, s1, v1), (h2, s2, v2))
+        else:
+            # 色相跨过0(如红色)时分成两段
+            part = cv2.bitwise_or(cv2.inRange(hsv, (h1, s1, v1), (179, s2, v2)),
+                                  cv2.inRange(hsv, (0, s1, v1), (h2, s2, v2)))
+        mask = part if mask is None else cv2.bitwise_or(mask, part)
+    if mask is None:
+        return np.zeros(image_bgr.shape[:2], dtype=np.uint8)
+    if cleanup > 0:
+        size = 2 * cleanup + 1
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (size, size)))
+    return mask
+
+
+def isolate_text(image_bgr, keys, cleanup=0):
+    """
+    只保留颜色键范围内的像素, 生成白底黑字的二值图像
+
+    Args:
+        image_bgr: BGR格式的图像
+        keys: 颜色键列表
+        cleanup: 去除孤立噪点的开运算核大小
+
+    Returns:
+        ndarray: 单通道二值图像
+    """
+    return cv2.bitwise_not(build_text_mask(image_bgr, keys, cleanup))
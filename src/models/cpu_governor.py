@@ -0,0 +1,236 @@
+import os
+import time
+import threading
+
+
+# 超出预算时依次切换的预处理档位, 从高质量到低开销
+PROFILE_ORDER = ("quality", "balanced", "fast")
+# 识别周期的放大倍数, 每降一级使用下一个倍数
+INTERVAL_FACTORS = (1.5, 2.0, 3.0, 4.0)
+
+
+def cpu_seconds():
+    """
+    获取本进程及其子进程累计使用的CPU时间
+
+    子进程时间只包含已经结束并被回收的子进程, pytesseract每次识别都会等待tesseract子进程
+    结束, 因此能够统计到; Windows不提供子进程时间, 只统计本进程(包括tesserocr)。
+
+    Returns:
+        float: CPU时间(秒)
+    """
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class CPUMeter:
+    """按窗口统计CPU占用"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """从现在开始一个新的统计窗口"""
+        self._cpu = cpu_seconds()
+        self._wall = time.monotonic()
+
+    def sample(self):
+        """
+        获取上一次采样以来的CPU占用, 并开始新的统计窗口
+
+        Returns:
+            float: 占全部CPU核心的百分比(0~100)
+        """
+        cpu, wall = cpu_seconds(), time.monotonic()
+        used, elapsed = cpu - self._cpu, wall - self._wall
+        self._cpu, self._wall = cpu, wall
+        if elapsed <= 0:
+            return 0.0
+        return used / (elapsed * (os.cpu_count() or 1)) * 100
+
+
+def build_steps(baseline):
+    """
+    按当前设置生成降级步骤, 排在前面的步骤对识别效果的影响最小
+
+    依次为: Tesseract单线程(OpenMP多线程识别小图时大部分时间在空转)、降低预处理档位、
+    放大低优先级区域的识别周期、减少识别线程、放大全部区域的识别周期。
+
+    Args:
+        baseline: {"workers", "profile", "omp_limit", "has_low_priority"}, 未降级时的设置
+
+    Returns:
+        list: (类型, 取值, 说明)的列表
+    """
+    steps = []
+    if baseline["omp_limit"] != "1":
+        steps.append(("omp_limit", "1", "Tesseract单线程"))
+    profile = baseline["profile"]
+    if profile in PROFILE_ORDER:
+        for name in PROFILE_ORDER[PROFILE_ORDER.index(profile) + 1:]:
+            steps.append(("profile", name, f"预处理档位{name}"))
+    if baseline["has_low_priority"]:
+        for factor in INTERVAL_FACTORS:
+            steps.append(("low_factor", factor, f"低优先级区域周期×{factor:g}"))
+    for workers in range(baseline["workers"] - 1, 0, -1):
+        steps.append(("workers", workers, f"识别线程{workers}"))
+    for factor in INTERVAL_FACTORS:
+        steps.append(("top_factor", factor, f"全部区域周期×{factor:g}"))
+    return steps
+
+
+def settings_for_level(steps, level):
+    """
+    获取降级到指定级别时的设置
+
+    Args:
+        steps: build_steps生成的降级步骤
+        level: 降级级别, 0表示不降级
+
+    Returns:
+        dict: {"omp_limit", "profile", "workers", "low_factor", "top_factor"},
+            omp_limit、profile、workers为None时表示沿用原设置
+    """
+    settings = {"omp_limit": None, "profile": None, "workers": None, "low_factor": 1.0, "top_factor": 1.0}
+    for kind, value, _ in steps[:level]:
+        settings[kind] = value
+    # 放大全部区域的周期时, 低优先级区域在已放大的基础上继续放大
+    if settings["top_factor"] > 1.0 and settings["low_factor"] > 1.0:
+        settings["low_factor"] *= settings["top_factor"]
+    return settings
+
+
+class CPUGovernor:
+    """
+    CPU预算控制器
+
+    在后台线程中按窗口统计本进程及tesseract子进程的CPU占用。超出预算时降一级(每个窗口最多
+    一级), 连续几个窗口都明显低于预算时恢复一级。每次调整都通过on_change回调交给OCR处理器
+    应用, 并附带一条说明。
+    """
+
+    def __init__(self, window=5.0, relax_ratio=0.7, relax_windows=3):
+        """
+        初始化CPU预算控制器
+
+        Args:
+            window: 统计窗口(秒)
+            relax_ratio: CPU占用低于预算的这个比例时才考虑恢复
+            relax_windows: 需要连续多少个窗口低于恢复线才恢复一级
+        """
+        self.window = window
+        self.relax_ratio = relax_ratio
+        self.relax_windows = relax_windows
+        self.budget = 0.0
+        self.level = 0
+        self.usage = 0.0
+        self.steps = []
+        self.meter = CPUMeter()
+        self._calm = 0
+        self._baseline_fn = None
+        self._on_change = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        """控制器是否正在运行"""
+        return self._thread is not None
+
+    def start(self, budget, baseline_fn, on_change):
+        """
+        开始控制CPU占用
+
+        Args:
+            budget: CPU预算, 占全部CPU核心的百分比
+            baseline_fn: 返回未降级时设置的函数, 格式见build_steps
+            on_change: 级别变化时的回调, 参数为(设置, 说明), 设置格式见settings_for_level
+        """
+        self.stop()
+        self.budget = budget
+        self._baseline_fn = baseline_fn
+        self._on_change = on_change
+        with self._lock:
+            self.level = 0
+            self.usage = 0.0
+            self.steps = build_steps(baseline_fn())
+        self._calm = 0
+        self.meter.reset()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cpu-governor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止控制, 已降级时恢复原设置"""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        if thread is not threading.current_thread():
+            thread.join()
+        self._thread = None
+        with self._lock:
+            level, self.level = self.level, 0
+        if level:
+            self._on_change(settings_for_level(self.steps, 0), "CPU预算控制已停止, 恢复原设置")
+
+    def decide(self, usage):
+        """
+        根据一个窗口的CPU占用决定新的级别
+
+        Args:
+            usage: CPU占用(百分比)
+
+        Returns:
+            int: 新的级别, 不需要调整时为None
+        """
+        if usage > self.budget:
+            self._calm = 0
+            if self.level < len(self.steps):
+                return self.level + 1
+            return None
+        if usage < self.budget * self.relax_ratio and self.level > 0:
+            self._calm += 1
+            if self._calm >= self.relax_windows:
+                self._calm = 0
+                return self.level - 1
+            return None
+        self._calm = 0
+        return None
+
+    def _run(self):
+        while not self._stop.wait(self.window):
+            usage = self.meter.sample()
+            with self._lock:
+                self.usage = usage
+                level = self.decide(usage)
+                if level is None:
+                    continue
+                if self.level == 0:
+                    # 未降级期间用户可能修改了设置, 从当前设置重新生成降级步骤
+                    self.steps = build_steps(self._baseline_fn())
+                if level > self.level:
+                    message = f"CPU占用{usage:.0f}%超过预算{self.budget:g}%, 降级: {self.steps[level - 1][2]}"
+                else:
+                    message = f"CPU占用{usage:.0f}%低于预算{self.budget:g}%, 恢复: {self.steps[self.level - 1][2]}"
+                self.level = level
+                settings = settings_for_level(self.steps, level)
+            self._on_change(settings, message)
+
+    def get_stats(self):
+        """
+        获取控制状态
+
+        Returns:
+            dict: {"active", "budget", "usage", "level", "levels", "step"}, step为最近一级降级的说明
+        """
+        with self._lock:
+            return {
+                "active": self.active,
+                "budget": self.budget,
+                "usage": self.usage,
+                "level": self.level,
+                "levels": len(self.steps),
+                "step": self.steps[self.level - 1][2] if self.level else "",
+            }
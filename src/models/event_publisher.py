@@ -0,0 +1,453 @@
+"""
+识别事件发布
+
+通过Unix域套接字把识别结果和关键字命中实时发给本机的多个订阅进程。每个事件是一个
+二进制帧: 4字节大端长度 + 事件内容。事件内容的开头为
+
+    类型(uint8) | 帧序号(uint64) | 时间戳(float64, Unix时间) | 区域标识长度(uint16) | 区域标识(UTF-8)
+
+之后按类型不同:
+- EVENT_SNAPSHOT: 区域的完整文本, 订阅者连接时、跳过事件后重新同步时, 以及变化数或某个变化的
+  行数超出数量字段范围时发送
+- EVENT_DELTA: 旧行数(uint32) + 变化数(uint16) + 每个变化的 标记(uint8) | i1(uint32) | i2(uint32) | 新行
+- EVENT_MATCH: 来源(uint8, 0为OCR文本, 1为参考图像) + 命中的关键字
+
+文本列表统一编码为 数量(uint16) + 每项的 长度(uint32) | UTF-8内容。
+
+本模块只依赖标准库, 订阅端可以直接使用EventSubscriber, 无需安装PyQt5等依赖。
+"""
+import os
+import time
+import socket
+import struct
+import tempfile
+import threading
+from collections import deque
+
+
+EVENT_SNAPSHOT = 1
+EVENT_DELTA = 2
+EVENT_MATCH = 3
+
+MATCH_SOURCES = ("ocr", "template")
+DELTA_TAGS = ("replace", "delete", "insert")
+
+LENGTH = struct.Struct("!I")
+HEADER = struct.Struct("!BQdH")
+COUNT = struct.Struct("!H")
+CHANGE = struct.Struct("!BII")
+SOURCE = struct.Struct("!B")
+# 数量字段(uint16)能表示的最大值
+MAX_COUNT = 0xFFFF
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), "ocr_box_events.sock")
+
+
+def pack_strings(strings):
+    """把文本列表编码为 数量 + 长度前缀的UTF-8内容"""
+    parts = [COUNT.pack(len(strings))]
+    for string in strings:
+        data = string.encode("utf-8")
+        parts.append(LENGTH.pack(len(data)))
+        parts.append(data)
+    return b"".join(parts)
+
+
+def unpack_strings(payload, offset):
+    """
+    解码pack_strings编码的文本列表
+
+    Returns:
+        tuple: (文本列表, 下一个字段的偏移)
+    """
+    (count,), offset = COUNT.unpack_from(payload, offset), offset + COUNT.size
+    strings = []
+    for _ in range(count):
+        (size,), offset = LENGTH.unpack_from(payload, offset), offset + LENGTH.size
+        strings.append(payload[offset:offset + size].decode("utf-8"))
+        offset += size
+    return strings, offset
+
+
+def encode_event(kind, region_id, seq, timestamp, body):
+    """
+    编码一个事件帧
+
+    Args:
+        kind: 事件类型
+        region_id: 区域标识
+        seq: 区域的帧序号
+        timestamp: 时间戳
+        body: 按类型编码好的事件内容
+
+    Returns:
+        bytes: 带长度前缀的事件帧
+    """
+    region = region_id.encode("utf-8")
+    payload = HEADER.pack(kind, seq, timestamp, len(region)) + region + body
+    return LENGTH.pack(len(payload)) + payload
+
+
+def encode_snapshot(region_id, seq, timestamp, text):
+    """编码区域完整文本事件"""
+    return encode_event(EVENT_SNAPSHOT, region_id, seq, timestamp, pack_strings([text]))
+
+
+def encode_delta(region_id, seq, timestamp, delta):
+    """编码TextDelta行级差异事件"""
+    parts = [LENGTH.pack(delta.old_line_count), COUNT.pack(len(delta.changes))]
+    for tag, i1, i2, lines in delta.changes:
+        parts.append(CHANGE.pack(DELTA_TAGS.index(tag), i1, i2))
+        parts.append(pack_strings(lines))
+    return encode_event(EVENT_DELTA, region_id, seq, timestamp, b"".join(parts))
+
+
+def encode_match(region_id, seq, timestamp, keywords, source="ocr"):
+    """编码关键字命中事件"""
+    body = SOURCE.pack(MATCH_SOURCES.index(source)) + pack_strings(keywords)
+    return encode_event(EVENT_MATCH, region_id, seq, timestamp, body)
+
+
+class OCREvent:
+    """订阅端收到的一个事件"""
+
+    __slots__ = ("kind", "region_id", "seq", "timestamp", "text", "changes", "old_line_count",
+                 "keywords", "source")
+
+    def __init__(self, kind, region_id, seq, timestamp):
+        self.kind = kind
+        self.region_id = region_id
+        self.seq = seq
+        self.timestamp = timestamp
+        self.text = None
+        self.changes = None
+        self.old_line_count = 0
+        self.keywords = None
+        self.source = None
+
+    def __repr__(self):
+        names = {EVENT_SNAPSHOT: "snapshot", EVENT_DELTA: "delta", EVENT_MATCH: "match"}
+        detail = self.keywords if self.kind == EVENT_MATCH else self.text
+        return f"OCREvent({names.get(self.kind, self.kind)}, {self.region_id}#{self.seq}, {detail!r})"
+
+
+def decode_event(payload):
+    """
+    解码一个事件(不含长度前缀)
+
+    Returns:
+        OCREvent: 事件, EVENT_DELTA的text为None, 由EventSubscriber应用差异后填入
+    """
+    kind, seq, timestamp, region_size = HEADER.unpack_from(payload, 0)
+    offset = HEADER.size
+    event = OCREvent(kind, payload[offset:offset + region_size].decode("utf-8"), seq, timestamp)
+    offset += region_size
+    if kind == EVENT_SNAPSHOT:
+        (event.text,), _ = unpack_strings(payload, offset)
+    elif kind == EVENT_DELTA:
+        (event.old_line_count,) = LENGTH.unpack_from(payload, offset)
+        (count,) = COUNT.unpack_from(payload, offset + LENGTH.size)
+        offset += LENGTH.size + COUNT.size
+        event.changes = []
+        for _ in range(count):
+            tag, i1, i2 = CHANGE.unpack_from(payload, offset)
+            lines, offset = unpack_strings(payload, offset + CHANGE.size)
+            event.changes.append((DELTA_TAGS[tag], i1, i2, lines))
+    elif kind == EVENT_MATCH:
+        (source,) = SOURCE.unpack_from(payload, offset)
+        event.source = MATCH_SOURCES[source]
+        event.keywords, _ = unpack_strings(payload, offset + SOURCE.size)
+    return event
+
+
+class Subscriber:
+    """发布端的一个订阅连接, 由独立线程把排队的事件写入套接字"""
+
+    def __init__(self, connection, queue_size):
+        self.connection = connection
+        self.queue_size = queue_size
+        self.queue = deque()
+        self.dropped = 0
+        self.sent = 0
+        # 跳过事件后订阅端的文本已不完整, 有空间时先补发全部区域的完整文本
+        self.needs_resync = False
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify()
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.connection.close()
+
+
+class EventPublisher:
+    """
+    识别事件发布端
+
+    识别线程调用publish_*时只编码一次事件并放入各订阅者的队列, 不做任何网络IO; 每个订阅者
+    由自己的线程发送。订阅者的队列满时按策略处理:
+    - skip: 丢弃该订阅者的新事件, 等队列有空间后补发各区域的完整文本重新同步
+    - disconnect: 直接断开该订阅者
+    因此读取慢的订阅者不会拖慢识别循环。
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, queue_size=256, policy="skip"):
+        """
+        初始化发布端
+
+        Args:
+            path: Unix域套接字路径
+            queue_size: 每个订阅者最多排队的事件数
+            policy: 订阅者的队列满时的策略, skip或disconnect
+        """
+        if policy not in ("skip", "disconnect"):
+            raise ValueError(f"未知的订阅者队列策略: {policy}")
+        self.path = path
+        self.queue_size = queue_size
+        self.policy = policy
+        self.stats = {"published": 0, "subscribers": 0, "skipped": 0, "disconnected": 0}
+        self._subscribers = []
+        self._seq = {}
+        self._texts = {}
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._server is not None
+
+    def start(self):
+        """开始监听订阅连接"""
+        if self._server is not None:
+            return
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError("当前系统不支持Unix域套接字")
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen()
+        self._server = server
+        self._thread = threading.Thread(target=self._accept_loop, args=(server,), name="event-publisher",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止监听并断开所有订阅者"""
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        server.close()
+        if self._thread is not None:
+            self._thread.join(2)
+            self._thread = None
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, []
+        for subscriber in subscribers:
+            subscriber.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def next_seq(self, region_id):
+        """区域的下一个帧序号, 每识别一帧调用一次"""
+        with self._lock:
+            seq = self._seq.get(region_id, 0) + 1
+            self._seq[region_id] = seq
+            return seq
+
+    def publish_delta(self, region_id, seq, delta):
+        """发布一个区域的文本变化"""
+        now = time.time()
+        if len(delta.changes) > MAX_COUNT or any(len(lines) > MAX_COUNT for *_, lines in delta.changes):
+            # 数量字段放不下, 改为发送完整文本
+            frame = encode_snapshot(region_id, seq, now, delta.text)
+        else:
+            frame = encode_delta(region_id, seq, now, delta)
+        with self._lock:
+            # 更新文本和放入队列在同一个锁内完成, 否则在两者之间连接的订阅者会先收到已包含
+            # 本次变化的完整文本, 再重复应用一次这个变化
+            self._texts[region_id] = delta.text
+            self._enqueue(frame)
+
+    def publish_match(self, region_id, seq, keywords, source="ocr"):
+        """发布一个区域命中的关键字"""
+        frame = encode_match(region_id, seq, time.time(), keywords, source)
+        with self._lock:
+            self._enqueue(frame)
+
+    def _snapshots(self):
+        """各区域当前完整文本的事件帧(调用方需持有锁)"""
+        now = time.time()
+        return [encode_snapshot(region_id, self._seq.get(region_id, 0), now, text)
+                for region_id, text in self._texts.items()]
+
+    def _enqueue(self, frame):
+        """把事件帧放入各订阅者的队列(调用方需持有锁)"""
+        if not self._subscribers:
+            return
+        self.stats["published"] += 1
+        subscribers = list(self._subscribers)
+        snapshots = None
+        for subscriber in subscribers:
+            with subscriber.cond:
+                pending = len(subscriber.queue)
+                if subscriber.needs_resync:
+                    if snapshots is None:
+                        snapshots = self._snapshots()
+                    if pending + len(snapshots) < subscriber.queue_size:
+                        subscriber.queue.extend(snapshots)
+                        # 补发的完整文本已包含本次的文本变化, 关键字命中仍需单独发送
+                        if frame[LENGTH.size] == EVENT_MATCH:
+                            subscriber.queue.append(frame)
+                        subscriber.needs_resync = False
+                        subscriber.cond.notify()
+                        continue
+                elif pending < subscriber.queue_size:
+                    subscriber.queue.append(frame)
+                    subscriber.cond.notify()
+                    continue
+            if self.policy == "disconnect":
+                self._remove(subscriber)
+                self.stats["disconnected"] += 1
+                subscriber.close()
+            else:
+                with subscriber.cond:
+                    subscriber.needs_resync = True
+                    subscriber.dropped += 1
+                self.stats["skipped"] += 1
+
+    def _remove(self, subscriber):
+        """移除订阅者(调用方需持有锁)"""
+        if subscriber in self._subscribers:
+            self._subscribers.remove(subscriber)
+            self.stats["subscribers"] = len(self._subscribers)
+
+    def _accept_loop(self, server):
+        while True:
+            try:
+                connection, _ = server.accept()
+            except OSError:
+                return
+            subscriber = Subscriber(connection, self.queue_size)
+            with self._lock:
+                # 新订阅者先收到各区域的完整文本
+                subscriber.queue.extend(self._snapshots())
+                self._subscribers.append(subscriber)
+                self.stats["subscribers"] = len(self._subscribers)
+            threading.Thread(target=self._send_loop, args=(subscriber,), name="event-subscriber",
+                             daemon=True).start()
+
+    def _send_loop(self, subscriber):
+        """订阅者的发送线程"""
+        try:
+            while True:
+                with subscriber.cond:
+                    while not subscriber.queue and not subscriber.closed:
+                        subscriber.cond.wait()
+                    if subscriber.closed:
+                        return
+                    frames = list(subscriber.queue)
+                    subscriber.queue.clear()
+                subscriber.connection.sendall(b"".join(frames))
+                subscriber.sent += len(frames)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._remove(subscriber)
+            subscriber.close()
+
+    def get_stats(self):
+        """
+        获取发布统计
+
+        Returns:
+            dict: {"published", "subscribers", "skipped", "disconnected"}
+        """
+        with self._lock:
+            return dict(self.stats)
+
+
+class EventSubscriber:
+    """
+    识别事件订阅端
+
+    用法:
+        with EventSubscriber("/tmp/ocr_box_events.sock") as subscriber:
+            for event in subscriber:
+                print(event.region_id, event.seq, event.text)
+
+    EVENT_SNAPSHOT和EVENT_DELTA事件的text都是应用变化后区域的完整文本。
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET, timeout=None):
+        """
+        连接发布端
+
+        Args:
+            path: Unix域套接字路径
+            timeout: 接收超时(秒), 为None时一直等待
+        """
+        self.path = path
+        self.texts = {}
+        self._buffer = bytearray()
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout)
+        self._socket.connect(path)
+
+    def close(self):
+        self._socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        while True:
+            event = self.receive()
+            if event is None:
+                return
+            yield event
+
+    def receive(self):
+        """
+        接收下一个事件
+
+        Returns:
+            OCREvent: 事件, 发布端关闭连接时返回None
+        """
+        while True:
+            if len(self._buffer) >= LENGTH.size:
+                (size,) = LENGTH.unpack_from(self._buffer, 0)
+                if len(self._buffer) >= LENGTH.size + size:
+                    payload = bytes(self._buffer[LENGTH.size:LENGTH.size + size])
+                    del self._buffer[:LENGTH.size + size]
+                    return self._apply(decode_event(payload))
+            chunk = self._socket.recv(65536)
+            if not chunk:
+                return None
+            self._buffer.extend(chunk)
+
+    def _apply(self, event):
+        """维护各区域的完整文本"""
+        if event.kind == EVENT_SNAPSHOT:
+            self.texts[event.region_id] = event.text
+        elif event.kind == EVENT_DELTA:
+            lines = self.texts.get(event.region_id, "").split("\n")
+            for _, i1, i2, new_lines in reversed(event.changes):
+                lines[i1:i2] = new_lines
+            event.text = "\n".join(lines)
+            self.texts[event.region_id] = event.text
+        return event
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import queue
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+class RecordedFrame:
+    """飞行记录器中已压缩的一帧"""
+
+    __slots__ = ("timestamp", "region_id", "raw", "processed", "text")
+
+    def __init__(self, timestamp, region_id, raw, processed, text):
+        self.timestamp = timestamp
+        self.region_id = region_id
+        self.raw = raw
+        self.processed = processed
+        self.text = text
+
+    @property
+    def size(self):
+        """压缩后占用的字节数"""
+        return len(self.raw) + len(self.processed or b"") + len(self.text.encode("utf-8"))
+
+
+def encode_png(image, compression=1):
+    """
+    把PIL.Image或RGB格式的ndarray压缩为PNG
+
+    Args:
+        image: 图像
+        compression: PNG压缩级别(0~9), 级别越低越快
+
+    Returns:
+        bytes: PNG数据
+    """
+    if isinstance(image, Image.Image):
+        if image.mode == "1":
+            image = image.convert("L")
+        image = np.asarray(image)
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+    ok, buffer = cv2.imencode(".png", image, [cv2.IMWRITE_PNG_COMPRESSION, compression])
+    if not ok:
+        raise ValueError("PNG编码失败")
+    return buffer.tobytes()
+
+
+class FlightRecorder:
+    """
+    帧飞行记录器
+
+    保存各区域最近若干秒的原始截图、预处理后的图像和识别文本, 用于排查动作误触发。
+    识别线程只把图像对象交给记录器, PNG压缩在后台线程中完成; 压缩后的帧按时间
+    和内存预算淘汰, 可以随时或在出错时保存到磁盘。
+    """
+
+    def __init__(self, seconds=30, memory_budget_mb=64, queue_size=32):
+        """
+        初始化飞行记录器
+
+        Args:
+            seconds: 保留最近多少秒的帧
+            memory_budget_mb: 压缩后帧的内存预算(MB)
+            queue_size: 等待压缩的帧数上限, 超出时丢弃新帧
+        """
+        self.seconds = seconds
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.frames = deque()
+        self.bytes = 0
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def configure(self, seconds=None, memory_budget_mb=None):
+        """修改保留时长和内存预算"""
+        with self._lock:
+            if seconds is not None:
+                self.seconds = seconds
+            if memory_budget_mb is not None:
+                self.memory_budget = memory_budget_mb * 1024 * 1024
+            self._evict(time.time())
+
+    def record(self, region_id, raw, processed, text):
+        """
+        记录一帧, 只把对象放入队列, 不在调用线程中压缩
+
+        Args:
+            region_id: 区域标识
+            raw: 原始截图(PIL.Image或ndarray), 之后不能再被修改
+            processed: 预处理后的图像, 没有时为None
+            text: 识别文本
+        """
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((time.time(), region_id, raw, processed, text))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def flush(self, timeout=5):
+        """等待队列中的帧全部压缩完成"""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def snapshot(self, region_id=None):
+        """
+        获取当前保存的帧
+
+        Args:
+            region_id: 只返回该区域的帧, 为None时返回全部
+
+        Returns:
+            list: RecordedFrame列表, 按时间顺序排列
+        """
+        with self._lock:
+            return [frame for frame in self.frames if region_id is None or frame.region_id == region_id]
+
+    def dump(self, directory, reason=""):
+        """
+        把当前保存的帧写入磁盘
+
+        每次保存创建一个以时间命名的子目录, 包括各帧的原始截图、预处理图像和index.json。
+
+        Args:
+            directory: 保存的根目录
+            reason: 保存原因, 写入index.json
+
+        Returns:
+            str: 本次保存的目录, 没有帧时返回空字符串
+        """
+        self.flush()
+        frames = self.snapshot()
+        if not frames:
+            return ""
+
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(directory, f"flight-{stamp}")
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(directory, f"flight-{stamp}-{suffix}")
+        os.makedirs(path)
+
+        index = []
+        for number, frame in enumerate(frames):
+            name = f"{number:05d}_{frame.region_id}"
+            entry = {
+                "time": frame.timestamp,
+                "region": frame.region_id,
+                "text": frame.text,
+                "raw": f"{name}_raw.png",
+            }
+            with open(os.path.join(path, entry["raw"]), "wb") as f:
+                f.write(frame.raw)
+            if frame.processed is not None:
+                entry["processed"] = f"{name}_processed.png"
+                with open(os.path.join(path, entry["processed"]), "wb") as f:
+                    f.write(frame.processed)
+            index.append(entry)
+
+        with open(os.path.join(path, "index.json"), "w", encoding="utf-8") as f:
+            json.dump({"reason": reason, "dumped_at": time.time(), "frames": index}, f, ensure_ascii=False, indent=2)
+        return path
+
+    def get_stats(self):
+        """
+        获取记录器状态
+
+        Returns:
+            dict: {"frames", "bytes", "dropped", "pending"}
+        """
+        with self._lock:
+            return {
+                "frames": len(self.frames),
+                "bytes": self.bytes,
+                "dropped": self.dropped,
+                "pending": self._queue.qsize(),
+            }
+
+    def clear(self):
+        with self._lock:
+            self.frames.clear()
+            self.bytes = 0
+
+    def stop(self, timeout=5):
+        """停止后台压缩线程"""
+        with self._thread_lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ocr-flight-recorder", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """后台压缩线程"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                timestamp, region_id, raw, processed, text = item
+                frame = RecordedFrame(
+                    timestamp,
+                    region_id,
+                    encode_png(raw),
+                    encode_png(processed) if processed is not None else None,
+                    text,
+                )
+                with self._lock:
+                    self.frames.append(frame)
+                    self.bytes += frame.size
+                    self._evict(time.time())
+            except Exception:
+                # 记录失败不能影响识别, 这一帧直接丢弃
+                with self._lock:
+                    self.dropped += 1
+            finally:
+                self._queue.task_done()
+
+    def _evict(self, now):
+        """淘汰超出时长或内存预算的最旧帧(调用方需持有锁)"""
+        while self.frames and (now - self.frames[0].timestamp > self.seconds or self.bytes > self.memory_budget):
+            self.bytes -= self.frames.popleft().size
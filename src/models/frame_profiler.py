@@ -0,0 +1,236 @@
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import Counter
+
+
+PROFILER_MODES = ("cprofile", "sample")
+
+# 线程停在这些文件中时处于等待状态(锁、队列、线程池取任务), 采样时不计入调用栈
+IDLE_FILES = ("threading.py", "queue.py", "thread.py")
+
+
+def format_frame(code):
+    """把代码对象格式化为"函数名 (文件名:行号)", 用于折叠栈"""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class FrameProfiler:
+    """
+    按需开启的识别循环性能分析器
+
+    未开启时识别线程只多检查一次active属性。开启后在固定帧数或时长内采集数据, 结束时
+    写入文件:
+    - cprofile: 用cProfile分析识别帧, 输出pstats文件。cProfile同一时刻只能分析一个线程,
+      多个工作线程同时识别时只分析其中之一, 其余帧照常运行、不计入帧数。
+    - sample: 后台线程定时读取各识别线程(线程名以ocr-开头)的调用栈, 输出折叠栈文件,
+      可直接交给flamegraph.pl或speedscope。对识别线程没有侵入, 流水线模式下也能看到各阶段。
+    """
+
+    def __init__(self, sample_interval=0.005, thread_prefix="ocr-"):
+        """
+        初始化性能分析器
+
+        Args:
+            sample_interval: 采样模式下的采样间隔(秒)
+            thread_prefix: 采样模式下只采集线程名以此开头的线程
+        """
+        self.sample_interval = sample_interval
+        self.thread_prefix = thread_prefix
+        self.active = False
+        self.mode = None
+        self.frames = 0
+        self.max_frames = 0
+        self.directory = "."
+        self.on_finish = None
+        self.last_output = ""
+        self._profile = None
+        self._profile_lock = threading.Lock()
+        self._samples = Counter()
+        self._idle_samples = 0
+        self._sampler = None
+        self._stop_event = threading.Event()
+        self._timer = None
+        self._started = 0.0
+        self._lock = threading.Lock()
+
+    def start(self, mode="cprofile", frames=100, seconds=30, directory="profiles"):
+        """
+        开始采集
+
+        Args:
+            mode: cprofile或sample
+            frames: 采集多少帧后结束, 0表示不限
+            seconds: 采集多少秒后结束, 0表示不限(此时需要手动调用stop)
+            directory: 输出目录
+
+        Returns:
+            bool: 是否已开始, 已经在采集时返回False
+        """
+        if mode not in PROFILER_MODES:
+            raise ValueError(f"未知的性能分析模式: {mode}")
+        with self._lock:
+            if self.active:
+                return False
+            self.mode = mode
+            self.frames = 0
+            self.max_frames = frames
+            self.directory = directory
+            self._started = time.time()
+            if mode == "cprofile":
+                self._profile = cProfile.Profile()
+            else:
+                self._samples = Counter()
+                self._idle_samples = 0
+                self._stop_event.clear()
+                self._sampler = threading.Thread(target=self._sample_loop, name="frame-profiler", daemon=True)
+                self._sampler.start()
+            if seconds:
+                self._timer = threading.Timer(seconds, self.stop)
+                self._timer.daemon = True
+                self._timer.start()
+            self.active = True
+        return True
+
+    def call(self, func, *args):
+        """
+        在采集期间运行一帧, 由识别线程在active为True时调用
+
+        Args:
+            func: 处理一帧的函数
+            args: 函数的参数
+        """
+        counted = True
+        if self.mode == "cprofile":
+            counted = self._profile_lock.acquire(blocking=False)
+            if counted:
+                profile = self._profile
+                try:
+                    if profile is not None:
+                        profile.enable()
+                    try:
+                        return func(*args)
+                    finally:
+                        if profile is not None:
+                            profile.disable()
+                finally:
+                    self._profile_lock.release()
+                    self._frame_done()
+        try:
+            return func(*args)
+        finally:
+            if counted:
+                self._frame_done()
+
+    def _frame_done(self):
+        """累计帧数, 达到上限时结束采集"""
+        with self._lock:
+            self.frames += 1
+            finished = self.active and self.max_frames and self.frames >= self.max_frames
+        if finished:
+            self.stop()
+
+    def stop(self):
+        """
+        结束采集并写入文件
+
+        Returns:
+            str: 输出文件路径, 未在采集时返回空字符串
+        """
+        with self._lock:
+            if not self.active:
+                return ""
+            self.active = False
+            mode = self.mode
+            frames = self.frames
+            timer, self._timer = self._timer, None
+            sampler, self._sampler = self._sampler, None
+        if timer is not None:
+            timer.cancel()
+
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started))
+        if mode == "cprofile":
+            # 等待正在分析的一帧结束
+            with self._profile_lock:
+                profile, self._profile = self._profile, None
+            path = os.path.join(self.directory, f"profile-{stamp}.pstats")
+            profile.dump_stats(path)
+        else:
+            self._stop_event.set()
+            if sampler is not None and sampler is not threading.current_thread():
+                sampler.join()
+            path = os.path.join(self.directory, f"profile-{stamp}.collapsed")
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in sorted(self._samples.items()):
+                    f.write(f"{stack} {count}\n")
+
+        self.last_output = path
+        callback = self.on_finish
+        if callback is not None:
+            callback(path, mode, frames)
+        return path
+
+    def toggle(self, **options):
+        """未在采集时开始采集, 否则结束采集"""
+        if self.active:
+            self.stop()
+            return False
+        return self.start(**options)
+
+    def _sample_loop(self):
+        """采样线程, 定时记录各识别线程的调用栈"""
+        own = threading.get_ident()
+        while not self._stop_event.wait(self.sample_interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                name = names.get(ident, "")
+                if ident == own or not name.startswith(self.thread_prefix):
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in IDLE_FILES:
+                    self._idle_samples += 1
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(format_frame(frame.f_code))
+                    frame = frame.f_back
+                # 线程池的线程名带序号, 去掉序号后同类线程合并在一起
+                stack.append(name.rstrip("_0123456789-"))
+                self._samples[";".join(reversed(stack))] += 1
+
+    def get_stats(self):
+        """
+        获取采集状态
+
+        Returns:
+            dict: {"active", "mode", "frames", "samples", "idle_samples", "last_output"}
+        """
+        with self._lock:
+            return {
+                "active": self.active,
+                "mode": self.mode,
+                "frames": self.frames,
+                "samples": sum(self._samples.values()),
+                "idle_samples": self._idle_samples,
+                "last_output": self.last_output,
+            }
+
+
+def summarize_pstats(path, limit=10):
+    """
+    读取pstats文件, 按累计耗时列出最耗时的函数
+
+    Args:
+        path: pstats文件路径
+        limit: 列出的函数数量
+
+    Returns:
+        str: 文本摘要
+    """
+    stream = io.StringIO()
+    pstats.Stats(path, stream=stream).strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,127 @@
+import os
+import re
+import shutil
+import hashlib
+import tempfile
+import threading
+
+
+def build_whitelist(keywords):
+    """
+    由关键字生成字符白名单
+
+    Args:
+        keywords: 关键字列表
+
+    Returns:
+        str: 关键字中出现过的全部非空白字符, 按码位排序
+    """
+    return "".join(sorted({char for keyword in keywords for char in keyword if not char.isspace()}))
+
+
+def build_patterns(keywords):
+    """
+    由关键字生成Tesseract的user-patterns
+
+    每个关键字本身作为一条模式; 含数字的关键字再生成一条把数字串替换为任意位数字的模式,
+    例如"Error 404"同时匹配"Error 500"。
+
+    Args:
+        keywords: 关键字列表
+
+    Returns:
+        list: 模式列表
+    """
+    patterns = []
+    for keyword in keywords:
+        escaped = keyword.replace("\\", "\\\\")
+        for pattern in (escaped, re.sub(r"\d+", r"\\d\\*", escaped)):
+            if pattern not in patterns:
+                patterns.append(pattern)
+    return patterns
+
+
+class KeywordConstraint:
+    """
+    关键字约束识别
+
+    根据动作规则中的关键字生成字符白名单、user-words文件和user-patterns文件,
+    以Tesseract参数的形式传给识别引擎, 只需检测已知短语的区域不必做开放词表识别。
+    文件名包含内容的哈希, 关键字变化后参数随之变化, 引擎池会按新参数创建引擎。
+    """
+
+    def __init__(self, directory=None):
+        """
+        初始化关键字约束
+
+        Args:
+            directory: 存放user-words和user-patterns文件的目录, 为None时使用临时目录
+        """
+        self._directory = directory
+        self._owns_directory = directory is None
+        self.keywords = []
+        self.variables = {}
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        """是否有可用的关键字"""
+        return bool(self.variables)
+
+    def update(self, keywords):
+        """
+        按新的关键字重新生成约束
+
+        Args:
+            keywords: 关键字列表
+
+        Returns:
+            bool: 约束是否发生变化
+        """
+        keywords = [keyword.strip() for keyword in keywords if keyword and keyword.strip()]
+        with self._lock:
+            if keywords == self.keywords:
+                return False
+            self.keywords = keywords
+            previous, self.variables = self.variables, {}
+            if keywords:
+                words = sorted({word for keyword in keywords for word in keyword.split()})
+                self.variables = {
+                    "tessedit_char_whitelist": build_whitelist(keywords),
+                    "user_words_file": self._write("user-words", words),
+                    "user_patterns_file": self._write("user-patterns", build_patterns(keywords)),
+                }
+            self._remove_unused(previous)
+            return True
+
+    def _write(self, prefix, lines):
+        """写入一个每行一项的文件, 内容相同时复用已有文件"""
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="ocr_box_keywords_")
+        content = "\n".join(lines) + "\n"
+        digest = hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+        path = os.path.join(self._directory, f"{prefix}-{digest}.txt")
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+        return path
+
+    def _remove_unused(self, previous):
+        """删除上一组约束中不再使用的文件(调用方需持有锁)"""
+        in_use = {self.variables.get(name) for name in ("user_words_file", "user_patterns_file")}
+        for name in ("user_words_file", "user_patterns_file"):
+            path = previous.get(name)
+            if path and path not in in_use:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def cleanup(self):
+        """删除自动创建的临时目录"""
+        with self._lock:
+            if self._owns_directory and self._directory:
+                shutil.rmtree(self._directory, ignore_errors=True)
+                self._directory = None
+            self.keywords = []
+            self.variables = {}
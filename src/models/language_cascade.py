@@ -0,0 +1,116 @@
+import threading
+
+
+# 没有实测耗时时的语言相对耗时, 英文模型最小, 中文模型字符集大、识别慢
+DEFAULT_LANGUAGE_COST = {"eng": 1.0, "chi_sim": 2.0, "chi_tra": 2.5}
+
+
+def split_languages(lang):
+    """
+    拆分组合语言
+
+    Args:
+        lang: 语言代码, 例如'chi_sim+chi_tra+eng'
+
+    Returns:
+        list: 单个语言的列表
+    """
+    return [part for part in lang.split("+") if part]
+
+
+class LanguageCascade:
+    """
+    语言级联
+
+    组合语言模型比单个语言慢数倍, 而大多数画面只包含一种语言。级联时先用单个语言识别,
+    平均置信度达到阈值即采用, 否则再用组合模型识别。每个区域分别统计各语言被采用的次数
+    和耗时: 区域上一次被采用的语言排在最前, 其余按采用率从高到低、耗时从低到高排列。
+    组合语言始终作为最后的兜底, 结果直接采用。
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def order(self, key, lang):
+        """
+        获取区域本帧依次尝试的单个语言
+
+        Args:
+            key: 区域标识
+            lang: 组合语言代码
+
+        Returns:
+            list: 单个语言的列表, 不含组合语言本身
+        """
+        languages = split_languages(lang)
+        with self._lock:
+            stats = self._stats.get(key, {})
+            last = self._last.get(key)
+
+            def rank(language):
+                # 采用率做拉普拉斯平滑, 未尝试过的语言按50%计, 采用率持续偏低的语言仍有机会被尝试;
+                # 采用率相同时未尝试过的语言排在前面, 再按耗时排列
+                item = stats.get(language)
+                if not item or not item["attempts"]:
+                    return (-0.5, 0, DEFAULT_LANGUAGE_COST.get(language, 2.0))
+                rate = (item["hits"] + 1) / (item["attempts"] + 2)
+                return (-rate, 1, item["total_time"] / item["attempts"])
+
+            ordered = sorted(languages, key=rank)
+        if last in ordered:
+            ordered.remove(last)
+            ordered.insert(0, last)
+        return ordered
+
+    def record(self, key, language, accepted, elapsed):
+        """
+        记录一次尝试
+
+        Args:
+            key: 区域标识
+            language: 本次使用的语言(单个语言或组合语言)
+            accepted: 结果是否被采用
+            elapsed: 识别耗时(秒)
+        """
+        with self._lock:
+            item = self._stats.setdefault(key, {}).setdefault(
+                language, {"attempts": 0, "hits": 0, "total_time": 0.0})
+            item["attempts"] += 1
+            item["hits"] += bool(accepted)
+            item["total_time"] += elapsed
+            if accepted and "+" not in language:
+                self._last[key] = language
+            elif not accepted and self._last.get(key) == language:
+                self._last.pop(key, None)
+
+    def reset(self, key=None):
+        """清除一个区域(key为None时为全部区域)的统计"""
+        with self._lock:
+            if key is None:
+                self._stats.clear()
+                self._last.clear()
+            else:
+                self._stats.pop(key, None)
+                self._last.pop(key, None)
+
+    def get_stats(self):
+        """
+        获取各区域各语言的统计
+
+        Returns:
+            dict: 区域标识 -> {语言: {"attempts", "hits", "mean_time"}}
+        """
+        with self._lock:
+            return {
+                key: {
+                    language: {
+                        "attempts": item["attempts"],
+                        "hits": item["hits"],
+                        "mean_time": item["total_time"] / item["attempts"] if item["attempts"] else 0.0,
+                    }
+                    for language, item in stats.items()
+                }
+                for key, stats in self._stats.items()
+            }
@@ -0,0 +1,316 @@
+import os
+import shlex
+import threading
+from collections import OrderedDict
+
+import pytesseract
+from PIL import Image, ImageDraw
+
+try:
+    # tesserocr直接调用libtesseract, 模型常驻内存, 是真正意义上的"热"引擎
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+from src.utils.tesseract_finder import TesseractFinder
+from src.models.ocr_result import OCRResult
+
+
+# 无法读取语言数据文件大小时, 每种语言按此估算内存占用(字节)
+DEFAULT_LANG_MEMORY = 30 * 1024 * 1024
+# 模型加载后的内存占用相对于traineddata文件大小的估算倍数
+MEMORY_FACTOR = 2
+
+
+class TesseractEngine:
+    """
+    一个按(语言, PSM, OEM, 参数)初始化好的Tesseract识别引擎
+
+    安装了tesserocr时使用常驻内存的PyTessBaseAPI, 切换配置无需重新加载模型;
+    否则退回到pytesseract, 每次识别启动一个tesseract子进程。
+    """
+
+    def __init__(self, lang, psm, oem, variables=None, tessdata_dir=""):
+        """
+        初始化识别引擎
+
+        Args:
+            lang: 语言代码, 例如'chi_sim+eng'
+            psm: 页面分割模式
+            oem: OCR引擎模式
+            variables: Tesseract参数字典, 对应命令行的-c选项
+            tessdata_dir: 语言数据目录, 为空时使用Tesseract默认目录
+        """
+        self.lang = lang
+        self.psm = psm
+        self.oem = oem
+        self.variables = dict(variables or {})
+        self.tessdata_dir = tessdata_dir
+        self.key = make_engine_key(lang, psm, oem, self.variables)
+        self.memory_cost = self._estimate_memory()
+        # PyTessBaseAPI不是线程安全的, 同一引擎的调用需要串行
+        self._lock = threading.Lock()
+        self._api = None
+
+        if tesserocr is not None:
+            # 参数在初始化时传入, user_words_file等只在初始化时读取的参数才能生效
+            kwargs = {
+                "lang": lang,
+                "psm": psm,
+                "oem": oem,
+                "variables": {name: str(value) for name, value in self.variables.items()},
+            }
+            if tessdata_dir:
+                kwargs["path"] = tessdata_dir
+            self._api = tesserocr.PyTessBaseAPI(**kwargs)
+
+    @property
+    def config_string(self):
+        """pytesseract使用的配置字符串"""
+        config = f'-l {self.lang} --psm {self.psm} --oem {self.oem}'
+        for name, value in self.variables.items():
+            # 白名单等参数值可能包含引号或反斜杠, 需要转义
+            config += f' -c {name}={shlex.quote(str(value))}'
+        return config
+
+    def image_to_string(self, image):
+        """
+        识别图像中的文字
+
+        Args:
+            image: PIL.Image对象
+
+        Returns:
+            str: 识别出的文字
+        """
+        with self._lock:
+            if self._api is not None:
+                self._api.SetImage(image)
+                return self._api.GetUTF8Text()
+        return pytesseract.image_to_string(image, config=self.config_string)
+
+    def image_to_data(self, image):
+        """
+        识别图像中的文字, 同时返回每个单词的位置和置信度
+
+        Args:
+            image: PIL.Image对象
+
+        Returns:
+            dict: 与pytesseract.Output.DICT相同格式的结果, 包括level、block_num、
+                par_num、line_num、word_num、left、top、width、height、conf、text
+        """
+        with self._lock:
+            if self._api is not None:
+                self._api.SetImage(image)
+                self._api.Recognize()
+                return parse_tsv(self._api.GetTSVText(0), header=False)
+        return pytesseract.image_to_data(image, config=self.config_string, output_type=pytesseract.Output.DICT)
+
+    def recognize(self, image):
+        """
+        识别图像, 一次调用同时得到文字、单词位置和置信度
+
+        Args:
+            image: PIL.Image对象
+
+        Returns:
+            OCRResult: 结构化的识别结果
+        """
+        return OCRResult.from_data(self.image_to_data(image))
+
+    def warm_up(self):
+        """用一张虚拟图像跑一次识别, 让模型加载和文件缓存提前完成"""
+        image = Image.new("L", (96, 32), 255)
+        ImageDraw.Draw(image).text((4, 8), "OCR", fill=0)
+        self.image_to_string(image)
+
+    def close(self):
+        """释放引擎占用的资源"""
+        with self._lock:
+            if self._api is not None:
+                self._api.End()
+                self._api = None
+
+    def _estimate_memory(self):
+        """根据语言数据文件大小估算引擎的内存占用"""
+        total = 0
+        for lang in self.lang.split("+"):
+            path = os.path.join(self.tessdata_dir, f"{lang}.traineddata") if self.tessdata_dir else ""
+            try:
+                total += os.path.getsize(path) * MEMORY_FACTOR
+            except OSError:
+                total += DEFAULT_LANG_MEMORY
+        return total
+
+
+# Tesseract TSV输出的列
+TSV_COLUMNS = ["level", "page_num", "block_num", "par_num", "line_num", "word_num",
+               "left", "top", "width", "height", "conf", "text"]
+
+
+def parse_tsv(tsv, header=True):
+    """
+    解析Tesseract的TSV输出
+
+    Args:
+        tsv: TSV文本
+        header: 第一行是否为列名
+
+    Returns:
+        dict: 列名 -> 值列表, 与pytesseract.Output.DICT格式相同
+    """
+    data = {column: [] for column in TSV_COLUMNS}
+    rows = tsv.splitlines()[1 if header else 0:]
+    for row in rows:
+        values = row.split("\t")
+        if len(values) < len(TSV_COLUMNS) - 1:
+            continue
+        if len(values) < len(TSV_COLUMNS):
+            values.append("")
+        for column, value in zip(TSV_COLUMNS[:-2], values):
+            data[column].append(int(value))
+        data["conf"].append(float(values[10]))
+        data["text"].append(values[11])
+    return data
+
+
+def make_engine_key(lang, psm, oem, variables=None):
+    """
+    生成引擎池使用的键
+
+    Args:
+        lang: 语言代码
+        psm: 页面分割模式
+        oem: OCR引擎模式
+        variables: Tesseract参数字典
+
+    Returns:
+        tuple: (lang, psm, oem, 排序后的参数元组)
+    """
+    return (lang, int(psm), int(oem), tuple(sorted((variables or {}).items())))
+
+
+class EnginePool:
+    """
+    识别引擎池, 按(语言, PSM, OEM, 参数)缓存已初始化的引擎
+
+    超出内存预算时按最近最少使用(LRU)的顺序淘汰引擎。
+    """
+
+    def __init__(self, memory_budget_mb=512):
+        """
+        初始化引擎池
+
+        Args:
+            memory_budget_mb: 引擎池的内存预算(MB)
+        """
+        self.memory_budget = memory_budget_mb * 1024 * 1024
+        self.tessdata_dir = ""
+        self._engines = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def persistent(self):
+        """引擎是否常驻内存(安装了tesserocr); pytesseract每次识别都启动新的子进程, 预热没有意义"""
+        return tesserocr is not None
+
+    def set_tesseract_path(self, path):
+        """
+        切换Tesseract时清空引擎池, 并重新定位语言数据目录
+
+        Args:
+            path: Tesseract可执行文件路径
+        """
+        try:
+            tessdata_dir = TesseractFinder.find_tessdata_dir(path)
+        except OSError:
+            tessdata_dir = ""
+        with self._lock:
+            self.tessdata_dir = tessdata_dir
+        self.clear()
+
+    def get(self, lang, psm, oem, variables=None, instance=0):
+        """
+        获取指定配置的引擎, 不存在时创建
+
+        Args:
+            lang: 语言代码
+            psm: 页面分割模式
+            oem: OCR引擎模式
+            variables: Tesseract参数字典
+            instance: 实例编号, 需要并行识别时为每个线程使用不同的实例
+
+        Returns:
+            TesseractEngine: 识别引擎
+        """
+        key = (make_engine_key(lang, psm, oem, variables), instance)
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is not None:
+                self._engines.move_to_end(key)
+                return engine
+
+        # 引擎初始化较慢, 放在锁外进行
+        engine = TesseractEngine(lang, psm, oem, variables, self.tessdata_dir)
+        with self._lock:
+            existing = self._engines.get(key)
+            if existing is not None:
+                evicted = [engine]
+                engine = existing
+                self._engines.move_to_end(key)
+            else:
+                self._engines[key] = engine
+                evicted = self._evict()
+        for old in evicted:
+            old.close()
+        return engine
+
+    def warm_up(self, configs):
+        """
+        预热一组引擎配置, 已在池中的引擎不会重复预热
+
+        Args:
+            configs: (lang, psm, oem, variables)元组的列表
+
+        Returns:
+            list: 预热失败的(配置, 错误信息)列表
+        """
+        failures = []
+        for config in configs:
+            with self._lock:
+                if (make_engine_key(*config), 0) in self._engines:
+                    continue
+            try:
+                self.get(*config).warm_up()
+            except Exception as e:
+                failures.append((config, str(e)))
+        return failures
+
+    def memory_usage(self):
+        """返回池中引擎估算的总内存占用(字节)"""
+        with self._lock:
+            return sum(engine.memory_cost for engine in self._engines.values())
+
+    def keys(self):
+        """返回池中引擎的(配置键, 实例编号), 按最近使用顺序排列(最近使用的在最后)"""
+        with self._lock:
+            return list(self._engines.keys())
+
+    def clear(self):
+        """关闭并移除所有引擎"""
+        with self._lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+        for engine in engines:
+            engine.close()
+
+    def _evict(self):
+        """淘汰最久未使用的引擎直到满足内存预算, 至少保留一个引擎(调用方需持有锁)"""
+        evicted = []
+        usage = sum(engine.memory_cost for engine in self._engines.values())
+        while usage > self.memory_budget and len(self._engines) > 1:
+            _, engine = self._engines.popitem(last=False)
+            usage -= engine.memory_cost
+            evicted.append(engine)
+        return evicted
@@ -0,0 +1,275 @@
+import time
+import threading
+from collections import deque
+
+
+# 队列满时的处理策略
+POLICY_BLOCK = "block"  # 阻塞上游, 直到队列有空位
+POLICY_DROP_OLDEST = "drop_oldest"  # 丢弃队列中最旧的帧
+POLICY_DROP_NEWEST = "drop_newest"  # 丢弃新来的帧
+POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST)
+
+
+class BoundedQueue:
+    """
+    有界队列, 队列满时按背压策略阻塞或丢弃帧
+    """
+
+    def __init__(self, maxsize=2, policy=POLICY_DROP_OLDEST):
+        """
+        初始化有界队列
+
+        Args:
+            maxsize: 队列容量
+            policy: 队列满时的处理策略, 取值见POLICIES
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"未知的队列策略: {policy}")
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self.dropped = 0
+        self.peak = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def put(self, item):
+        """
+        放入一个元素
+
+        Args:
+            item: 元素
+
+        Returns:
+            bool: 是否放入成功(队列关闭或按策略丢弃时为False)
+        """
+        with self._cond:
+            while len(self._items) >= self.maxsize and not self._closed:
+                if self.policy == POLICY_DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.policy == POLICY_DROP_OLDEST:
+                    self._items.popleft()
+                    self.dropped += 1
+                    break
+                self._cond.wait()
+            if self._closed:
+                return False
+            self._items.append(item)
+            self.peak = max(self.peak, len(self._items))
+            self._cond.notify_all()
+            return True
+
+    def get(self):
+        """
+        取出一个元素, 队列为空时等待
+
+        Returns:
+            元素, 队列关闭且为空时返回None
+        """
+        with self._cond:
+            while not self._items and not self._closed:
+                self._cond.wait()
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """关闭队列, 唤醒所有等待的线程"""
+        with self._cond:
+            self._closed = True
+            self._items.clear()
+            self._cond.notify_all()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class PipelineStage:
+    """
+    流水线中的一个阶段, 由一个或多个线程从输入队列取帧处理后放入输出队列
+    """
+
+    def __init__(self, name, func, input_queue, output_queue=None, workers=1):
+        """
+        初始化流水线阶段
+
+        Args:
+            name: 阶段名称
+            func: 处理函数, 参数为帧, 返回None表示不再向下游传递
+            input_queue: 输入队列
+            output_queue: 输出队列, 最后一个阶段为None
+            workers: 线程数
+        """
+        self.name = name
+        self.func = func
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.workers = workers
+        self.processed = 0
+        self.busy_time = 0.0
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        self._threads = [
+            threading.Thread(target=self._run, name=f"ocr-{self.name}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while True:
+            frame = self.input_queue.get()
+            if frame is None:
+                return
+            start = time.monotonic()
+            result = self.func(frame)
+            with self._lock:
+                self.processed += 1
+                self.busy_time += time.monotonic() - start
+            if result is not None and self.output_queue is not None:
+                self.output_queue.put(result)
+
+
+class OCRFrame:
+    """在流水线各阶段之间传递的一帧"""
+
+    __slots__ = ("region", "seq", "config", "captured_at", "image", "processed", "result")
+
+    def __init__(self, region, seq, config, image):
+        self.region = region
+        self.seq = seq
+        self.config = config
+        self.captured_at = time.monotonic()
+        self.image = image
+        self.processed = None
+        self.result = None
+
+
+class OCRPipeline:
+    """
+    截图/预处理/识别/输出流水线
+
+    截图在调度器的工作线程中完成后放入预处理队列, 预处理、识别和输出各自在
+    独立的线程(池)中运行, 阶段之间通过有界队列连接。这样截取第N+1帧时,
+    第N帧可以同时在识别。
+    """
+
+    def __init__(self, processor, queue_size=2, policy=POLICY_DROP_OLDEST, recognize_workers=2):
+        """
+        初始化流水线
+
+        Args:
+            processor: OCRProcessor实例, 提供各阶段的处理逻辑
+            queue_size: 各阶段输入队列的容量
+            policy: 队列满时的处理策略
+            recognize_workers: 识别阶段的线程数
+        """
+        self.processor = processor
+        self.queues = {
+            "preprocess": BoundedQueue(queue_size, policy),
+            "recognize": BoundedQueue(queue_size, policy),
+            "emit": BoundedQueue(queue_size, policy),
+        }
+        self.stages = [
+            PipelineStage("preprocess", self._preprocess, self.queues["preprocess"], self.queues["recognize"]),
+            PipelineStage("recognize", self._recognize, self.queues["recognize"], self.queues["emit"],
+                          workers=recognize_workers),
+            PipelineStage("emit", self._emit, self.queues["emit"]),
+        ]
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        # 各区域最近输出的帧序号, 多线程识别时丢弃乱序到达的旧帧
+        self._emitted = {}
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def stop(self, timeout=10):
+        """关闭所有队列并等待各阶段线程退出"""
+        for q in self.queues.values():
+            q.close()
+        for stage in self.stages:
+            stage.join(timeout)
+
+    def submit(self, region, config, image):
+        """
+        把截好的一帧放入流水线
+
+        Args:
+            region: OCRRegion实例
+            config: 区域的OCR配置
+            image: 截图
+
+        Returns:
+            bool: 是否放入成功
+        """
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+        return self.queues["preprocess"].put(OCRFrame(region, seq, config, image))
+
+    def get_stats(self):
+        """
+        获取各阶段的队列占用和处理统计
+
+        Returns:
+            dict: 阶段名称 -> {"queued", "capacity", "peak", "dropped", "processed", "busy_time"}
+        """
+        return {
+            stage.name: {
+                "queued": len(stage.input_queue),
+                "capacity": stage.input_queue.maxsize,
+                "peak": stage.input_queue.peak,
+                "dropped": stage.input_queue.dropped,
+                "processed": stage.processed,
+                "busy_time": stage.busy_time,
+            }
+            for stage in self.stages
+        }
+
+    def _preprocess(self, frame):
+        try:
+            # 启用文字检测时在识别阶段裁剪文字行后再预处理
+            if not frame.config["text_detection"]["enabled"]:
+                frame.processed = self.processor.preprocess_image(frame.image, frame.config, frame.region.region_id)
+        except Exception as e:
+            self.processor.report_error(f"OCR处理错误: {str(e)}")
+            return None
+        return frame
+
+    def _recognize(self, frame):
+        try:
+            region_id = frame.region.region_id
+            if frame.processed is not None:
+                frame.result = self.processor.recognize_processed(frame.processed, frame.config, region_id)
+            else:
+                frame.result = self.processor.recognize_image(frame.image, frame.config, region_id)
+        except Exception as e:
+            self.processor.report_error(f"OCR识别错误: {str(e)}")
+            return None
+        return frame
+
+    def _emit(self, frame):
+        region_id = frame.region.region_id
+        if frame.seq < self._emitted.get(region_id, 0):
+            return None
+        self._emitted[region_id] = frame.seq
+        try:
+            self.processor.record_frame(frame.region, frame.image, frame.processed, frame.result)
+            self.processor.emit_result(frame.region, frame.result)
+        except Exception as e:
+            # 与其他阶段一样只丢弃这一帧, 输出阶段的线程继续运行
+            self.processor.report_error(f"OCR输出错误: {str(e)}")
+        return None
@@ -1,10 +1,54 @@
+import os
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import pytesseract
-from PIL import ImageGrab, ImageEnhance, ImageFilter, Image
+from PIL import ImageEnhance, ImageFilter, Image
 import cv2
 import numpy as np
-from src.models.action_handler import ActionHandler
+from src.models.text_scale_estimator import TextScaleEstimator
+from src.models.ocr_engine import EnginePool
+from src.models.text_delta import TextDiffer
+from src.models.ocr_region import OCRRegion
+from src.models.ocr_scheduler import EDFScheduler
+from src.models.capture_source import ScreenCaptureSource
+from src.models.capture_coordinator import CaptureCoordinator
+from src.models.text_detector import TextDetector, boxes_area
+from src.models.line_segmenter import LineSegmenter
+from src.models.ocr_pipeline import OCRPipeline
+from src.models.ocr_result import OCRResult
+from src.models.temporal_consensus import TemporalConsensus
+from src.models.keyword_constraint import KeywordConstraint
+from src.models.template_matcher import TemplateMatcher
+from src.models.flight_recorder import FlightRecorder
+from src.models.frame_profiler import FrameProfiler, summarize_pstats
+from src.models.event_publisher import EventPublisher, DEFAULT_SOCKET
+from src.models.color_key import isolate_text
+from src.models.language_cascade import LanguageCascade, split_languages
+from src.models.scroll_tracker import ScrollTracker, scale_result
+from src.models.cpu_governor import CPUGovernor
+from src.models.batch_preprocess import SHARPEN_KERNEL, iter_chunks, preprocess_stack
+
+# 修改设置后等待多久再预热引擎(秒), 连续修改只预热一次
+PREWARM_DELAY = 0.3
+
+# 透明窗口对应的主区域标识
+MAIN_REGION_ID = "主区域"
+
+# 预处理档位: quality为逐帧高质量识别, balanced和fast配合多帧一致性投票使用
+PREPROCESSING_PROFILES = {
+    "quality": {"contrast": 1.5, "sharpen": True, "denoise": True, "threshold": False, "scale_factor": 2.0},
+    "balanced": {"contrast": 1.5, "sharpen": False, "denoise": False, "threshold": True, "scale_factor": 1.2},
+    "fast": {"contrast": 1.0, "sharpen": False, "denoise": False, "threshold": True, "scale_factor": 1.0},
+}
+
+
+def to_pil(image):
+    """把RGB格式的ndarray转换为PIL.Image, PIL.Image原样返回"""
+    if isinstance(image, Image.Image):
+        return image
+    return Image.fromarray(np.ascontiguousarray(image))
+
 
 class OCRProcessor:
     """
@@ -32,6 +76,8 @@ class OCRProcessor:
             "lang": "chi_sim",  # 语言设置
             "psm": 11,  # 页面分割模式: 6 - 假设为单一文本块
             "oem": 3,  # OCR引擎模式: 3 - 默认, 使用LSTM
+            "variables": {},  # 额外的Tesseract参数, 对应命令行的-c选项
+            "prewarm_langs": [],  # 启动时额外预热的语言
             "image_preprocessing": {
                 "enabled": True,  # 是否启用图像预处理
                 "contrast": 1.5,  # 对比度增强倍数
@@ -39,13 +85,241 @@ class OCRProcessor:
                 "denoise": False,  # 是否降噪
                 "threshold": True,  # 是否进行二值化处理
                 "scale_factor": 1.2,  # 放大倍数以提高识别准确率
+                "auto_scale": False,  # 是否根据文字高度自动确定缩放倍数
+            },
+            "color_key": {
+                "enabled": False,  # 是否只保留指定颜色的文字(如红色警告), 启用后替代对比度增强和二值化
+                "keys": [],  # HSV颜色范围列表, 每项为(h1, s1, v1, h2, s2, v2), 一般在区域配置中设置
+                "cleanup": 0,  # 去除孤立噪点的开运算核大小, 0表示不处理
+            },
+            "language_cascade": {
+                "enabled": False,  # 组合语言时是否先用单个语言识别, 置信度不足再用组合模型
+                "min_confidence": 70,  # 单个语言结果被采用的最低平均单词置信度(0~100)
+                "attempts": 1,  # 用组合模型前最多尝试几个单个语言
+            },
+            "scroll_detection": {
+                "enabled": False,  # 是否检测滚动, 内容整体上下移动时只识别新露出的条带(流水线模式下不生效)
+            },
+            "text_detection": {
+                "enabled": False,  # 是否在OCR前检测文字, 只识别检测到的文字行
+                "line_psm": 7,  # 识别文字行时使用的页面分割模式: 7 - 单行文本
+            },
+            "line_parallel": {
+                "enabled": False,  # 是否把图像切分成文字行并行识别
+                "psm": 7,  # 识别单行时使用的页面分割模式
+                "min_confidence": 0.6,  # 切分可信度低于该值时退回整块识别
+                "workers": min(4, os.cpu_count() or 1),  # 并行识别的线程数
+            },
+            "pipeline": {
+                "enabled": False,  # 是否以流水线方式运行截图/预处理/识别/输出, 重新启动OCR后生效
+                "queue_size": 2,  # 各阶段输入队列的容量
+                "policy": "drop_oldest",  # 队列满时的策略: block、drop_oldest、drop_newest
+                "recognize_workers": 2,  # 识别阶段的线程数
+            },
+            "capture": {
+                "coalesce": True,  # 同时到期的多个区域是否只截取一次外接矩形
+            },
+            "consensus": {
+                "enabled": False,  # 是否对最近几帧的识别结果投票后再输出
+                "frames": 5,  # 参与投票的帧数
+                "min_stability": 0.6,  # 稳定度低于该值时保持上一次输出的文本
+            },
+            "keyword_constraint": {
+                "enabled": False,  # 是否只按动作规则中的关键字识别(字符白名单、user-words、user-patterns)
+            },
+            "template_matching": {
+                "enabled": True,  # 是否先用参考图像匹配关键字(已登记参考图像时), 匹配到时直接触发动作并跳过OCR
+            },
+            "flight_recorder": {
+                "enabled": False,  # 是否在内存中保留最近的截图、预处理图像和识别文本
+                "seconds": 30,  # 保留最近多少秒
+                "memory_mb": 64,  # 压缩后帧的内存预算
+                "dump_on_error": True,  # 识别出错时是否自动保存到磁盘
+                "directory": "flight_records",  # 保存目录
+            },
+            "profiler": {
+                "mode": "cprofile",  # 性能分析方式: cprofile - 输出pstats, sample - 采样调用栈并输出折叠栈
+                "frames": 100,  # 分析多少帧后自动结束, 0表示不限
+                "seconds": 30,  # 分析多少秒后自动结束, 0表示不限
+                "directory": "profiles",  # 输出目录
+            },
+            "publisher": {
+                "enabled": False,  # 是否通过Unix域套接字向其他进程发布识别结果和关键字命中
+                "socket": DEFAULT_SOCKET,  # 套接字路径
+                "queue_size": 256,  # 每个订阅者最多排队的事件数
+                "policy": "skip",  # 订阅者读取过慢时的策略: skip - 跳过事件后重新同步, disconnect - 断开
+            },
+            "cpu_budget": {
+                "percent": 0,  # 本进程及tesseract子进程的CPU占用上限(占全部核心的百分比), 0表示不限制
+                "window": 5,  # 统计CPU占用的窗口(秒)
             }
         }
+        
+        # 自动缩放时使用的文字高度估计器
+        self.scale_estimator = TextScaleEstimator()
+        
+        # 已初始化的识别引擎池, 切换语言和模式时无需重新加载模型
+        self.engine_pool = EnginePool()
+        # 后台预热线程(同一时间最多一个)及是否有待处理的预热请求
+        self.prewarm_thread = None
+        self.prewarm_pending = False
+        self.prewarm_lock = threading.Lock()
+        
+        # 行级差异计算器, 只把变化的行发给界面和匹配逻辑
+        self.text_differ = TextDiffer()
+        
+        # 组合语言的级联识别统计
+        self.language_cascade = LanguageCascade()
+        
+        # 滚动感知识别的跟踪器
+        self.scroll_tracker = ScrollTracker()
+        
+        # 多帧一致性投票器
+        self.consensus = TemporalConsensus()
+        
+        # 由动作规则的关键字生成的识别约束
+        self.keyword_constraint = KeywordConstraint()
+        
+        # 关键字参考图像的模板匹配器, 及各区域上一帧匹配到的关键字
+        self.template_matcher = TemplateMatcher()
+        self.template_hits = {}
+        
+        # 最近画面的飞行记录器, 以及上一次出错时自动保存的时间
+        self.flight_recorder = FlightRecorder()
+        self.last_error_dump = 0.0
+        
+        # 按需开启的性能分析器, 未开启时不影响识别
+        self.profiler = FrameProfiler()
+        self.profiler.on_finish = self.on_profile_finished
+        
+        # 向其他进程发布识别事件的发布端(启用时创建)
+        self.publisher = None
+        
+        # CPU预算控制器, 及其当前生效的降级设置(未降级时为None)
+        self.cpu_governor = CPUGovernor()
+        self.cpu_settings = None
+        # 降级前的OMP_THREAD_LIMIT环境变量, 恢复时还原
+        self.omp_limit = None
+        
+        # 截图来源, 测试时可替换为合成画面
+        self.capture_source = ScreenCaptureSource()
+        
+        # 把同时到期的多个区域合并成一次截图的合并器
+        self.capture_coordinator = CaptureCoordinator(self.capture_source)
+        
+        # 识别区域和按截止时间调度区域的调度器
+        self.regions = {}
+        self.scheduler = EDFScheduler(self.get_region_interval, capture_fn=self.capture_regions)
+        # 用户设置的识别线程数, CPU预算控制器降级时实际线程数可能更少
+        self.max_workers = self.scheduler.max_workers
+        
+        # 文字检测器及各区域跳过/识别面积的统计
+        self.text_detector = TextDetector()
+        self.detection_stats = {}
+        self.stats_lock = threading.Lock()
+        
+        # 行切分器和并行识别文字行的线程池(按需创建)
+        self.line_segmenter = LineSegmenter()
+        self.line_executor = None
+        self.line_executor_workers = 0
+        self.line_executor_lock = threading.Lock()
+        
+        # 流水线模式下的截图/预处理/识别/输出流水线
+        self.pipeline = None
     
     def set_tesseract_path(self, path):
         """设置Tesseract路径"""
         self.tesseract_path = path
         pytesseract.pytesseract.tesseract_cmd = path
+        self.engine_pool.set_tesseract_path(path)
+    
+    def get_engine_configs(self):
+        """
+        获取需要预热的引擎配置
+        
+        Returns:
+            list: (lang, psm, oem, variables)元组的列表
+        """
+        configs = []
+        variables = self.get_engine_variables(self.config)
+        langs = [self.config["lang"]] + list(self.config["prewarm_langs"])
+        if self.config["language_cascade"]["enabled"]:
+            langs += split_languages(self.config["lang"])
+        for lang in langs:
+            config = (lang, self.config["psm"], self.config["oem"], variables)
+            if config not in configs:
+                configs.append(config)
+        return configs
+    
+    def prewarm_engines(self):
+        """
+        在后台线程中预热已配置的引擎, 避免第一帧承担模型加载开销
+        
+        连续修改设置时只保留一个预热线程, 正在预热时再次调用会在本轮结束后按最新配置再预热一轮。
+        只有pytesseract时引擎不常驻内存, 不做任何事。
+        """
+        if not self.tesseract_path or not self.engine_pool.persistent:
+            return
+        with self.prewarm_lock:
+            self.prewarm_pending = True
+            if self.prewarm_thread is not None:
+                return
+            thread = threading.Thread(target=self._prewarm_loop, name="ocr-prewarm", daemon=True)
+            self.prewarm_thread = thread
+        thread.start()
+    
+    def _prewarm_loop(self):
+        """预热线程: 等设置稳定后预热, 直到没有新的预热请求"""
+        while True:
+            # 界面上连续切换选项时, 等最后一次修改后再预热
+            time.sleep(PREWARM_DELAY)
+            with self.prewarm_lock:
+                if not self.prewarm_pending:
+                    self.prewarm_thread = None
+                    return
+                self.prewarm_pending = False
+            for config, error in self.engine_pool.warm_up(self.get_engine_configs()):
+                self.signals.error_message.emit(f"预热OCR引擎失败({config[0]}): {error}")
+    
+    def get_engine(self, config=None, instance=0):
+        """
+        获取配置对应的识别引擎
+        
+        Args:
+            config: OCR配置, 为None时使用全局配置
+            instance: 引擎实例编号, 并行识别时每个线程使用不同的实例
+            
+        Returns:
+            TesseractEngine: 识别引擎
+        """
+        config = config or self.config
+        variables = self.get_engine_variables(config)
+        return self.engine_pool.get(config["lang"], config["psm"], config["oem"], variables, instance)
+    
+    def get_engine_variables(self, config):
+        """
+        获取配置对应的Tesseract参数, 启用关键字约束时加上约束生成的参数
+        
+        Args:
+            config: OCR配置
+            
+        Returns:
+            dict: Tesseract参数
+        """
+        constraint = self.keyword_constraint
+        if not config["keyword_constraint"]["enabled"] or not constraint.active:
+            return config["variables"]
+        return {**config["variables"], **constraint.variables}
+    
+    def set_keywords(self, keywords):
+        """
+        动作规则的关键字变化时重新生成关键字约束
+        
+        Args:
+            keywords: 关键字列表
+        """
+        if self.keyword_constraint.update(keywords) and self.keyword_constraint.active:
+            self.signals.log_message.emit(f"关键字约束已更新: {len(self.keyword_constraint.keywords)}个关键字")
     
     def set_language(self, lang):
         """
@@ -71,108 +345,921 @@ class OCRProcessor:
                 else:
                     self.config[key] = value
     
-    def preprocess_image(self, image):
+    def apply_profile(self, name):
+        """
+        应用预处理档位
+        
+        Args:
+            name: 档位名称, 取值见PREPROCESSING_PROFILES
+        """
+        if name not in PREPROCESSING_PROFILES:
+            raise ValueError(f"未知的预处理档位: {name}")
+        self.config["image_preprocessing"].update(PREPROCESSING_PROFILES[name])
+    
+    def get_scale_factor(self, img_cv, key=None, config=None):
+        """
+        获取图像预处理的缩放倍数
+        
+        Args:
+            img_cv: OpenCV格式(BGR)的图像
+            key: 文字高度估计的缓存键
+            config: OCR配置, 为None时使用全局配置
+            
+        Returns:
+            float: 缩放倍数
+        """
+        preprocessing = (config or self.config)["image_preprocessing"]
+        if not preprocessing["auto_scale"]:
+            return preprocessing["scale_factor"]
+        return self.scale_estimator.estimate_scale(img_cv, preprocessing["scale_factor"], key)
+    
+    def preprocess_image(self, image, config=None, key=None):
         """
         对图像进行预处理以提高OCR识别准确率
         
         Args:
-            image: PIL.Image对象
+            image: PIL.Image对象或RGB格式的ndarray
+            config: OCR配置, 为None时使用全局配置
+            key: 区域标识, 用于区分各区域的缓存
             
         Returns:
             PIL.Image: 预处理后的图像
         """
-        if not self.config["image_preprocessing"]["enabled"]:
-            return image
+        preprocessing = (config or self.config)["image_preprocessing"]
+        if not preprocessing["enabled"]:
+            return to_pil(image)
         
         # 转换为OpenCV格式以便进行更复杂的图像处理
-        img_cv = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
+        img_cv = cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
         
-        # 放大图像
-        scale = self.config["image_preprocessing"]["scale_factor"]
+        # 缩放图像
+        scale = self.get_scale_factor(img_cv, key, config)
         if scale > 1.0:
             img_cv = cv2.resize(img_cv, None, fx=scale, fy=scale, interpolation=cv2.INTER_CUBIC)
+        elif scale < 1.0:
+            img_cv = cv2.resize(img_cv, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        
+        # 按颜色键提取文字, 直接得到干净的二值图像
+        color_key = (config or self.config)["color_key"]
+        if color_key["enabled"] and color_key["keys"]:
+            return Image.fromarray(isolate_text(img_cv, color_key["keys"], color_key["cleanup"]))
         
         # 降噪
-        if self.config["image_preprocessing"]["denoise"]:
+        if preprocessing["denoise"]:
             img_cv = cv2.fastNlMeansDenoisingColored(img_cv, None, 10, 10, 7, 21)
         
         # 锐化
-        if self.config["image_preprocessing"]["sharpen"]:
-            kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-            img_cv = cv2.filter2D(img_cv, -1, kernel)
+        if preprocessing["sharpen"]:
+            img_cv = cv2.filter2D(img_cv, -1, SHARPEN_KERNEL)
         
         # 转回PIL格式
         image = Image.fromarray(cv2.cvtColor(img_cv, cv2.COLOR_BGR2RGB))
         
         # 增强对比度
-        contrast = self.config["image_preprocessing"]["contrast"]
+        contrast = preprocessing["contrast"]
         if contrast != 1.0:
             enhancer = ImageEnhance.Contrast(image)
             image = enhancer.enhance(contrast)
         
         # 二值化处理
-        if self.config["image_preprocessing"]["threshold"]:
+        if preprocessing["threshold"]:
             image = image.convert('L')  # 转换为灰度图
             image = image.point(lambda x: 0 if x < 128 else 255, '1')
         
         return image
     
+    def get_batch_scales(self, frames, config=None, key=None):
+        """
+        获取一批画面各自的缩放倍数
+        
+        启用自动缩放时按顺序逐帧估计, 文字高度估计缓存的更新与逐帧调用preprocess_image相同。
+        
+        Args:
+            frames: (N, H, W, 3)的RGB格式ndarray
+            config: OCR配置, 为None时使用全局配置
+            key: 区域标识, 用于区分各区域的缓存
+            
+        Returns:
+            list: 每一帧的缩放倍数
+        """
+        preprocessing = (config or self.config)["image_preprocessing"]
+        if not preprocessing["enabled"]:
+            return [1.0] * len(frames)
+        if not preprocessing["auto_scale"]:
+            return [preprocessing["scale_factor"]] * len(frames)
+        return [self.get_scale_factor(cv2.cvtColor(frame, cv2.COLOR_RGB2BGR), key, config) for frame in frames]
+    
+    def preprocess_batch(self, frames, config=None, key=None):
+        """
+        批量预处理一组同样大小的画面, 结果与逐帧调用preprocess_image完全一致
+        
+        整批画面必须使用相同的缩放倍数才能放在一个数组中; 启用自动缩放时各帧估计出的倍数
+        可能不同, 这时应使用iter_preprocess_batches, 它按倍数把画面分成多批。
+        
+        Args:
+            frames: (N, H, W, 3)的RGB格式ndarray
+            config: OCR配置, 为None时使用全局配置
+            key: 区域标识, 用于区分各区域的缓存
+            
+        Returns:
+            ndarray: 预处理后的画面, 格式见batch_preprocess.preprocess_stack
+            
+        Raises:
+            ValueError: 各帧的缩放倍数不同
+        """
+        config = config or self.config
+        frames = np.asarray(frames)
+        scales = self.get_batch_scales(frames, config, key)
+        if len(set(scales)) > 1:
+            raise ValueError(f"整批画面的缩放倍数不同: {sorted(set(scales))}, 请使用iter_preprocess_batches")
+        scale = scales[0] if scales else 1.0
+        return preprocess_stack(frames, config["image_preprocessing"], scale, config["color_key"])
+    
+    def iter_preprocess_batches(self, frames, chunk_size=32, config=None, key=None):
+        """
+        分批预处理画面序列, 每次只在内存中保留一批
+        
+        启用自动缩放时, 一批中缩放倍数不同的画面按连续相同倍数拆成多批产生, 每批内部
+        倍数相同, 各批的画面尺寸可能不同; 画面顺序不变。
+        
+        Args:
+            frames: (N, H, W, 3)的ndarray, 或逐帧产生同样大小RGB画面的可迭代对象(如回放文件的读取生成器)
+            chunk_size: 每批的帧数
+            config: OCR配置, 为None时使用全局配置
+            key: 区域标识, 用于区分各区域的缓存
+            
+        Returns:
+            generator: 逐批产生预处理后的画面, 格式见batch_preprocess.preprocess_stack
+        """
+        config = config or self.config
+        for chunk in iter_chunks(frames, chunk_size):
+            scales = self.get_batch_scales(chunk, config, key)
+            start = 0
+            for end in range(1, len(chunk) + 1):
+                if end == len(chunk) or scales[end] != scales[start]:
+                    yield preprocess_stack(chunk[start:end], config["image_preprocessing"], scales[start],
+                                           config["color_key"])
+                    start = end
+    
+    def get_region_config(self, region):
+        """
+        获取区域的OCR配置(全局配置叠加区域自己的覆盖参数)
+        
+        Args:
+            region: OCRRegion实例
+            
+        Returns:
+            dict: OCR配置
+        """
+        settings = self.cpu_settings
+        profile = settings["profile"] if settings else None
+        if not region.config and not profile:
+            return self.config
+        config = dict(self.config)
+        for key, value in region.config.items():
+            if isinstance(value, dict) and isinstance(config.get(key), dict):
+                config[key] = {**config[key], **value}
+            else:
+                config[key] = value
+        if profile:
+            # CPU预算控制器降低了预处理档位
+            config["image_preprocessing"] = {**config["image_preprocessing"], **PREPROCESSING_PROFILES[profile]}
+        return config
+    
+    def get_region_interval(self, region):
+        """获取区域的识别周期(秒), CPU预算控制器降级时按区域优先级放大"""
+        interval = region.interval or self.interval
+        settings = self.cpu_settings
+        if settings is None:
+            return interval
+        top_priority = max((r.priority for r in self.regions.values()), default=0)
+        return interval * (settings["top_factor"] if region.priority >= top_priority else settings["low_factor"])
+    
+    def add_region(self, region):
+        """
+        添加或替换一个识别区域
+        
+        Args:
+            region: OCRRegion实例
+        """
+        self.regions[region.region_id] = region
+        self.scheduler.add_region(region)
+    
+    def remove_region(self, region_id):
+        """移除一个识别区域"""
+        self.regions.pop(region_id, None)
+        self.scheduler.remove_region(region_id)
+        self.text_differ.reset(region_id)
+        self.scale_estimator.reset(region_id)
+        self.consensus.reset(region_id)
+        self.scroll_tracker.reset(region_id)
+        self.language_cascade.reset(region_id)
+        self.template_hits.pop(region_id, None)
+        with self.stats_lock:
+            self.detection_stats.pop(region_id, None)
+    
+    def update_region(self, region_id, **params):
+        """
+        更新区域的调度参数
+        
+        Args:
+            region_id: 区域标识
+            **params: interval、priority、max_staleness等参数
+        """
+        region = self.regions.get(region_id)
+        if region is None:
+            return
+        for name, value in params.items():
+            setattr(region, name, value)
+        self.scheduler.reschedule(region_id)
+    
+    def set_capture_source(self, capture_source):
+        """
+        设置截图来源
+        
+        Args:
+            capture_source: 提供grab(bbox)方法的对象, 返回PIL.Image
+        """
+        self.capture_source = capture_source
+        self.capture_coordinator.source = capture_source
+    
+    def capture_regions(self, regions):
+        """
+        为同时到期的多个区域合并截图
+        
+        Args:
+            regions: OCRRegion列表
+            
+        Returns:
+            dict: 区域标识 -> RGB格式的ndarray截图, 未启用合并时为空字典
+        """
+        if not self.enabled or not self.config["capture"]["coalesce"]:
+            return {}
+        return self.capture_coordinator.capture({region.region_id: region.get_bbox() for region in regions})
+    
+    def set_template_matcher(self, template_matcher):
+        """
+        设置模板匹配器, 与动作处理器共用同一套参考图像
+        
+        Args:
+            template_matcher: TemplateMatcher实例
+        """
+        self.template_matcher = template_matcher
+    
+    def match_templates(self, region, image, config):
+        """
+        用参考图像查找关键字, 新出现的关键字通过template_matched信号交给主线程执行动作
+        
+        Args:
+            region: OCRRegion实例
+            image: 截图
+            config: 区域的OCR配置
+            
+        Returns:
+            bool: 是否匹配到关键字(匹配到时本帧不再OCR)
+        """
+        matcher = self.template_matcher
+        if not config["template_matching"]["enabled"] or not len(matcher):
+            return False
+        keywords = [keyword for keyword, _, _ in matcher.match(image)]
+        previous = self.template_hits.get(region.region_id, ())
+        self.template_hits[region.region_id] = keywords
+        # 关键字持续显示时只在第一次出现时触发
+        new_keywords = [keyword for keyword in keywords if keyword not in previous]
+        if new_keywords:
+            self.signals.template_matched.emit(region.region_id, new_keywords)
+            publisher = self.publisher
+            if publisher is not None:
+                publisher.publish_match(region.region_id, publisher.next_seq(region.region_id), new_keywords,
+                                        "template")
+        return bool(keywords)
+    
+    def get_capture_stats(self):
+        """
+        获取截图合并统计
+        
+        Returns:
+            dict: {"ticks", "regions", "grabs", "saved", "grabbed_pixels", "used_pixels"}
+        """
+        return self.capture_coordinator.get_stats()
+    
+    def set_max_workers(self, max_workers):
+        """设置同时进行识别的最大线程数"""
+        self.max_workers = max_workers
+        settings = self.cpu_settings
+        if settings and settings["workers"]:
+            max_workers = min(max_workers, settings["workers"])
+        self.scheduler.set_max_workers(max_workers)
+    
+    def get_preprocessing_profile(self):
+        """获取全局预处理设置对应的档位名称, 与任何档位都不一致时返回None"""
+        preprocessing = self.config["image_preprocessing"]
+        for name, profile in PREPROCESSING_PROFILES.items():
+            if all(preprocessing.get(key) == value for key, value in profile.items()):
+                return name
+        return None
+    
+    def get_cpu_baseline(self):
+        """
+        获取未降级时的设置, 供CPU预算控制器生成降级步骤
+        
+        Returns:
+            dict: {"workers", "profile", "omp_limit", "has_low_priority"}
+        """
+        priorities = {region.priority for region in self.regions.values()}
+        return {
+            "workers": self.max_workers,
+            "profile": self.get_preprocessing_profile(),
+            "omp_limit": os.environ.get("OMP_THREAD_LIMIT"),
+            "has_low_priority": len(priorities) > 1,
+        }
+    
+    def apply_cpu_settings(self, settings, message):
+        """
+        应用CPU预算控制器的降级设置(在控制器线程中调用)
+        
+        Args:
+            settings: 降级设置, 格式见cpu_governor.settings_for_level
+            message: 调整说明
+        """
+        degraded = settings["omp_limit"] or settings["profile"] or settings["workers"] or \
+            settings["top_factor"] > 1.0 or settings["low_factor"] > 1.0
+        # OMP_THREAD_LIMIT只影响之后启动的tesseract子进程; tesserocr在加载时已确定线程数
+        if settings["omp_limit"]:
+            if self.cpu_settings is None or not self.cpu_settings["omp_limit"]:
+                self.omp_limit = os.environ.get("OMP_THREAD_LIMIT")
+            os.environ["OMP_THREAD_LIMIT"] = settings["omp_limit"]
+        elif self.cpu_settings is not None and self.cpu_settings["omp_limit"]:
+            if self.omp_limit is None:
+                os.environ.pop("OMP_THREAD_LIMIT", None)
+            else:
+                os.environ["OMP_THREAD_LIMIT"] = self.omp_limit
+        self.cpu_settings = settings if degraded else None
+        self.set_max_workers(self.max_workers)
+        for region_id in list(self.regions):
+            self.scheduler.reschedule(region_id)
+        self.signals.log_message.emit(message)
+    
+    def set_cpu_budget(self, percent):
+        """
+        设置CPU预算, 识别运行中时立即生效
+        
+        Args:
+            percent: CPU占用上限(占全部核心的百分比), 0表示不限制
+        """
+        self.config["cpu_budget"]["percent"] = percent
+        if self.enabled:
+            self.update_cpu_governor()
+    
+    def update_cpu_governor(self):
+        """按config["cpu_budget"]启动、调整或停止CPU预算控制器"""
+        options = self.config["cpu_budget"]
+        governor = self.cpu_governor
+        if options["percent"] <= 0:
+            governor.stop()
+        elif governor.active:
+            governor.budget = options["percent"]
+        else:
+            governor.window = options["window"]
+            governor.start(options["percent"], self.get_cpu_baseline, self.apply_cpu_settings)
+    
+    def get_cpu_stats(self):
+        """
+        获取CPU预算控制状态
+        
+        Returns:
+            dict: {"active", "budget", "usage", "level", "levels", "step"}
+        """
+        return self.cpu_governor.get_stats()
+    
+    def get_pipeline_stats(self):
+        """
+        获取流水线各阶段的队列占用, 未启用流水线时返回空字典
+        
+        Returns:
+            dict: 阶段名称 -> {"queued", "capacity", "peak", "dropped", "processed", "busy_time"}
+        """
+        pipeline = self.pipeline
+        return pipeline.get_stats() if pipeline is not None else {}
+    
+    def get_language_stats(self):
+        """
+        获取语言级联的统计
+        
+        Returns:
+            dict: 区域标识 -> {语言: {"attempts", "hits", "mean_time"}}
+        """
+        return self.language_cascade.get_stats()
+    
+    def get_region_stats(self):
+        """
+        获取各区域的调度统计, 包括截止时间错过次数
+        
+        Returns:
+            dict: 区域标识 -> {"runs", "misses", "shed", "last_latency"}
+        """
+        return self.scheduler.get_stats()
+    
     def start(self, transparent_window):
         """
         启动OCR识别
         
         Args:
-            transparent_window: 透明窗口实例, 用于获取OCR区域
+            transparent_window: 透明窗口实例, 用于获取主区域
         """
         if not self.tesseract_path:
             self.signals.error_message.emit("未设置Tesseract路径, 无法启动OCR")
             return False
         
+        # 确保上一次启动的调度线程已经退出, 避免同时存在多个识别循环
+        self.stop()
+        
+        # 没有透明窗口时只识别通过add_region添加的区域
         self.transparent_window = transparent_window
+        if transparent_window is not None:
+            main_region = self.regions.get(MAIN_REGION_ID)
+            if main_region is None:
+                self.add_region(OCRRegion(MAIN_REGION_ID, window=transparent_window))
+            else:
+                main_region.window = transparent_window
         self.enabled = True
         self.stop_thread = False
         
-        # 启动OCR线程
+        recorder_options = self.config["flight_recorder"]
+        self.flight_recorder.configure(recorder_options["seconds"], recorder_options["memory_mb"])
+        self.update_publisher()
+        self.update_cpu_governor()
+        
+        # 流水线模式下, 调度器的工作线程只负责截图
+        options = self.config["pipeline"]
+        if options["enabled"]:
+            self.pipeline = OCRPipeline(self, options["queue_size"], options["policy"], options["recognize_workers"])
+            self.pipeline.start()
+        
+        # 启动OCR调度线程, 停止标志在线程启动前清除, 之后调用的stop不会丢失
+        self.scheduler.start()
         self.ocr_thread = threading.Thread(target=self.ocr_job, daemon=True)
         self.ocr_thread.start()
         return True
     
-    def stop(self):
-        """停止OCR识别"""
+    def stop(self, timeout=10):
+        """
+        停止OCR识别, 等待调度线程和工作线程退出
+        
+        Args:
+            timeout: 等待线程退出的最长时间(秒)
+            
+        Returns:
+            bool: 线程是否已全部退出
+        """
         self.enabled = False
         self.stop_thread = True
+        self.scheduler.stop()
+        self.cpu_governor.stop()
         self.transparent_window = None
+        
+        thread = self.ocr_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+            if thread.is_alive():
+                self.signals.error_message.emit("OCR线程未能在规定时间内退出")
+                return False
+            self.ocr_thread = None
+        
+        # 调度线程退出后不会再有新的帧, 关闭流水线和行识别线程池
+        if self.pipeline is not None:
+            self.pipeline.stop(timeout)
+            self.pipeline = None
+        self.shutdown_line_executor()
+        self.flight_recorder.stop()
+        return True
     
     def set_interval(self, interval):
-        """设置OCR识别间隔"""
+        """设置全局OCR识别间隔, 未单独设置周期的区域使用该间隔"""
         self.interval = interval
+        for region_id in self.regions:
+            self.scheduler.reschedule(region_id)
     
     def ocr_job(self):
-        """OCR识别线程"""
-        while not self.stop_thread:
-            if self.enabled and self.transparent_window:
-                try:
-                    # 获取透明窗口的位置和大小
-                    rect = self.transparent_window.geometry()
-                    
-                    # 截取屏幕区域
-                    screenshot = ImageGrab.grab(bbox=(rect.x(), rect.y(), rect.x() + rect.width(), rect.y() + rect.height()))
-                    
-                    # 预处理图像
-                    processed_image = self.preprocess_image(screenshot)
-                    
-                    # 构建Tesseract配置
-                    custom_config = f'-l {self.config["lang"]} --psm {self.config["psm"]} --oem {self.config["oem"]}'
-                    
-                    # 执行OCR识别
-                    try:
-                        text = pytesseract.image_to_string(processed_image, config=custom_config)
-                        self.signals.text_detected.emit(text)
-                    except Exception as e:
-                        self.signals.error_message.emit(f"OCR识别错误: {str(e)}")
-
-                except Exception as e:
-                    self.signals.error_message.emit(f"OCR处理错误: {str(e)}")
+        """OCR调度线程, 按截止时间把各区域的识别任务派发到工作线程"""
+        self.scheduler.run(self.process_region)
+    
+    def process_region(self, region, frame=None):
+        """
+        对一个区域执行截图、预处理和识别, 性能分析开启时由分析器运行
+        
+        Args:
+            region: OCRRegion实例
+            frame: 已经合并截取的RGB截图(ndarray), 为None时单独截图
+        """
+        if self.profiler.active:
+            return self.profiler.call(self._process_region, region, frame)
+        return self._process_region(region, frame)
+    
+    def _process_region(self, region, frame=None):
+        """对一个区域执行截图、预处理和识别"""
+        if not self.enabled:
+            return
+        try:
+            # 截取屏幕区域
+            screenshot = frame if frame is not None else self.capture_source.grab(region.get_bbox())
+            config = self.get_region_config(region)
+            
+            # 参考图像匹配成功时直接触发动作, 不再运行Tesseract
+            if self.match_templates(region, screenshot, config):
+                return
+            
+            pipeline = self.pipeline
+            if pipeline is not None:
+                # 流水线模式下交给后续阶段处理, 本线程可以继续截取下一帧
+                pipeline.submit(region, config, screenshot)
+                return
+            
+            # 预处理并执行OCR识别
+            try:
+                if config["text_detection"]["enabled"]:
+                    processed = None
+                    result = self.recognize_image(screenshot, config, region.region_id)
+                elif config["scroll_detection"]["enabled"]:
+                    processed, result = self.recognize_scrolling(screenshot, config, region.region_id)
+                else:
+                    processed = self.preprocess_image(screenshot, config, region.region_id)
+                    result = self.recognize_processed(processed, config, region.region_id)
+                self.record_frame(region, screenshot, processed, result)
+                self.emit_result(region, result)
+            except Exception as e:
+                self.report_error(f"OCR识别错误: {str(e)}")
+        
+        except Exception as e:
+            self.report_error(f"OCR处理错误: {str(e)}")
+    
+    def start_profiling(self, mode=None, frames=None, seconds=None):
+        """
+        开始分析识别循环, 未指定的参数使用config["profiler"]中的设置
+        
+        Args:
+            mode: cprofile或sample
+            frames: 分析多少帧后结束
+            seconds: 分析多少秒后结束
+            
+        Returns:
+            bool: 是否已开始, 已经在分析时返回False
+        """
+        options = self.config["profiler"]
+        mode = mode or options["mode"]
+        started = self.profiler.start(
+            mode,
+            options["frames"] if frames is None else frames,
+            options["seconds"] if seconds is None else seconds,
+            options["directory"],
+        )
+        if started:
+            self.signals.log_message.emit(f"开始性能分析({mode})")
+        return started
+    
+    def stop_profiling(self):
+        """结束性能分析, 返回输出文件路径"""
+        return self.profiler.stop()
+    
+    def toggle_profiling(self):
+        """未在分析时开始分析, 否则结束分析(供界面按钮和SIGUSR1使用)"""
+        if self.profiler.active:
+            self.stop_profiling()
+            return False
+        return self.start_profiling()
+    
+    def on_profile_finished(self, path, mode, frames):
+        """性能分析结束后报告输出文件, cprofile模式下附带最耗时的函数"""
+        self.signals.log_message.emit(f"性能分析结束, 共{frames}帧, 已保存到: {os.path.abspath(path)}")
+        if mode == "cprofile" and frames:
+            try:
+                self.signals.log_message.emit(summarize_pstats(path))
+            except Exception as e:
+                self.signals.error_message.emit(f"读取性能分析结果失败: {str(e)}")
+    
+    def record_frame(self, region, image, processed, result):
+        """
+        把一帧交给飞行记录器, 压缩在记录器的后台线程中进行
+        
+        Args:
+            region: OCRRegion实例
+            image: 原始截图
+            processed: 预处理后的图像, 没有时为None
+            result: OCRResult识别结果
+        """
+        if self.config["flight_recorder"]["enabled"]:
+            self.flight_recorder.record(region.region_id, image, processed, result.text)
+    
+    def dump_flight_record(self, reason=""):
+        """
+        把飞行记录器中最近的帧保存到磁盘
+        
+        Args:
+            reason: 保存原因
+            
+        Returns:
+            str: 保存的目录, 没有可保存的帧时返回空字符串
+        """
+        return self.flight_recorder.dump(self.config["flight_recorder"]["directory"], reason)
+    
+    def report_error(self, message):
+        """
+        报告识别过程中的错误, 启用飞行记录器时在后台保存出错前的画面(每分钟最多一次)
+        
+        Args:
+            message: 错误信息
+        """
+        self.signals.error_message.emit(message)
+        options = self.config["flight_recorder"]
+        now = time.monotonic()
+        if not options["enabled"] or not options["dump_on_error"] or now - self.last_error_dump < 60:
+            return
+        self.last_error_dump = now
+        
+        def dump():
+            try:
+                path = self.dump_flight_record(message)
+                if path:
+                    self.signals.log_message.emit(f"已保存出错前的画面: {path}")
+            except Exception as e:
+                self.signals.error_message.emit(f"保存飞行记录失败: {str(e)}")
+        
+        threading.Thread(target=dump, daemon=True).start()
+    
+    def recognize_image(self, image, config, key=None):
+        """
+        预处理图像并识别文字
+        
+        启用文字检测时, 只把检测到的文字行裁剪出来识别, 没有文字的画面直接跳过。
+        
+        Args:
+            image: PIL.Image对象或RGB格式的ndarray
+            config: OCR配置
+            key: 区域标识
+            
+        Returns:
+            OCRResult: 结构化的识别结果, 坐标为预处理后图像上的坐标; 启用文字检测时为原画面坐标
+        """
+        detection = config["text_detection"]
+        if not detection["enabled"]:
+            return self.recognize_processed(self.preprocess_image(image, config, key), config, key)
+        
+        pixels = np.asarray(image)
+        boxes = self.text_detector.detect(cv2.cvtColor(pixels, cv2.COLOR_RGB2BGR))
+        self.record_detection(key, pixels.shape[0] * pixels.shape[1], boxes)
+        if not boxes:
+            return OCRResult.empty()
+        
+        # 裁剪出的已经是单行文字, 不再按行并行切分; 组合语言时同样经过语言级联
+        line_config = dict(config, psm=detection["line_psm"],
+                           line_parallel=dict(config["line_parallel"], enabled=False))
+        results = []
+        for x, y, w, h in boxes:
+            # 文字行裁剪图的字符高度各不相同, 不使用区域的估计缓存
+            processed_image = self.preprocess_image(pixels[y:y + h, x:x + w], config)
+            result = self.recognize_processed(processed_image, line_config, key)
+            # 各文字行的预处理倍数可能不同, 先换算回原画面的裁剪坐标再加上偏移
+            results.append(scale_result(result, w / processed_image.width, h / processed_image.height))
+        return OCRResult.concat(results, [(x, y) for x, y, _, _ in boxes])
+    
+    def recognize_scrolling(self, image, config, key=None):
+        """
+        滚动感知识别: 画面没有变化时沿用上一帧结果, 纯垂直滚动时只识别新露出的条带
+        
+        Args:
+            image: PIL.Image对象或RGB格式的ndarray
+            config: OCR配置
+            key: 区域标识
+            
+        Returns:
+            tuple: (实际识别的预处理图像或None, OCRResult), 结果坐标为原画面坐标
+        """
+        pixels = np.asarray(image)
+        height, width = pixels.shape[:2]
+        tracker = self.scroll_tracker
+        mode, plan = tracker.plan(key, pixels)
+        if mode == "unchanged":
+            tracker.store(key, plan, mode, 0, height)
+            return None, plan
+        
+        if mode == "scroll":
+            top, bottom = plan.strip_top, plan.strip_bottom
+        else:
+            top, bottom = 0, height
+        # 条带的尺寸每帧不同, 不使用区域的字符高度估计缓存
+        processed = self.preprocess_image(pixels[top:bottom], config, key if mode == "full" else None)
+        result = self.recognize_processed(processed, config, key)
+        result = scale_result(result, width / processed.width, (bottom - top) / processed.height, top)
+        if mode == "scroll":
+            result = plan.stitch(result)
+        tracker.store(key, result, mode, bottom - top, height)
+        return processed, result
+    
+    def get_scroll_stats(self):
+        """
+        获取滚动感知识别的统计
+        
+        Returns:
+            dict: {"unchanged", "scrolled", "full", "recognized_ratio"}
+        """
+        return self.scroll_tracker.get_stats()
+    
+    def recognize_processed(self, processed_image, config, key=None):
+        """
+        识别已预处理的图像
+        
+        Args:
+            processed_image: 预处理后的PIL.Image对象
+            config: OCR配置
+            key: 区域标识, 语言级联按区域统计各语言的采用情况
+            
+        Returns:
+            OCRResult: 结构化的识别结果
+        """
+        if config["language_cascade"]["enabled"] and "+" in config["lang"]:
+            return self.recognize_cascade(processed_image, config, key)
+        return self.recognize_single(processed_image, config)
+    
+    def recognize_cascade(self, processed_image, config, key=None):
+        """
+        先用单个语言识别, 平均置信度不足时再用组合语言识别
+        
+        Args:
+            processed_image: 预处理后的PIL.Image对象
+            config: OCR配置, lang为组合语言
+            key: 区域标识
+            
+        Returns:
+            OCRResult: 结构化的识别结果
+        """
+        options = config["language_cascade"]
+        cascade = self.language_cascade
+        for lang in cascade.order(key, config["lang"])[:max(0, options["attempts"])]:
+            start = time.perf_counter()
+            result = self.recognize_single(processed_image, dict(config, lang=lang))
+            elapsed = time.perf_counter() - start
+            # 没有文字的画面换用组合模型也识别不出内容, 直接采用, 但不计入该语言的统计
+            if not result.words.size:
+                return result
+            accepted = result.mean_confidence() >= options["min_confidence"]
+            cascade.record(key, lang, accepted, elapsed)
+            if accepted:
+                return result
+        
+        start = time.perf_counter()
+        result = self.recognize_single(processed_image, config)
+        cascade.record(key, config["lang"], True, time.perf_counter() - start)
+        return result
+    
+    def recognize_single(self, processed_image, config):
+        """用配置中的语言识别已预处理的图像(不经过语言级联)"""
+        if config["line_parallel"]["enabled"]:
+            return self.recognize_lines_parallel(processed_image, config)
+        return self.get_engine(config).recognize(processed_image)
+    
+    def emit_result(self, region, result):
+        """
+        发出一个区域的识别结果
+        
+        Args:
+            region: OCRRegion实例
+            result: OCRResult结构化识别结果
+        """
+        text = result.text
+        self.signals.result_detected.emit(region.region_id, result)
+        publisher = self.publisher
+        seq = publisher.next_seq(region.region_id) if publisher is not None else 0
+        
+        options = self.config["consensus"]
+        if options["enabled"]:
+            consensus = self.consensus.update(region.region_id, text, options["frames"])
+            self.signals.consensus_detected.emit(region.region_id, consensus)
+            if consensus.stability < options["min_stability"]:
+                # 结果还不稳定, 保持上一次输出的文本, 避免匹配来回跳动
+                return
+            text = consensus.text
+        
+        self.signals.text_detected.emit(region.region_id, text)
+        delta = self.text_differ.diff(text, region.region_id)
+        if delta is not None:
+            self.signals.text_delta.emit(delta)
+            if publisher is not None:
+                self.publish_delta(publisher, region, seq, delta)
+    
+    def publish_delta(self, publisher, region, seq, delta):
+        """
+        发布一个区域的文本变化, 以及新增行中出现的动作规则关键字
+        
+        Args:
+            publisher: EventPublisher实例
+            region: OCRRegion实例
+            seq: 本帧的序号
+            delta: TextDelta行级差异
+        """
+        publisher.publish_delta(region.region_id, seq, delta)
+        added = "\n".join(delta.added_lines)
+        hits = [keyword for keyword in self.keyword_constraint.keywords if keyword in added]
+        if hits:
+            publisher.publish_match(region.region_id, seq, hits)
+    
+    def update_publisher(self):
+        """按config["publisher"]启动、重建或关闭事件发布端"""
+        options = self.config["publisher"]
+        publisher = self.publisher
+        if publisher is not None and (not options["enabled"] or publisher.path != options["socket"]
+                                      or publisher.queue_size != options["queue_size"]
+                                      or publisher.policy != options["policy"]):
+            self.shutdown_publisher()
+            publisher = None
+        if options["enabled"] and publisher is None:
+            try:
+                publisher = EventPublisher(options["socket"], options["queue_size"], options["policy"])
+                publisher.start()
+                self.publisher = publisher
+                self.signals.log_message.emit(f"识别事件发布于: {options['socket']}")
+            except Exception as e:
+                self.signals.error_message.emit(f"启动事件发布失败: {str(e)}")
+    
+    def shutdown_publisher(self):
+        """关闭事件发布端并断开所有订阅者"""
+        publisher, self.publisher = self.publisher, None
+        if publisher is not None:
+            publisher.stop()
+    
+    def recognize_lines_parallel(self, processed_image, config):
+        """
+        把预处理后的图像切分成文字行, 在线程池中并行识别后按阅读顺序拼接
+        
+        切分可信度低或只有一行时, 退回到整块识别。
+        
+        Args:
+            processed_image: 预处理后的PIL.Image对象
+            config: OCR配置
             
-            # 等待指定间隔
-            time.sleep(self.interval)
\ No newline at end of file
+        Returns:
+            OCRResult: 结构化的识别结果
+        """
+        options = config["line_parallel"]
+        boxes, confidence = self.line_segmenter.segment(processed_image)
+        if len(boxes) < 2 or confidence < options["min_confidence"]:
+            return self.get_engine(config).recognize(processed_image)
+        
+        workers = max(1, options["workers"])
+        line_config = dict(config, psm=options["psm"])
+        
+        def recognize(index):
+            x, y, w, h = boxes[index]
+            engine = self.get_engine(line_config, index % workers)
+            return engine.recognize(processed_image.crop((x, y, x + w, y + h)))
+        
+        results = list(self.get_line_executor(workers).map(recognize, range(len(boxes))))
+        # 文字行直接从预处理后的图像裁剪, 不再缩放, 偏移与单词坐标同为预处理后图像的坐标
+        return OCRResult.concat(results, [(x, y) for x, y, _, _ in boxes])
+    
+    def get_line_executor(self, workers):
+        """获取并行识别文字行的线程池, 线程数变化时重新创建"""
+        with self.line_executor_lock:
+            executor = self.line_executor
+            if executor is None or self.line_executor_workers != workers:
+                if executor is not None:
+                    executor.shutdown(wait=False)
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-line")
+                self.line_executor = executor
+                self.line_executor_workers = workers
+            return executor
+    
+    def shutdown_line_executor(self):
+        """关闭并行识别文字行的线程池"""
+        with self.line_executor_lock:
+            executor, self.line_executor = self.line_executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def record_detection(self, key, frame_area, boxes):
+        """记录一帧的文字检测结果"""
+        with self.stats_lock:
+            stats = self.detection_stats.setdefault(
+                key, {"frames": 0, "skipped_frames": 0, "total_area": 0, "recognized_area": 0}
+            )
+            stats["frames"] += 1
+            stats["total_area"] += frame_area
+            if boxes:
+                stats["recognized_area"] += min(frame_area, boxes_area(boxes))
+            else:
+                stats["skipped_frames"] += 1
+    
+    def get_detection_stats(self):
+        """
+        获取各区域的文字检测统计
+        
+        Returns:
+            dict: 区域标识 -> {"frames", "skipped_frames", "total_area", "recognized_area", "skipped_ratio"}
+        """
+        with self.stats_lock:
+            result = {}
+            for key, stats in self.detection_stats.items():
+                item = dict(stats)
+                total = stats["total_area"]
+                item["skipped_ratio"] = 1 - stats["recognized_area"] / total if total else 0.0
+                result[key] = item
+            return result
@@ -0,0 +1,40 @@
+class OCRRegion:
+    """
+    一个OCR识别区域及其调度参数
+
+    区域的位置可以来自透明窗口(随窗口移动和缩放), 也可以是固定的屏幕坐标。
+    """
+
+    def __init__(self, region_id, window=None, bbox=None, interval=None, priority=0,
+                 max_staleness=None, config=None):
+        """
+        初始化OCR区域
+
+        Args:
+            region_id: 区域标识, 同时用作界面上显示的名称
+            window: 透明窗口实例, 为None时使用bbox
+            bbox: 固定的屏幕区域(left, top, right, bottom)
+            interval: 识别周期(秒), 为None时使用OCR处理器的全局间隔
+            priority: 优先级, 数值越大越重要, 过载时优先保证
+            max_staleness: 可接受的最大延迟(秒), 为None时等于识别周期
+            config: 覆盖全局OCR配置的参数, 例如{"lang": "eng"}
+        """
+        self.region_id = region_id
+        self.window = window
+        self.bbox = bbox
+        self.interval = interval
+        self.priority = priority
+        self.max_staleness = max_staleness
+        self.config = dict(config or {})
+
+    def get_bbox(self):
+        """
+        获取区域当前的屏幕坐标
+
+        Returns:
+            tuple: (left, top, right, bottom)
+        """
+        if self.window is not None:
+            rect = self.window.geometry()
+            return (rect.x(), rect.y(), rect.x() + rect.width(), rect.y() + rect.height())
+        return self.bbox
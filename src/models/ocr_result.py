@@ -0,0 +1,181 @@
+import numpy as np
+
+
+# 单词记录的紧凑存储格式
+WORD_DTYPE = np.dtype([
+    ("left", np.int32),
+    ("top", np.int32),
+    ("width", np.int32),
+    ("height", np.int32),
+    ("conf", np.float32),
+    ("line_id", np.int32),
+])
+
+
+class OCRResult:
+    """
+    结构化的OCR识别结果
+
+    单词的位置、置信度和所属行保存在NumPy结构化数组words中, 单词文本按相同顺序
+    保存在texts中。行号line_id按出现顺序从0开始编号。
+    """
+
+    __slots__ = ("words", "texts", "_text")
+
+    def __init__(self, words, texts):
+        """
+        Args:
+            words: WORD_DTYPE格式的结构化数组
+            texts: 与words一一对应的单词文本元组
+        """
+        self.words = words
+        self.texts = tuple(texts)
+        self._text = None
+
+    @classmethod
+    def empty(cls):
+        """没有任何单词的结果"""
+        return cls(np.zeros(0, dtype=WORD_DTYPE), ())
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        从Tesseract的单词级数据创建结果
+
+        Args:
+            data: pytesseract.Output.DICT格式的数据
+
+        Returns:
+            OCRResult: 只包含非空单词的结果
+        """
+        texts = [str(text).strip() for text in data["text"]]
+        level = np.asarray(data["level"], dtype=np.int32)
+        keep = np.flatnonzero((level == 5) & np.array([bool(text) for text in texts], dtype=bool))
+        if keep.size == 0:
+            return cls.empty()
+
+        words = np.empty(keep.size, dtype=WORD_DTYPE)
+        for column in ("left", "top", "width", "height"):
+            words[column] = np.asarray(data[column], dtype=np.int32)[keep]
+        words["conf"] = np.asarray(data["conf"], dtype=np.float32)[keep]
+
+        # (块, 段落, 行)组合成一个整数键, 按首次出现的顺序编号
+        keys = (
+            np.asarray(data["block_num"], dtype=np.int64)[keep] * 1000000
+            + np.asarray(data["par_num"], dtype=np.int64)[keep] * 1000
+            + np.asarray(data["line_num"], dtype=np.int64)[keep]
+        )
+        words["line_id"] = _appearance_ids(keys)
+        return cls(words, [texts[i] for i in keep])
+
+    @classmethod
+    def concat(cls, results, offsets=None):
+        """
+        按顺序拼接多个结果, 用于把分块识别的结果合并成一个
+
+        Args:
+            results: OCRResult列表
+            offsets: 每个结果在原图中的偏移(x, y)列表, 为None时不平移
+
+        Returns:
+            OCRResult: 合并后的结果, 行号依次续接
+        """
+        parts = []
+        texts = []
+        line_base = 0
+        for index, result in enumerate(results):
+            words = result.words.copy()
+            if offsets is not None:
+                words["left"] += offsets[index][0]
+                words["top"] += offsets[index][1]
+            words["line_id"] += line_base
+            line_base += result.line_count
+            parts.append(words)
+            texts.extend(result.texts)
+        if not parts:
+            return cls.empty()
+        return cls(np.concatenate(parts), texts)
+
+    def __len__(self):
+        return self.words.size
+
+    @property
+    def line_count(self):
+        """行数"""
+        return int(self.words["line_id"].max()) + 1 if self.words.size else 0
+
+    @property
+    def text(self):
+        """按行拼接的文本, 同一行的单词以空格分隔"""
+        if self._text is None:
+            lines = [[] for _ in range(self.line_count)]
+            for line_id, word in zip(self.words["line_id"].tolist(), self.texts):
+                lines[line_id].append(word)
+            self._text = "\n".join(" ".join(line) for line in lines)
+        return self._text
+
+    def mean_confidence(self):
+        """单词的平均置信度, 没有单词时为0"""
+        return float(self.words["conf"].mean()) if self.words.size else 0.0
+
+    def take(self, indices):
+        """
+        取出部分单词组成新的结果, 行号重新按顺序编号
+
+        Args:
+            indices: 单词下标数组或布尔掩码
+
+        Returns:
+            OCRResult: 新结果
+        """
+        indices = np.asarray(indices)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        words = self.words[indices]
+        if words.size:
+            words["line_id"] = _appearance_ids(words["line_id"])
+        return OCRResult(words, [self.texts[i] for i in indices.tolist()])
+
+    def filter(self, min_conf):
+        """
+        按置信度过滤单词
+
+        Args:
+            min_conf: 最低置信度(0~100)
+
+        Returns:
+            OCRResult: 只包含置信度不低于min_conf的单词的结果
+        """
+        mask = self.words["conf"] >= min_conf
+        if mask.all():
+            return self
+        return self.take(mask)
+
+    def to_dict(self):
+        """
+        转换为可JSON序列化的字典
+
+        Returns:
+            dict: {"text": 文本, "words": 单词列表}
+        """
+        words = [
+            {
+                "text": text,
+                "line": int(word["line_id"]),
+                "left": int(word["left"]),
+                "top": int(word["top"]),
+                "width": int(word["width"]),
+                "height": int(word["height"]),
+                "conf": round(float(word["conf"]), 2),
+            }
+            for word, text in zip(self.words, self.texts)
+        ]
+        return {"text": self.text, "words": words}
+
+
+def _appearance_ids(keys):
+    """把键数组映射为按首次出现顺序从0开始的编号"""
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    rank = np.empty(first.size, dtype=np.int32)
+    rank[np.argsort(first, kind="stable")] = np.arange(first.size, dtype=np.int32)
+    return rank[inverse]
@@ -0,0 +1,228 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+# 工作线程池的线程数上限, 实际并发数由max_workers控制
+MAX_POOL_SIZE = 16
+
+
+class RegionSchedule:
+    """单个区域的调度状态和统计"""
+
+    __slots__ = ("region", "release", "deadline", "running", "runs", "misses", "shed", "last_latency")
+
+    def __init__(self, region, release, deadline):
+        self.region = region
+        self.release = release
+        self.deadline = deadline
+        self.running = False
+        self.runs = 0
+        self.misses = 0
+        self.shed = 0
+        self.last_latency = 0.0
+
+
+class EDFScheduler:
+    """
+    最早截止时间优先(EDF)的区域调度器
+
+    每个区域按自己的周期释放识别任务, 截止时间为释放时间加上可接受的最大延迟。
+    空闲的工作线程总是先处理截止时间最早的任务; 任务多于空闲线程时,
+    已经超过截止时间的低优先级任务会被直接丢弃, 以保证高优先级区域。
+    同一次派发的多个任务可以先通过capture_fn一起截图, 再分别处理。
+    """
+
+    def __init__(self, period_fn, max_workers=2, capture_fn=None):
+        """
+        初始化调度器
+
+        Args:
+            period_fn: 根据区域返回其识别周期(秒)的函数
+            max_workers: 同时执行识别任务的最大线程数
+            capture_fn: 为同一次派发的多个区域一起截图的函数, 参数为OCRRegion列表,
+                返回区域标识 -> 截图的字典; 为None时各任务自行截图
+        """
+        self.period_fn = period_fn
+        self.max_workers = max_workers
+        self.capture_fn = capture_fn
+        # 任务完成时的回调, 参数为(区域标识, 释放时间, 开始时间, 完成时间), 用于负载测试等统计
+        self.listener = None
+        self._schedules = {}
+        self._running_count = 0
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+
+    def add_region(self, region):
+        """
+        添加或替换一个区域, 新区域立即释放第一个任务
+
+        Args:
+            region: OCRRegion实例
+        """
+        now = time.monotonic()
+        with self._cond:
+            old = self._schedules.get(region.region_id)
+            schedule = RegionSchedule(region, now, now + self._staleness(region))
+            if old is not None:
+                schedule.runs, schedule.misses, schedule.shed = old.runs, old.misses, old.shed
+            self._schedules[region.region_id] = schedule
+            self._cond.notify_all()
+
+    def remove_region(self, region_id):
+        """移除一个区域"""
+        with self._cond:
+            self._schedules.pop(region_id, None)
+            self._cond.notify_all()
+
+    def set_max_workers(self, max_workers):
+        """设置同时执行识别任务的最大线程数"""
+        with self._cond:
+            self.max_workers = max(1, min(MAX_POOL_SIZE, max_workers))
+            self._cond.notify_all()
+
+    def reschedule(self, region_id):
+        """区域参数变化后, 按新的周期重新计算下一次释放时间"""
+        now = time.monotonic()
+        with self._cond:
+            schedule = self._schedules.get(region_id)
+            if schedule is not None and not schedule.running:
+                schedule.release = min(schedule.release, now + self.period_fn(schedule.region))
+                schedule.deadline = schedule.release + self._staleness(schedule.region)
+                self._cond.notify_all()
+
+    def get_stats(self):
+        """
+        获取各区域的调度统计
+
+        Returns:
+            dict: 区域标识 -> {"runs", "misses", "shed", "last_latency"}
+        """
+        with self._cond:
+            return {
+                region_id: {
+                    "runs": schedule.runs,
+                    "misses": schedule.misses,
+                    "shed": schedule.shed,
+                    "last_latency": schedule.last_latency,
+                }
+                for region_id, schedule in self._schedules.items()
+            }
+
+    def start(self):
+        """
+        准备运行调度循环, 需要在启动运行run的线程之前调用
+
+        在这里而不是run中清除停止标志, 线程还没进入run时调用的stop不会被覆盖。
+        """
+        self._stopped.clear()
+
+    def stop(self):
+        """通知调度循环退出"""
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def run(self, job):
+        """
+        运行调度循环, 直到调用stop; 启动前先调用start
+
+        Args:
+            job: 处理单个区域的函数, 参数为OCRRegion和一起截取的截图(没有时为None)
+        """
+        executor = ThreadPoolExecutor(max_workers=MAX_POOL_SIZE, thread_name_prefix="ocr-worker")
+        try:
+            with self._cond:
+                while not self._stopped.is_set():
+                    timeout = self._dispatch(executor, job)
+                    if not self._stopped.is_set():
+                        self._cond.wait(timeout)
+        finally:
+            executor.shutdown(wait=True)
+
+    def _dispatch(self, executor, job):
+        """派发已到期的任务, 返回下一次需要检查的等待时间(调用方需持有锁)"""
+        now = time.monotonic()
+        free = self.max_workers - self._running_count
+        ready = [s for s in self._schedules.values() if not s.running and s.release <= now]
+
+        if ready and free > 0:
+            ready.sort(key=lambda s: (s.deadline, -s.region.priority))
+            if len(ready) > free:
+                # 过载时丢弃已超过截止时间的低优先级任务
+                top_priority = max(s.region.priority for s in ready)
+                kept = []
+                for schedule in ready:
+                    if schedule.region.priority < top_priority and now > schedule.deadline:
+                        schedule.misses += 1
+                        schedule.shed += 1
+                        self._release_next(schedule, now + self.period_fn(schedule.region))
+                    else:
+                        kept.append(schedule)
+                ready = kept
+            batch = ready[:free]
+            for schedule in batch:
+                schedule.running = True
+                self._running_count += 1
+            if self.capture_fn is not None and len(batch) > 1:
+                executor.submit(self._execute_tick, executor, batch, job)
+            else:
+                for schedule in batch:
+                    executor.submit(self._execute, schedule, job)
+            free -= len(batch)
+
+        if free <= 0:
+            # 没有空闲线程, 等待任务完成的通知
+            return None
+        releases = [s.release for s in self._schedules.values() if not s.running]
+        if not releases:
+            return None
+        return max(0.0, min(releases) - now)
+
+    def _execute_tick(self, executor, batch, job):
+        """为同一次派发的多个区域一起截图, 再把各区域的任务分给工作线程"""
+        try:
+            frames = self.capture_fn([schedule.region for schedule in batch])
+        except Exception:
+            # 合并截图失败时各任务自行截图并报告错误
+            frames = {}
+        for schedule in batch[1:]:
+            frame = frames.get(schedule.region.region_id)
+            try:
+                executor.submit(self._execute, schedule, job, frame)
+            except RuntimeError:
+                # 调度器停止后线程池不再接受任务, 在当前线程中执行
+                self._execute(schedule, job, frame)
+        self._execute(batch[0], job, frames.get(batch[0].region.region_id))
+
+    def _execute(self, schedule, job, frame=None):
+        """在工作线程中执行一个任务并更新统计"""
+        release = schedule.release
+        start = time.monotonic()
+        try:
+            job(schedule.region, frame)
+        finally:
+            end = time.monotonic()
+            with self._cond:
+                schedule.running = False
+                self._running_count -= 1
+                schedule.runs += 1
+                schedule.last_latency = end - start
+                if end > schedule.deadline:
+                    schedule.misses += 1
+                self._release_next(schedule, max(schedule.release + self.period_fn(schedule.region), end))
+                self._cond.notify_all()
+            listener = self.listener
+            if listener is not None:
+                listener(schedule.region.region_id, release, start, end)
+
+    def _release_next(self, schedule, release):
+        """设置区域的下一次释放时间和截止时间"""
+        schedule.release = release
+        schedule.deadline = release + self._staleness(schedule.region)
+
+    def _staleness(self, region):
+        """区域可接受的最大延迟"""
+        if region.max_staleness:
+            return region.max_staleness
+        return self.period_fn(region)
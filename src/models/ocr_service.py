@@ -0,0 +1,421 @@
+"""
+本地OCR服务
+
+通过HTTP(TCP或Unix域套接字)对外提供OCR盒子的图像预处理和Tesseract识别。
+并发请求会被合并成小批次: 相同配置的多张图像纵向拼接后只调用一次Tesseract,
+再按位置把单词拆回各自的请求。
+
+用法:
+    python ocr_box.py serve --port 8765
+    python ocr_box.py serve --unix-socket /tmp/ocr_box.sock
+"""
+import io
+import os
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+import socketserver
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+from PIL import Image
+
+from src.models.ocr_processor import OCRProcessor
+from src.models.ocr_signals import NullSignals
+from src.models.ocr_engine import make_engine_key
+from src.utils.tesseract_finder import TesseractFinder
+
+
+# 可以把多张图像拼接成一张识别的页面分割模式(多行/稀疏文本)
+BATCHABLE_PSM = {3, 4, 6, 11, 12}
+# 拼接图像时相邻图像之间的空白高度
+STACK_GAP = 48
+
+
+def batch_key(config):
+    """
+    获取请求的分组键, 同一组的请求共用一个引擎和同一套预处理
+
+    Args:
+        config: 请求的OCR配置
+
+    Returns:
+        tuple: 引擎配置、预处理参数(包括缩放倍数)和颜色键组成的键
+    """
+    return (
+        make_engine_key(config["lang"], config["psm"], config["oem"], config["variables"]),
+        tuple(sorted(config["image_preprocessing"].items())),
+        repr(config["color_key"]),
+    )
+
+
+def normalize_image(image):
+    """
+    把上传的图像统一转换为预处理需要的RGB图像
+
+    16位、32位整数和浮点灰度图的取值范围不固定, 先按实际最小、最大值拉伸到8位。
+
+    Args:
+        image: 已解码的PIL.Image对象
+
+    Returns:
+        PIL.Image: RGB图像
+    """
+    if image.mode.startswith("I") or image.mode == "F":
+        pixels = np.asarray(image, dtype=np.float64)
+        low, high = pixels.min(), pixels.max()
+        scale = 255.0 / (high - low) if high > low else 0.0
+        image = Image.fromarray(np.round((pixels - low) * scale).astype(np.uint8))
+    return image.convert("RGB")
+
+
+class OCRRequest:
+    """一个待识别的请求"""
+
+    __slots__ = ("image", "config", "future", "received")
+
+    def __init__(self, image, config):
+        self.image = image
+        self.config = config
+        self.future = Future()
+        self.received = time.monotonic()
+
+
+class MicroBatcher:
+    """
+    请求微批处理器
+
+    收到第一个请求后最多再等待max_wait秒, 把期间到达的请求(最多max_batch_size个)
+    按引擎和预处理配置分组, 每组在共享的引擎池上识别一次。
+    """
+
+    def __init__(self, processor, max_batch_size=8, max_wait=0.01, workers=2):
+        """
+        初始化微批处理器
+
+        Args:
+            processor: OCRProcessor实例, 提供预处理和引擎池
+            max_batch_size: 每批最多合并的请求数
+            max_wait: 凑批的最长等待时间(秒)
+            workers: 同时识别的批次数
+        """
+        self.processor = processor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.workers = workers
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ocr-batch")
+        self._instances = {}
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, image, config):
+        """
+        提交一张图像
+
+        Args:
+            image: RGB格式的PIL.Image对象(见normalize_image)
+            config: OCR配置
+
+        Returns:
+            Future: 结果为{"text", "words", "batch_size"}字典
+        """
+        request = OCRRequest(image, config)
+        self._queue.put(request)
+        return request.future
+
+    def stop(self):
+        """停止凑批线程和识别线程"""
+        self._stopped.set()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
+
+    def _loop(self):
+        """凑批线程"""
+        while not self._stopped.is_set():
+            try:
+                first = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = first.received + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            groups = {}
+            for request in batch:
+                groups.setdefault(batch_key(request.config), []).append(request)
+            for requests in groups.values():
+                self._executor.submit(self._run_group, requests)
+
+    def _run_group(self, requests):
+        """识别一组引擎和预处理配置都相同的请求"""
+        try:
+            config = requests[0].config
+            engine = self.processor.get_engine(config, self._instance())
+            images = [self.processor.preprocess_image(r.image, config) for r in requests]
+            if len(images) > 1 and config["psm"] in BATCHABLE_PSM:
+                results = recognize_stacked(engine, images)
+            else:
+                results = [engine.recognize(image) for image in images]
+            with self._lock:
+                self.batches += 1
+                self.requests += len(requests)
+            for request, result in zip(requests, results):
+                response = result.to_dict()
+                response["batch_size"] = len(requests)
+                request.future.set_result(response)
+        except Exception as e:
+            for request in requests:
+                if not request.future.done():
+                    request.future.set_exception(e)
+
+    def _instance(self):
+        """为每个识别线程分配独立的引擎实例编号"""
+        ident = threading.get_ident()
+        with self._lock:
+            return self._instances.setdefault(ident, len(self._instances))
+
+
+def stack_images(images, gap=STACK_GAP):
+    """
+    把多张图像纵向拼接到一张白色背景的灰度图上
+
+    Args:
+        images: PIL.Image列表
+        gap: 相邻图像之间的空白高度
+
+    Returns:
+        tuple: (拼接后的图像, 每张图像的起始纵坐标列表)
+    """
+    width = max(image.width for image in images)
+    height = sum(image.height for image in images) + gap * (len(images) + 1)
+    stacked = Image.new("L", (width, height), 255)
+    offsets = []
+    top = gap
+    for image in images:
+        stacked.paste(image.convert("L"), (0, top))
+        offsets.append(top)
+        top += image.height + gap
+    return stacked, offsets
+
+
+def recognize_stacked(engine, images):
+    """
+    拼接多张图像后只调用一次引擎, 再按位置把单词拆回各张图像
+
+    Args:
+        engine: TesseractEngine实例
+        images: 预处理后的PIL.Image列表
+
+    Returns:
+        list: 每张图像的OCRResult
+    """
+    stacked, offsets = stack_images(images)
+    result = engine.recognize(stacked)
+    words = result.words
+    centers = words["top"] + words["height"] // 2
+    owners = np.searchsorted(np.asarray(offsets), centers, side="right") - 1
+
+    results = []
+    for index, (image, offset) in enumerate(zip(images, offsets)):
+        part = result.take((owners == index) & (centers <= offset + image.height))
+        part.words["top"] -= offset
+        results.append(part)
+    return results
+
+
+class OCRRequestHandler(BaseHTTPRequestHandler):
+    """
+    OCR服务的HTTP请求处理器
+
+    POST /ocr   请求体为图像字节(PNG/JPEG等), 查询参数可指定lang、psm、oem、preprocess
+    GET /health 返回服务状态
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self.send_json(404, {"error": "not found"})
+            return
+        batcher = self.server.batcher
+        self.send_json(200, {
+            "status": "ok",
+            "requests": batcher.requests,
+            "batches": batcher.batches,
+            "engines": len(batcher.processor.engine_pool.keys()),
+        })
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/ocr":
+            self.send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            image = Image.open(io.BytesIO(self.rfile.read(length)))
+            image.load()
+            image = normalize_image(image)
+            config = self.build_config(parse_qs(url.query))
+        except Exception as e:
+            self.send_json(400, {"error": f"无效的请求: {str(e)}"})
+            return
+
+        start = time.monotonic()
+        try:
+            result = self.server.batcher.submit(image, config).result(timeout=self.server.timeout_seconds)
+        except Exception as e:
+            self.send_json(500, {"error": f"OCR识别错误: {str(e)}"})
+            return
+        result["latency_ms"] = round((time.monotonic() - start) * 1000, 2)
+        self.send_json(200, result)
+
+    def build_config(self, params):
+        """根据查询参数生成本次请求的OCR配置"""
+        config = dict(self.server.batcher.processor.config)
+        if "lang" in params:
+            config["lang"] = params["lang"][0]
+        if "psm" in params:
+            config["psm"] = int(params["psm"][0])
+        if "oem" in params:
+            config["oem"] = int(params["oem"][0])
+        if "preprocess" in params:
+            config["image_preprocessing"] = dict(
+                config["image_preprocessing"], enabled=params["preprocess"][0] not in ("0", "false")
+            )
+        return config
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """基于Unix域套接字的多线程HTTP服务器"""
+
+    daemon_threads = True
+
+    def get_request(self):
+        # Unix域套接字没有客户端地址, 用占位地址满足日志输出
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+class OCRService:
+    """
+    本地OCR服务, 把HTTP请求交给微批处理器识别
+    """
+
+    def __init__(self, processor, host="127.0.0.1", port=8765, unix_socket=None,
+                 max_batch_size=8, max_wait=0.01, workers=2, timeout=30, verbose=False):
+        """
+        初始化OCR服务
+
+        Args:
+            processor: OCRProcessor实例
+            host: 监听地址
+            port: 监听端口
+            unix_socket: Unix域套接字路径, 指定后不监听TCP端口
+            max_batch_size: 每批最多合并的请求数
+            max_wait: 凑批的最长等待时间(秒)
+            workers: 同时识别的批次数
+            timeout: 单个请求的最长等待时间(秒)
+            verbose: 是否输出每个请求的访问日志
+        """
+        self.batcher = MicroBatcher(processor, max_batch_size, max_wait, workers)
+        if unix_socket:
+            if os.path.exists(unix_socket):
+                os.unlink(unix_socket)
+            self.server = ThreadingUnixHTTPServer(unix_socket, OCRRequestHandler)
+            self.address = unix_socket
+        else:
+            self.server = ThreadingHTTPServer((host, port), OCRRequestHandler)
+            self.address = f"http://{host}:{self.server.server_address[1]}"
+        self.unix_socket = unix_socket
+        self.server.batcher = self.batcher
+        self.server.timeout_seconds = timeout
+        self.server.verbose = verbose
+
+    def serve_forever(self):
+        """运行服务直到调用shutdown"""
+        self.server.serve_forever()
+
+    def shutdown(self):
+        """停止服务并释放资源"""
+        self.server.shutdown()
+        self.server.server_close()
+        self.batcher.stop()
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ocr_box.py serve", description="OCR盒子本地识别服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--unix-socket", default=None, help="Unix域套接字路径")
+    parser.add_argument("--lang", default="chi_sim+eng", help="默认识别语言")
+    parser.add_argument("--psm", type=int, default=6, help="默认页面分割模式")
+    parser.add_argument("--max-batch", type=int, default=8, help="每批最多合并的请求数")
+    parser.add_argument("--max-wait-ms", type=float, default=10, help="凑批的最长等待时间(毫秒)")
+    parser.add_argument("--workers", type=int, default=2, help="同时识别的批次数")
+    parser.add_argument("--tesseract", default=None, help="Tesseract可执行文件路径")
+    parser.add_argument("--verbose", action="store_true", help="输出访问日志")
+    args = parser.parse_args(argv)
+
+    tesseract_path = args.tesseract or TesseractFinder.find_tesseract_path()
+    if not tesseract_path:
+        print("未找到Tesseract, 请通过--tesseract指定路径")
+        return 1
+
+    processor = OCRProcessor(NullSignals())
+    processor.set_tesseract_path(tesseract_path)
+    processor.set_config({"lang": args.lang, "psm": args.psm})
+    processor.engine_pool.warm_up(processor.get_engine_configs())
+
+    service = OCRService(
+        processor,
+        host=args.host,
+        port=args.port,
+        unix_socket=args.unix_socket,
+        max_batch_size=args.max_batch,
+        max_wait=args.max_wait_ms / 1000,
+        workers=args.workers,
+        verbose=args.verbose,
+    )
+    print(f"OCR服务已启动: {service.address}")
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
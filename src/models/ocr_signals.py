@@ -1,14 +1,177 @@
-from PyQt5.QtCore import QObject, pyqtSignal
+import threading
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from src.models.text_delta import TextDiffer
 
 class OCRSignals(QObject):
     """
     用于OCR线程和主线程之间的信号通信
     
     Signals:
-        text_detected: OCR识别到文本时发出的信号
+        text_detected: OCR识别到文本时发出的信号, 携带区域标识和完整文本
+        text_delta: OCR结果变化时发出的信号, 携带TextDelta行级差异
+        result_detected: OCR识别完成时发出的信号, 携带区域标识和OCRResult结构化结果
+        consensus_detected: 多帧投票完成时发出的信号, 携带区域标识和ConsensusText(文本与稳定度)
+        rules_changed: 动作规则变化时发出的信号, 携带关键字列表
+        template_matched: 参考图像匹配到新出现的关键字时发出的信号, 携带区域标识和关键字列表
         log_message: 记录日志消息的信号
         error_message: 记录错误消息的信号
     """
-    text_detected = pyqtSignal(str)
+    text_detected = pyqtSignal(str, str)
+    text_delta = pyqtSignal(object)
+    result_detected = pyqtSignal(str, object)
+    consensus_detected = pyqtSignal(str, object)
+    rules_changed = pyqtSignal(object)
+    template_matched = pyqtSignal(str, object)
     log_message = pyqtSignal(str)
-    error_message = pyqtSignal(str)
\ No newline at end of file
+    error_message = pyqtSignal(str)
+
+
+class NullSignals:
+    """
+    没有界面时使用的空信号(服务模式、基准测试等), 忽略所有发出的信号
+    """
+    
+    class _Signal:
+        def emit(self, *args):
+            pass
+        
+        def connect(self, *args):
+            pass
+    
+    def __getattr__(self, name):
+        return self._Signal()
+
+
+class CoalescingSignals(QObject):
+    """
+    OCRProcessor与界面之间的信号合并层
+
+    识别线程发出的信号先暂存, 由主线程的定时器按上限频率统一转发给目标OCRSignals:
+    文本、结构化结果和投票结果每个区域只保留最新值; 同一区域的多个行级差异合并为
+    相对上一次转发内容的一个差异; 连续重复的日志合并为一条, 每次转发的日志条数有上限。
+    模板匹配结果关系到动作执行, 只合并不丢弃。
+    """
+
+    class _Signal:
+        def __init__(self, owner, name):
+            self._owner = owner
+            self._name = name
+
+        def emit(self, *args):
+            self._owner._submit(self._name, args)
+
+        def connect(self, slot):
+            getattr(self._owner.target, self._name).connect(slot)
+
+    # 按区域只保留最新值的信号
+    LATEST_BY_REGION = ("text_detected", "result_detected", "consensus_detected")
+    # 日志类信号
+    MESSAGES = ("log_message", "error_message")
+
+    def __init__(self, target, max_rate=20, max_messages=20, parent=None):
+        """
+        初始化信号合并层(需在主线程中创建)
+
+        Args:
+            target: 界面连接的OCRSignals实例
+            max_rate: 每秒最多转发的次数
+            max_messages: 每次转发的日志条数上限, 超出的日志被丢弃
+            parent: 父对象
+        """
+        super().__init__(parent)
+        self.target = target
+        self.max_messages = max_messages
+        self.stats = {"received": 0, "delivered": 0, "coalesced": 0, "dropped": 0}
+        self._pending = {}
+        self._messages = []
+        self._differ = TextDiffer()
+        self._lock = threading.Lock()
+        for name in ("text_delta", "template_matched") + self.LATEST_BY_REGION + self.MESSAGES:
+            setattr(self, name, self._Signal(self, name))
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self.flush)
+        self._timer.start(max(1, int(1000 / max_rate)))
+
+    def __getattr__(self, name):
+        # 不需要合并的信号直接转发
+        if name == "target" or name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.target, name)
+
+    def _submit(self, name, args):
+        """暂存一次信号发送(可在任意线程中调用)"""
+        with self._lock:
+            self.stats["received"] += 1
+            if name in self.MESSAGES:
+                message = args[0]
+                if self._messages and self._messages[-1][:2] == [name, message]:
+                    self._messages[-1][2] += 1
+                    self.stats["coalesced"] += 1
+                elif len(self._messages) >= self.max_messages:
+                    self.stats["dropped"] += 1
+                else:
+                    self._messages.append([name, message, 1])
+                return
+
+            if name == "text_delta":
+                key = (name, args[0].key)
+            else:
+                key = (name, args[0])
+            previous = self._pending.get(key)
+            if previous is not None:
+                self.stats["coalesced"] += 1
+                if name == "template_matched":
+                    merged = list(previous[1]) + [k for k in args[1] if k not in previous[1]]
+                    args = (args[0], merged)
+            self._pending[key] = args
+
+    def flush(self):
+        """把暂存的信号转发给目标(在主线程中由定时器调用)"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            messages, self._messages = self._messages, []
+        if not pending and not messages:
+            return
+
+        delivered = 0
+        # 先转发模板匹配结果, 尽早执行动作
+        for (name, _), args in sorted(pending.items(), key=lambda item: item[0][0] != "template_matched"):
+            if name == "text_delta":
+                # 相对上一次转发的内容重新计算差异, 中间被合并的变化一并包含在内
+                delta = self._differ.diff(args[0].text, args[0].key)
+                if delta is None:
+                    continue
+                args = (delta,)
+            getattr(self.target, name).emit(*args)
+            delivered += 1
+        for name, message, count in messages:
+            getattr(self.target, name).emit(message if count == 1 else f"{message} (重复{count}次)")
+            delivered += 1
+
+        with self._lock:
+            self.stats["delivered"] += delivered
+
+    def reset_region(self, region_id):
+        """
+        清除一个区域暂存的信号和差异基准, 区域被删除时调用
+
+        区域标识会被新添加的区域重新使用, 不清除时新区域的第一个差异会相对旧区域的文本计算。
+
+        Args:
+            region_id: 区域标识
+        """
+        with self._lock:
+            self._pending = {key: args for key, args in self._pending.items() if key[1] != region_id}
+        self._differ.reset(region_id)
+
+    def get_stats(self):
+        """
+        获取合并统计
+
+        Returns:
+            dict: {"received", "delivered", "coalesced", "dropped"}
+        """
+        with self._lock:
+            return dict(self.stats)
@@ -0,0 +1,282 @@
+import threading
+
+import cv2
+import numpy as np
+
+from src.models.ocr_result import OCRResult
+
+
+def row_signatures(gray):
+    """
+    计算每一行像素的签名
+
+    签名由行内像素之和与按列位置加权的和组合而成, 内容相同的行签名相同。
+
+    Args:
+        gray: 灰度图像
+
+    Returns:
+        tuple: (签名数组, 是否为非纯色行的布尔数组)
+    """
+    rows = gray.astype(np.int64)
+    weights = np.arange(1, gray.shape[1] + 1, dtype=np.int64)
+    signatures = (rows @ weights) * 1000003 + rows.sum(axis=1)
+    informative = rows.max(axis=1) != rows.min(axis=1)
+    return signatures, informative
+
+
+def find_vertical_shift(previous, current, max_shift, min_match=0.98, min_rows=8):
+    """
+    用行签名匹配查找两帧之间的纯垂直平移
+
+    纯色行与任何位置都能匹配, 不参与计分。
+
+    Args:
+        previous: 上一帧的(签名, 非纯色行)
+        current: 本帧的(签名, 非纯色行)
+        max_shift: 最大平移行数
+        min_match: 重叠部分中非纯色行的最低匹配比例
+        min_rows: 重叠部分至少需要的非纯色行数
+
+    Returns:
+        int: 内容向上移动的行数(向下移动时为负数), 不是纯垂直平移时返回None
+    """
+    prev_sig, prev_info = previous
+    cur_sig, cur_info = current
+    height = prev_sig.size
+    if cur_sig.size != height:
+        return None
+
+    best_shift = None
+    best_ratio = 0.0
+    # 从0开始按平移量由小到大尝试, 比例相同时取平移量较小的
+    for shift in sorted(range(-max_shift, max_shift + 1), key=abs):
+        if shift >= 0:
+            a, b, info = prev_sig[shift:], cur_sig[:height - shift], prev_info[shift:] | cur_info[:height - shift]
+        else:
+            a, b, info = prev_sig[:height + shift], cur_sig[-shift:], prev_info[:height + shift] | cur_info[-shift:]
+        rows = int(info.sum())
+        if rows < min_rows:
+            continue
+        ratio = int(((a == b) & info).sum()) / rows
+        if ratio > best_ratio:
+            best_shift, best_ratio = shift, ratio
+            if ratio == 1.0:
+                break
+    return best_shift if best_ratio >= min_match else None
+
+
+def changed_rows(previous, current, shift):
+    """
+    找出平移后与上一帧内容不一致的行
+
+    Args:
+        previous: 上一帧的行签名
+        current: 本帧的行签名
+        shift: 内容向上移动的行数(向下移动时为负数)
+
+    Returns:
+        ndarray: 本帧每一行是否需要重新识别的布尔数组, 包括新露出的行和重叠部分中签名不同的行
+    """
+    height = current.size
+    changed = np.ones(height, dtype=bool)
+    if shift >= 0:
+        changed[:height - shift] = previous[shift:] != current[:height - shift]
+    else:
+        changed[-shift:] = previous[:height + shift] != current[-shift:]
+    return changed
+
+
+def scale_result(result, scale_x, scale_y, offset_y=0):
+    """
+    把识别结果的坐标换算到原画面上
+
+    Args:
+        result: OCRResult
+        scale_x: 原画面宽度 / 识别图像宽度
+        scale_y: 原画面高度 / 识别图像高度
+        offset_y: 识别图像在原画面中的纵向偏移
+
+    Returns:
+        OCRResult: 坐标换算后的新结果
+    """
+    words = result.words.copy()
+    words["left"] = np.round(words["left"] * scale_x)
+    words["width"] = np.round(words["width"] * scale_x)
+    words["top"] = np.round(words["top"] * scale_y) + offset_y
+    words["height"] = np.round(words["height"] * scale_y)
+    return OCRResult(words, result.texts)
+
+
+class ScrollPlan:
+    """需要重新识别的条带, 以及条带上下可以沿用的上一帧结果"""
+
+    __slots__ = ("shift", "strip_top", "strip_bottom", "above", "below")
+
+    def __init__(self, shift, strip_top, strip_bottom, above, below):
+        """
+        Args:
+            shift: 内容向上移动的行数
+            strip_top: 条带的起始行
+            strip_bottom: 条带的结束行(不含)
+            above: 条带上方沿用的上一帧结果, 坐标已平移到本帧
+            below: 条带下方沿用的上一帧结果, 坐标已平移到本帧
+        """
+        self.shift = shift
+        self.strip_top = strip_top
+        self.strip_bottom = strip_bottom
+        self.above = above
+        self.below = below
+
+    def stitch(self, strip_result):
+        """
+        把条带的识别结果与沿用的结果拼接起来
+
+        Args:
+            strip_result: 条带的识别结果, 坐标已换算到本帧
+
+        Returns:
+            OCRResult: 本帧的完整结果
+        """
+        return OCRResult.concat([self.above, strip_result, self.below])
+
+
+class ScrollTracker:
+    """
+    滚动感知识别
+
+    聊天窗口、日志窗格滚动时全部内容一起移动, 变化检测会把整个区域视为新内容。跟踪器
+    保存每个区域上一帧的行签名和识别结果(原画面坐标), 发现纯垂直平移时只需识别新露出的
+    条带, 再与上一帧平移后仍完整可见的单词拼接; 画面完全没有变化时直接沿用上一帧结果。
+    平移后重叠部分中内容不同的行(如原地更新的数字、被编辑的行)同样并入条带重新识别,
+    不会沿用这些行上的旧结果。
+    """
+
+    def __init__(self, max_shift_ratio=0.6, min_match=0.98):
+        """
+        初始化滚动跟踪器
+
+        Args:
+            max_shift_ratio: 最大平移量占区域高度的比例, 超过时重新识别整个区域
+            min_match: 判定为纯垂直平移时重叠部分的最低匹配比例
+        """
+        self.max_shift_ratio = max_shift_ratio
+        self.min_match = min_match
+        self.stats = {"unchanged": 0, "scrolled": 0, "full": 0, "strip_rows": 0, "frame_rows": 0}
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def plan(self, key, pixels):
+        """
+        与上一帧比较, 决定本帧的识别方式
+
+        Args:
+            key: 区域标识
+            pixels: 本帧RGB画面
+
+        Returns:
+            tuple: (方式, 数据), 方式为"unchanged"时数据为上一帧结果, 为"scroll"时为ScrollPlan
+                (包括没有平移、只有局部内容变化的情况), 为"full"时为None
+        """
+        gray = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+        current = row_signatures(gray)
+        height = gray.shape[0]
+        with self._lock:
+            previous = self._frames.get(key)
+            # 本帧的结果在识别完成后由store保存, 识别失败时下一帧重新识别整个区域
+            self._frames[key] = (current, gray.shape, None)
+        if previous is None or previous[1] != gray.shape or previous[2] is None:
+            return "full", None
+
+        cached = previous[2]
+        if np.array_equal(previous[0][0], current[0]):
+            # 只有每一行都完全相同才沿用上一帧结果
+            return "unchanged", cached
+        shift = find_vertical_shift(previous[0], current, int(height * self.max_shift_ratio), self.min_match)
+        if shift is None:
+            return "full", None
+        plan = self._plan_scroll(cached, shift, changed_rows(previous[0][0], current[0], shift))
+        if plan.strip_top == 0 and plan.strip_bottom == height:
+            return "full", None
+        return "scroll", plan
+
+    def _plan_scroll(self, cached, shift, changed):
+        """
+        计算需要重新识别的条带和沿用的单词
+
+        条带覆盖所有变化的行(新露出的行和内容不同的行), 与条带相交的单词整个并入条带。
+        上一帧结果中只有完整可见的单词, 贴着边缘、只露出一部分的文字没有被识别, 因此条带
+        一直延伸到上下最近的沿用单词, 把这些文字一并重新识别。
+
+        Args:
+            cached: 上一帧的识别结果
+            shift: 内容向上移动的行数
+            changed: changed_rows得到的本帧各行是否变化
+
+        Returns:
+            ScrollPlan: 条带和沿用的结果
+        """
+        height = changed.size
+        words = cached.words
+        tops = words["top"] - shift
+        bottoms = tops + words["height"]
+        rows = np.flatnonzero(changed)
+        first, last = int(rows[0]), int(rows[-1]) + 1
+        # 移出画面的单词不再沿用
+        visible = (tops >= 0) & (bottoms <= height)
+        while True:
+            hit = visible & (tops < last) & (bottoms > first)
+            if not hit.any():
+                break
+            first = min(first, int(tops[hit].min()))
+            last = max(last, int(bottoms[hit].max()))
+            visible &= ~hit
+        above = visible & (bottoms <= first)
+        below = visible & (tops >= last)
+        strip_top = min(first, int(bottoms[above].max()) + 1) if above.any() else 0
+        strip_bottom = max(last, int(tops[below].min())) if below.any() else height
+        kept_above, kept_below = cached.take(above), cached.take(below)
+        kept_above.words["top"] -= shift
+        kept_below.words["top"] -= shift
+        return ScrollPlan(shift, strip_top, strip_bottom, kept_above, kept_below)
+
+    def store(self, key, result, mode, strip_rows, frame_rows):
+        """
+        保存本帧的识别结果(原画面坐标)并累计统计
+
+        Args:
+            key: 区域标识
+            result: 本帧的完整识别结果
+            mode: 本帧的识别方式, unchanged、scroll或full
+            strip_rows: 本帧实际识别的行数
+            frame_rows: 区域的总行数
+        """
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames[key] = (frame[0], frame[1], result)
+            self.stats[{"unchanged": "unchanged", "scroll": "scrolled"}.get(mode, "full")] += 1
+            self.stats["strip_rows"] += strip_rows
+            self.stats["frame_rows"] += frame_rows
+
+    def reset(self, key=None):
+        """清除一个区域(key为None时为全部区域)的上一帧"""
+        with self._lock:
+            if key is None:
+                self._frames.clear()
+            else:
+                self._frames.pop(key, None)
+
+    def get_stats(self):
+        """
+        获取统计
+
+        Returns:
+            dict: {"unchanged", "scrolled", "full", "recognized_ratio"}, recognized_ratio为实际识别的行数占比
+        """
+        with self._lock:
+            stats = dict(self.stats)
+        frame_rows = stats.pop("frame_rows")
+        strip_rows = stats.pop("strip_rows")
+        stats["recognized_ratio"] = strip_rows / frame_rows if frame_rows else 1.0
+        return stats
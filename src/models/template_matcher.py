@@ -0,0 +1,175 @@
+import time
+import threading
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+from src.models.capture_source import load_font
+
+
+class TextTemplate:
+    """一条规则的参考图像"""
+
+    __slots__ = ("keyword", "image", "threshold")
+
+    def __init__(self, keyword, image, threshold):
+        self.keyword = keyword
+        self.image = image
+        self.threshold = threshold
+
+
+class TemplateMatcher:
+    """
+    模板匹配快速通道
+
+    为字体和外观固定的按钮、横幅等关键字登记参考图像(从屏幕截取或用字体绘制),
+    在缩小后的画面上用多尺度cv2.matchTemplate查找, 找到时无需运行Tesseract。
+    """
+
+    def __init__(self, downsample=0.5, scales=(0.8, 0.9, 1.0, 1.1, 1.25), threshold=0.85, min_height=10):
+        """
+        初始化模板匹配器
+
+        Args:
+            downsample: 画面和模板的缩小倍数
+            scales: 模板相对画面的缩放倍数, 应对界面缩放导致的大小变化
+            threshold: 默认的匹配阈值(归一化相关系数)
+            min_height: 缩小后模板的最小高度, 文字较小时少缩小一些
+        """
+        self.downsample = downsample
+        self.scales = tuple(scales)
+        self.threshold = threshold
+        self.min_height = min_height
+        self._templates = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def register(self, keyword, image, threshold=None):
+        """
+        登记一条规则的参考图像
+
+        Args:
+            keyword: 规则的关键字
+            image: PIL.Image或RGB格式的ndarray
+            threshold: 匹配阈值, 为None时使用默认值
+        """
+        gray = cv2.cvtColor(np.asarray(image.convert("RGB") if isinstance(image, Image.Image) else image),
+                            cv2.COLOR_RGB2GRAY)
+        if gray.std() == 0:
+            raise ValueError("参考图像是纯色的, 无法用于匹配")
+        template = TextTemplate(keyword, gray, threshold or self.threshold)
+        with self._lock:
+            self._templates[keyword] = template
+            self._stats[keyword] = {"checks": 0, "hits": 0, "total_time": 0.0, "last_time": 0.0}
+
+    def render(self, keyword, font_path=None, font_size=24, threshold=None):
+        """
+        用字体绘制关键字作为参考图像并登记, 白底黑字
+
+        Args:
+            keyword: 规则的关键字
+            font_path: TrueType字体路径, 绘制中文时需要指定支持中文的字体
+            font_size: 字号
+            threshold: 匹配阈值
+        """
+        font = load_font(font_path, font_size)
+        left, top, right, bottom = ImageDraw.Draw(Image.new("RGB", (1, 1))).textbbox((0, 0), keyword, font=font)
+        image = Image.new("RGB", (right - left + 4, bottom - top + 4), (255, 255, 255))
+        ImageDraw.Draw(image).text((2 - left, 2 - top), keyword, fill=(0, 0, 0), font=font)
+        self.register(keyword, image, threshold)
+
+    def remove(self, keyword):
+        """删除一条规则的参考图像"""
+        with self._lock:
+            self._templates.pop(keyword, None)
+            self._stats.pop(keyword, None)
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self._stats.clear()
+
+    def keywords(self):
+        """已登记参考图像的关键字"""
+        with self._lock:
+            return list(self._templates)
+
+    def __len__(self):
+        return len(self._templates)
+
+    def match(self, image):
+        """
+        在画面中查找所有已登记的参考图像
+
+        Args:
+            image: PIL.Image或RGB格式的ndarray
+
+        Returns:
+            list: 匹配到的[(关键字, 相关系数, (x, y, w, h)), ...], 坐标为原画面坐标
+        """
+        with self._lock:
+            templates = list(self._templates.values())
+        if not templates:
+            return []
+
+        pixels = np.asarray(image)
+        gray = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY)
+        # 相同缩小倍数的画面只缩小一次
+        frames = {}
+        matches = []
+        for template in templates:
+            start = time.perf_counter()
+            found = self._match_one(gray, template, frames)
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                stats = self._stats.get(template.keyword)
+                if stats is not None:
+                    stats["checks"] += 1
+                    stats["hits"] += found is not None
+                    stats["total_time"] += elapsed
+                    stats["last_time"] = elapsed
+            if found is not None:
+                matches.append(found)
+        return matches
+
+    def _match_one(self, gray, template, frames):
+        """在灰度画面中多尺度查找一个参考图像"""
+        height, width = template.image.shape
+        factor = min(1.0, max(self.downsample, self.min_height / max(1, height)))
+        frame = frames.get(factor)
+        if frame is None:
+            frame = gray if factor == 1.0 else cv2.resize(gray, None, fx=factor, fy=factor,
+                                                          interpolation=cv2.INTER_AREA)
+            frames[factor] = frame
+
+        best = None
+        for scale in self.scales:
+            size = (max(1, round(width * factor * scale)), max(1, round(height * factor * scale)))
+            if size[0] > frame.shape[1] or size[1] > frame.shape[0]:
+                continue
+            resized = cv2.resize(template.image, size, interpolation=cv2.INTER_AREA)
+            _, score, _, location = cv2.minMaxLoc(cv2.matchTemplate(frame, resized, cv2.TM_CCOEFF_NORMED))
+            if score >= template.threshold and (best is None or score > best[1]):
+                box = (round(location[0] / factor), round(location[1] / factor),
+                       round(size[0] / factor), round(size[1] / factor))
+                best = (template.keyword, float(score), box)
+        return best
+
+    def get_stats(self):
+        """
+        获取各规则的匹配耗时统计
+
+        Returns:
+            dict: 关键字 -> {"checks", "hits", "mean_time", "last_time"}
+        """
+        with self._lock:
+            return {
+                keyword: {
+                    "checks": stats["checks"],
+                    "hits": stats["hits"],
+                    "mean_time": stats["total_time"] / stats["checks"] if stats["checks"] else 0.0,
+                    "last_time": stats["last_time"],
+                }
+                for keyword, stats in self._stats.items()
+            }
@@ -0,0 +1,163 @@
+import re
+import difflib
+import threading
+from collections import Counter, deque
+
+
+# 英文、数字按单词切分, 中文等其他字符按单字切分, 换行单独作为一个词元
+TOKEN_PATTERN = re.compile(r"\n|[0-9A-Za-z_]+|\S")
+
+
+def tokenize(text):
+    """
+    把文本切分成词元
+
+    Args:
+        text: 文本
+
+    Returns:
+        tuple: (词元列表, 每个词元前是否有空格的列表)
+    """
+    tokens = []
+    spaces = []
+    for match in TOKEN_PATTERN.finditer(text):
+        start = match.start()
+        tokens.append(match.group())
+        spaces.append(start > 0 and text[start - 1] in " \t")
+    return tokens, spaces
+
+
+def join_tokens(tokens, spaces):
+    """按空格标记把词元拼回文本"""
+    parts = []
+    for token, space in zip(tokens, spaces):
+        if space and parts and parts[-1] != "\n" and token != "\n":
+            parts.append(" ")
+        parts.append(token)
+    return "".join(parts)
+
+
+class ConsensusText:
+    """多帧投票得到的文本"""
+
+    __slots__ = ("text", "stability", "frames")
+
+    def __init__(self, text, stability, frames):
+        """
+        Args:
+            text: 投票得到的文本
+            stability: 稳定度(0~1), 各词元得票比例的平均值
+            frames: 参与投票的帧数
+        """
+        self.text = text
+        self.stability = stability
+        self.frames = frames
+
+
+class TemporalConsensus:
+    """
+    多帧时间一致性投票
+
+    保存每个区域最近K帧的识别文本, 以与其余帧最相似的一帧为基准, 用difflib把其余帧
+    对齐到基准的词元上逐位置投票。单帧的偶发误识别会被多数票纠正, 因此每帧可以使用
+    更便宜的预处理。
+    """
+
+    def __init__(self, window=5):
+        """
+        初始化投票器
+
+        Args:
+            window: 参与投票的最近帧数
+        """
+        self.window = window
+        self._history = {}
+        self._lock = threading.Lock()
+
+    def update(self, key, text, window=None):
+        """
+        加入一帧的识别文本并重新投票
+
+        Args:
+            key: 区域标识
+            text: 本帧识别出的文本
+            window: 参与投票的帧数, 为None时使用初始化时的设置
+
+        Returns:
+            ConsensusText: 投票结果
+        """
+        window = max(1, window or self.window)
+        with self._lock:
+            history = self._history.get(key)
+            if history is None or history.maxlen != window:
+                history = deque(history or (), maxlen=window)
+                self._history[key] = history
+            history.append(tokenize(text))
+            frames = list(history)
+        return self.vote(frames)
+
+    def reset(self, key=None):
+        """清除一个区域(key为None时为全部区域)的历史帧"""
+        with self._lock:
+            if key is None:
+                self._history.clear()
+            else:
+                self._history.pop(key, None)
+
+    @staticmethod
+    def vote(frames):
+        """
+        对多帧的词元逐位置投票
+
+        Args:
+            frames: [(词元列表, 空格标记列表), ...], 按时间顺序排列
+
+        Returns:
+            ConsensusText: 投票结果
+        """
+        count = len(frames)
+        pivot_index = TemporalConsensus._medoid([tokens for tokens, _ in frames])
+        pivot, pivot_spaces = frames[pivot_index]
+        if not pivot:
+            empty = sum(1 for tokens, _ in frames if not tokens)
+            return ConsensusText("", empty / count, count)
+
+        votes = [Counter({token: 1}) for token in pivot]
+        for index, (tokens, _) in enumerate(frames):
+            if index == pivot_index:
+                continue
+            matcher = difflib.SequenceMatcher(None, pivot, tokens, autojunk=False)
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag == "equal" or (tag == "replace" and i2 - i1 == j2 - j1):
+                    for offset in range(i2 - i1):
+                        votes[i1 + offset][tokens[j1 + offset]] += 1
+                elif tag != "insert":
+                    # 长度不一致的替换和删除视为该帧没有这些词元
+                    for i in range(i1, i2):
+                        votes[i][None] += 1
+
+        tokens = []
+        spaces = []
+        support = 0
+        for token, space, counter in zip(pivot, pivot_spaces, votes):
+            # 票数相同时保留基准帧的词元
+            winner, winner_votes = max(counter.items(), key=lambda item: (item[1], item[0] == token))
+            support += winner_votes
+            if winner is not None:
+                tokens.append(winner)
+                spaces.append(space)
+        return ConsensusText(join_tokens(tokens, spaces), support / (len(pivot) * count), count)
+
+    @staticmethod
+    def _medoid(token_lists):
+        """与其余各帧相似度之和最大的一帧, 相同时取较新的帧"""
+        count = len(token_lists)
+        if count <= 2:
+            return count - 1
+        scores = [0.0] * count
+        for i in range(count):
+            for j in range(i + 1, count):
+                ratio = difflib.SequenceMatcher(None, token_lists[i], token_lists[j], autojunk=False).ratio()
+                scores[i] += ratio
+                scores[j] += ratio
+        return max(range(count), key=lambda i: (scores[i], i))
@@ -0,0 +1,90 @@
+import difflib
+import threading
+
+
+class TextDelta:
+    """
+    两次OCR结果之间的行级差异
+
+    changes中每一项为(tag, i1, i2, lines), 表示把上一次结果的第i1到i2行(不含i2)
+    替换为lines, tag取值为'replace'、'delete'或'insert'。
+    """
+
+    __slots__ = ("key", "changes", "old_line_count", "text")
+
+    def __init__(self, key, changes, old_line_count, text):
+        self.key = key
+        self.changes = changes
+        self.old_line_count = old_line_count
+        self.text = text
+
+    @property
+    def added_lines(self):
+        """新增或被修改后的行"""
+        return [line for _, _, _, lines in self.changes for line in lines]
+
+    def apply(self, old_lines):
+        """
+        将差异应用到上一次结果的行列表上
+
+        Args:
+            old_lines: 上一次结果按行拆分的列表
+
+        Returns:
+            list: 新结果按行拆分的列表
+        """
+        lines = list(old_lines)
+        for _, i1, i2, new_lines in reversed(self.changes):
+            lines[i1:i2] = new_lines
+        return lines
+
+
+class TextDiffer:
+    """
+    计算OCR结果的行级差异, 按键分别保存上一次的结果
+    """
+
+    def __init__(self):
+        self._previous = {}
+        self._lock = threading.Lock()
+
+    def reset(self, key=None):
+        """
+        清除保存的上一次结果
+
+        Args:
+            key: 结果键, 为None时清除全部
+        """
+        with self._lock:
+            if key is None:
+                self._previous.clear()
+            else:
+                self._previous.pop(key, None)
+
+    def diff(self, text, key=None):
+        """
+        计算本次结果相对上一次结果的差异
+
+        Args:
+            text: 本次识别出的完整文本
+            key: 结果键, 多个区域时用于区分各自的结果
+
+        Returns:
+            TextDelta: 行级差异, 结果没有变化时返回None
+        """
+        new_lines = text.split("\n")
+        with self._lock:
+            # 首次识别时视为与空文本比较, 与空白的结果显示框一致
+            old_lines = self._previous.get(key, [""])
+            self._previous[key] = new_lines
+
+        if old_lines == new_lines:
+            return None
+
+        matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+        changes = [
+            (tag, i1, i2, new_lines[j1:j2])
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+            if tag != "equal"
+        ]
+        return TextDelta(key, changes, len(old_lines), text)
@@ -0,0 +1,130 @@
+import cv2
+import numpy as np
+
+
+class TextScaleEstimator:
+    """
+    文字高度估计器, 用于自适应确定图像预处理的缩放倍数
+
+    在只做水平降采样的灰度图上统计连通域高度来估计字符高度, 然后计算把字符高度
+    缩放到Tesseract最佳识别范围所需的最小倍数。画面变化不大时复用缓存结果。
+    """
+
+    def __init__(self, min_text_height=20, max_text_height=40, sample_width=320, min_sample_ratio=0.5,
+                 min_components=5, change_threshold=6.0):
+        """
+        初始化文字高度估计器
+
+        Args:
+            min_text_height: 字符高度下限(像素), 低于该值时放大
+            max_text_height: 字符高度上限(像素), 高于该值时缩小
+            sample_width: 估计时水平降采样的目标宽度
+            min_sample_ratio: 水平降采样的最小比例, 避免宽区域中相邻字符粘连
+            min_components: 可信估计所需的最少连通域数量
+            change_threshold: 画面指纹的平均灰度差超过该值时视为画面变化
+        """
+        self.min_text_height = min_text_height
+        self.max_text_height = max_text_height
+        self.sample_width = sample_width
+        self.min_sample_ratio = min_sample_ratio
+        self.min_components = min_components
+        self.change_threshold = change_threshold
+        # 缓存: key -> (画面尺寸, 画面指纹, 估计的字符高度)
+        self._cache = {}
+
+    def reset(self, key=None):
+        """
+        清除缓存的估计结果
+
+        Args:
+            key: 缓存键, 为None时清除全部缓存
+        """
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def estimate_text_height(self, image_bgr, key=None):
+        """
+        估计图像中的字符高度
+
+        Args:
+            image_bgr: OpenCV格式(BGR)的图像
+            key: 缓存键, 多个区域时用于区分各自的缓存; 为None时不使用缓存(如文字行、条带等局部裁剪图)
+
+        Returns:
+            float: 估计的字符高度(原图像素), 无法估计时返回None
+        """
+        gray = cv2.cvtColor(image_bgr, cv2.COLOR_BGR2GRAY)
+        if key is None:
+            return self._measure(gray)
+        fingerprint = cv2.resize(gray, (16, 16), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+        cached = self._cache.get(key)
+        if cached is not None:
+            shape, cached_fingerprint, height = cached
+            if shape == gray.shape and np.abs(fingerprint - cached_fingerprint).mean() < self.change_threshold:
+                return height
+
+        height = self._measure(gray)
+        self._cache[key] = (gray.shape, fingerprint, height)
+        return height
+
+    def estimate_scale(self, image_bgr, default_scale=1.0, key=None):
+        """
+        计算使字符高度落入最佳范围的最小缩放倍数
+
+        Args:
+            image_bgr: OpenCV格式(BGR)的图像
+            default_scale: 无法估计字符高度时使用的倍数
+            key: 缓存键
+
+        Returns:
+            float: 缩放倍数, 大于1放大, 小于1缩小
+        """
+        height = self.estimate_text_height(image_bgr, key)
+        if not height:
+            return default_scale
+        if height < self.min_text_height:
+            return self.min_text_height / height
+        if height > self.max_text_height:
+            return self.max_text_height / height
+        return 1.0
+
+    def _measure(self, gray):
+        """
+        通过连通域统计字符高度
+
+        只在水平方向降采样, 纵向保持原分辨率, 小字在宽区域中的高度不会被量化放大。
+        """
+        ratio = min(1.0, max(self.min_sample_ratio, self.sample_width / float(gray.shape[1])))
+        if ratio < 1.0:
+            small = cv2.resize(gray, None, fx=ratio, fy=1.0, interpolation=cv2.INTER_AREA)
+        else:
+            small = gray
+
+        # Otsu二值化, 并保证文字(占少数的像素)为前景
+        _, binary = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        if np.count_nonzero(binary) > binary.size / 2:
+            binary = cv2.bitwise_not(binary)
+
+        count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        if count <= 1:
+            return None
+
+        # 去掉背景和明显不是字符的连通域(噪点、边框、大块色块)
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+        widths = stats[1:, cv2.CC_STAT_WIDTH]
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        mask = (
+            (heights >= 2)
+            & (areas >= 3)
+            & (heights < small.shape[0] * 0.8)
+            & (widths < small.shape[1] * 0.5)
+        )
+        heights = heights[mask]
+        if heights.size < self.min_components:
+            return None
+
+        # 中文字符常被拆成多个部件, 取较高分位数更接近整字高度
+        return float(np.percentile(heights, 75))
@@ -0,0 +1,132 @@
+import numpy as np
+from PyQt5.QtWidgets import (
+    QDialog,
+    QDialogButtonBox,
+    QHBoxLayout,
+    QLabel,
+    QListWidget,
+    QPushButton,
+    QSpinBox,
+    QVBoxLayout,
+)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPixmap, QColor
+
+import cv2
+
+from src.models.color_key import key_from_color, isolate_text, normalize_key
+
+
+def to_pixmap(pixels):
+    """把RGB或单通道的ndarray转换为QPixmap"""
+    pixels = np.ascontiguousarray(pixels)
+    height, width = pixels.shape[:2]
+    if pixels.ndim == 2:
+        image = QImage(pixels.data, width, height, width, QImage.Format_Grayscale8)
+    else:
+        image = QImage(pixels.data, width, height, width * 3, QImage.Format_RGB888)
+    # QImage不持有数据, 复制一份后再交给QPixmap
+    return QPixmap.fromImage(image.copy())
+
+
+class ColorKeyDialog(QDialog):
+    """
+    文字颜色取色对话框
+
+    在区域截图上点击文字, 按取到的颜色和容差生成HSV颜色键, 并预览只保留这些颜色后的二值图像。
+    """
+
+    MAX_WIDTH = 640
+    MAX_HEIGHT = 240
+
+    def __init__(self, image, keys=None, parent=None):
+        """
+        Args:
+            image: 区域截图(PIL.Image或RGB格式的ndarray)
+            keys: 已有的颜色键列表
+            parent: 父窗口
+        """
+        super().__init__(parent)
+        self.setWindowTitle("文字颜色")
+        self.pixels = np.asarray(image.convert("RGB") if hasattr(image, "convert") else image)
+        self.keys = [normalize_key(key) for key in keys or []]
+        height, width = self.pixels.shape[:2]
+        self.zoom = min(self.MAX_WIDTH / width, self.MAX_HEIGHT / height, 4.0)
+
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("点击截图中的文字取色, 可以取多种颜色:"))
+        self.image_label = QLabel()
+        self.image_label.setCursor(Qt.CrossCursor)
+        self.image_label.setPixmap(self.scaled(to_pixmap(self.pixels)))
+        self.image_label.mousePressEvent = self.pick_color
+        layout.addWidget(self.image_label)
+
+        tolerance_layout = QHBoxLayout()
+        self.tolerance_spins = []
+        for label, value, maximum in (("色相容差:", 10, 90), ("饱和度容差:", 80, 255), ("亮度容差:", 80, 255)):
+            tolerance_layout.addWidget(QLabel(label))
+            spin = QSpinBox()
+            spin.setRange(0, maximum)
+            spin.setValue(value)
+            tolerance_layout.addWidget(spin)
+            self.tolerance_spins.append(spin)
+        layout.addLayout(tolerance_layout)
+
+        keys_layout = QHBoxLayout()
+        self.key_list = QListWidget()
+        self.key_list.setMaximumHeight(80)
+        keys_layout.addWidget(self.key_list)
+        remove_btn = QPushButton("删除选中")
+        remove_btn.clicked.connect(self.remove_key)
+        keys_layout.addWidget(remove_btn)
+        layout.addLayout(keys_layout)
+
+        layout.addWidget(QLabel("预览:"))
+        self.preview_label = QLabel()
+        layout.addWidget(self.preview_label)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+        self.refresh()
+
+    def scaled(self, pixmap):
+        """按对话框的显示倍数缩放图像"""
+        return pixmap.scaled(round(pixmap.width() * self.zoom), round(pixmap.height() * self.zoom),
+                             Qt.KeepAspectRatio, Qt.FastTransformation)
+
+    def pick_color(self, event):
+        """在截图上点击时, 取该位置3x3邻域的中位色生成颜色键"""
+        height, width = self.pixels.shape[:2]
+        x = min(width - 1, int(event.pos().x() / self.zoom))
+        y = min(height - 1, int(event.pos().y() / self.zoom))
+        patch = self.pixels[max(0, y - 1):y + 2, max(0, x - 1):x + 2].reshape(-1, 3)
+        color = tuple(int(value) for value in np.median(patch, axis=0))
+        tolerances = [spin.value() for spin in self.tolerance_spins]
+        key = key_from_color(color, *tolerances)
+        if key not in self.keys:
+            self.keys.append(key)
+            self.refresh()
+
+    def remove_key(self):
+        row = self.key_list.currentRow()
+        if 0 <= row < len(self.keys):
+            del self.keys[row]
+            self.refresh()
+
+    def refresh(self):
+        """刷新颜色键列表和预览"""
+        self.key_list.clear()
+        for key in self.keys:
+            self.key_list.addItem("H {}~{}  S {}~{}  V {}~{}".format(key[0], key[3], key[1], key[4], key[2], key[5]))
+            hue = (key[0] + (key[3] - key[0]) % 180 // 2) % 180
+            rgb = cv2.cvtColor(np.array([[[hue, (key[1] + key[4]) // 2, (key[2] + key[5]) // 2]]], dtype=np.uint8),
+                               cv2.COLOR_HSV2RGB)[0, 0]
+            self.key_list.item(self.key_list.count() - 1).setForeground(QColor(*(int(v) for v in rgb)))
+        if self.keys:
+            preview = isolate_text(cv2.cvtColor(self.pixels, cv2.COLOR_RGB2BGR), self.keys)
+            self.preview_label.setPixmap(self.scaled(to_pixmap(preview)))
+        else:
+            self.preview_label.setText("尚未取色")
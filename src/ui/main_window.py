@@ -1,5 +1,6 @@
 import os
 import time
+import signal
 from PyQt5.QtWidgets import (
     QMainWindow,
     QPushButton,
@@ -16,11 +17,14 @@ from PyQt5.QtWidgets import (
     QDoubleSpinBox,
     QComboBox,
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QTextCursor
 
 from src.models.transparent_window import TransparentWindow
-from src.models.ocr_signals import OCRSignals
-from src.models.ocr_processor import OCRProcessor
+from src.models.ocr_signals import OCRSignals, CoalescingSignals
+from src.models.ocr_processor import OCRProcessor, MAIN_REGION_ID, PREPROCESSING_PROFILES
+from src.models.ocr_region import OCRRegion
+from src.ui.color_key_dialog import ColorKeyDialog
 from src.utils.tesseract_finder import TesseractFinder
 from src.models.action_handler import ActionHandler
 
@@ -33,6 +37,12 @@ class MainWindow(QMainWindow):
 
         # 初始化组件
         self.transparent_window = None
+        # 额外添加的区域窗口: 区域标识 -> 透明窗口
+        self.region_windows = {}
+        # 各区域最新的完整识别结果, 用于切换显示的区域
+        self.region_texts = {}
+        # 各区域最近一次多帧投票的稳定度
+        self.region_stability = {}
         self.has_chinese_support = False
         
         # 初始化UI控件
@@ -40,13 +50,29 @@ class MainWindow(QMainWindow):
         self.language_combo = None
         self.preprocess_checkbox = None
         self.scale_spin = None
+        self.auto_scale_checkbox = None
         self.contrast_spin = None
         self.sharpen_checkbox = None
         self.denoise_checkbox = None
         self.threshold_checkbox = None
+        self.detection_checkbox = None
+        self.pipeline_checkbox = None
+        self.consensus_checkbox = None
+        self.cascade_checkbox = None
+        self.scroll_checkbox = None
+        self.profile_combo = None
         self.psm_combo = None
         self.toggle_button = None
         self.interval_spin = None
+        self.cpu_budget_spin = None
+        self.region_combo = None
+        self.priority_spin = None
+        self.staleness_spin = None
+        self.keyword_only_checkbox = None
+        self.recorder_checkbox = None
+        self.profile_button = None
+        self.publisher_checkbox = None
+        self.region_stats_label = None
         self.result_text = None
         self.log_text = None
 
@@ -57,17 +83,28 @@ class MainWindow(QMainWindow):
         self.signals = OCRSignals()
         self.signals.log_message.connect(self.log)
         self.signals.error_message.connect(self.log_error)
-        self.signals.text_detected.connect(self.update_result_text)
+        self.signals.text_delta.connect(self.apply_result_delta)
+        self.signals.consensus_detected.connect(self.update_consensus)
 
         # 关键字处理器
         self.action_handler = ActionHandler(self.signals)
 
-        # 初始化OCR处理器
-        self.ocr_processor = OCRProcessor(self.signals)
+        # 初始化OCR处理器, 识别线程的信号经合并后按上限频率送到界面
+        self.coalescing_signals = CoalescingSignals(self.signals, parent=self)
+        self.ocr_processor = OCRProcessor(self.coalescing_signals)
+        self.ocr_processor.set_keywords(self.action_handler.get_keywords())
+        self.signals.rules_changed.connect(self.ocr_processor.set_keywords)
+        self.ocr_processor.set_template_matcher(self.action_handler.template_matcher)
+        self.action_handler.template_source = self.grab_current_region
+        self.signals.template_matched.connect(self.apply_template_match)
 
         # 初始化UI
         self.init_ui()
 
+        # kill -USR1 <pid> 可在不打开界面的情况下开启或结束性能分析
+        if hasattr(signal, "SIGUSR1"):
+            signal.signal(signal.SIGUSR1, self.on_profile_signal)
+
         # 应用创建后检查Tesseract状态并记录日志
         self.init_tesseract()
 
@@ -78,6 +115,8 @@ class MainWindow(QMainWindow):
             self.log(f"已自动检测到Tesseract: {self.tesseract_path}")
             # 检查中文支持
             self.update_language_support()
+            # 预热识别引擎
+            self.ocr_processor.prewarm_engines()
         else:
             self.log("未在系统路径中找到Tesseract, 请手动指定路径")
 
@@ -146,14 +185,72 @@ class MainWindow(QMainWindow):
         except Exception:
             pass
 
-    def update_result_text(self, text):
-        """更新OCR结果显示(在主线程中调用)"""
+    def apply_result_delta(self, delta):
+        """按行级差异局部更新OCR结果显示(在主线程中调用)"""
+        self.region_texts[delta.key] = delta.text
         try:
-            self.result_text.setText(text)
+            if delta.key != self.current_region_id():
+                # 不是当前显示的区域, 只执行匹配逻辑
+                self.action_handler.process_delta(delta)
+                return
+            document = self.result_text.document()
+            if document.blockCount() != delta.old_line_count:
+                # 显示内容与差异的基准不一致时, 整体刷新
+                self.result_text.setPlainText(delta.text)
+            else:
+                cursor = QTextCursor(document)
+                cursor.beginEditBlock()
+                for _, i1, i2, lines in reversed(delta.changes):
+                    self.replace_result_lines(cursor, i1, i2, lines)
+                cursor.endEditBlock()
         except Exception as e:
             self.log_error(f"更新UI出错: {str(e)}")
-        # 执行匹配逻辑
-        self.action_handler.process_text(text)
+        # 只对变化的行执行匹配逻辑
+        self.action_handler.process_delta(delta)
+
+    def update_consensus(self, region_id, consensus):
+        """记录区域的多帧投票稳定度(在主线程中调用)"""
+        self.region_stability[region_id] = consensus.stability
+
+    def apply_template_match(self, region_id, keywords):
+        """参考图像匹配到关键字时执行动作(在主线程中调用)"""
+        self.action_handler.process_template_match(keywords)
+
+    def grab_current_region(self):
+        """截取当前选中区域的画面, 用于登记参考图像"""
+        region_id = self.current_region_id()
+        window = self.transparent_window if region_id == MAIN_REGION_ID else self.region_windows.get(region_id)
+        if window is None:
+            raise RuntimeError(f"{region_id}还没有区域窗口, 请先开启OCR")
+        rect = window.geometry()
+        bbox = (rect.x(), rect.y(), rect.x() + rect.width(), rect.y() + rect.height())
+        return self.ocr_processor.capture_source.grab(bbox)
+
+    def replace_result_lines(self, cursor, i1, i2, lines):
+        """将结果显示框中第i1到i2行(不含i2)替换为lines"""
+        document = self.result_text.document()
+        new_text = "\n".join(lines)
+        if i2 < document.blockCount():
+            # 替换范围后面还有行, 连同换行符一起替换
+            start = document.findBlockByNumber(i1).position()
+            end = document.findBlockByNumber(i2).position()
+            if lines:
+                new_text += "\n"
+        elif i1 > 0:
+            # 替换到末尾, 从上一行的换行符开始替换
+            end = document.characterCount() - 1
+            if i1 < document.blockCount():
+                start = document.findBlockByNumber(i1).position() - 1
+            else:
+                start = end
+            if lines:
+                new_text = "\n" + new_text
+        else:
+            start = 0
+            end = document.characterCount() - 1
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.KeepAnchor)
+        cursor.insertText(new_text)
 
     def browse_tesseract(self):
         """打开文件对话框选择Tesseract路径"""
@@ -169,11 +266,211 @@ class MainWindow(QMainWindow):
 
             # 检查中文支持
             self.update_language_support()
+            # 预热识别引擎
+            self.ocr_processor.prewarm_engines()
 
     def update_interval(self, value):
-        """更新OCR检测间隔"""
-        self.ocr_processor.set_interval(value)
-        self.log(f"OCR检测间隔已更新为 {value} 秒")
+        """更新当前区域的OCR检测间隔"""
+        region_id = self.current_region_id()
+        if region_id == MAIN_REGION_ID:
+            self.ocr_processor.set_interval(value)
+        else:
+            self.ocr_processor.update_region(region_id, interval=value)
+        self.log(f"{region_id}的OCR检测间隔已更新为 {value} 秒")
+
+    def update_cpu_budget(self, value):
+        """更新CPU预算, 0表示不限制"""
+        self.ocr_processor.set_cpu_budget(value)
+        self.log(f"CPU预算已更新为 {value}%" if value else "已取消CPU预算")
+
+    def current_region_id(self):
+        """当前在界面上选中的区域"""
+        return self.region_combo.currentText() or MAIN_REGION_ID
+
+    def add_region(self):
+        """添加一个新的OCR区域"""
+        index = 2
+        while f"区域{index}" in self.ocr_processor.regions or f"区域{index}" in self.region_windows:
+            index += 1
+        region_id = f"区域{index}"
+
+        window = TransparentWindow()
+        window.move(window.x() + 30 * (index - 1), window.y() + 30 * (index - 1))
+        self.region_windows[region_id] = window
+        self.ocr_processor.add_region(OCRRegion(region_id, window=window, interval=self.interval_spin.value()))
+        if self.toggle_button.isChecked():
+            window.show()
+
+        self.region_combo.addItem(region_id)
+        self.region_combo.setCurrentText(region_id)
+        self.log(f"已添加{region_id}")
+
+    def remove_region(self):
+        """删除当前选中的OCR区域(主区域不可删除)"""
+        region_id = self.current_region_id()
+        if region_id == MAIN_REGION_ID:
+            self.log_error("主区域不能删除")
+            return
+
+        self.ocr_processor.remove_region(region_id)
+        self.coalescing_signals.reset_region(region_id)
+        window = self.region_windows.pop(region_id, None)
+        if window:
+            window.close()
+        self.region_texts.pop(region_id, None)
+        self.region_combo.removeItem(self.region_combo.currentIndex())
+        self.log(f"已删除{region_id}")
+
+    def select_region(self):
+        """切换当前显示和编辑的区域"""
+        region_id = self.current_region_id()
+        region = self.ocr_processor.regions.get(region_id)
+        for spin, value in (
+            (self.interval_spin, region.interval if region and region.interval else self.ocr_processor.interval),
+            (self.priority_spin, region.priority if region else 0),
+            (self.staleness_spin, (region.max_staleness or 0) if region else 0),
+        ):
+            spin.blockSignals(True)
+            spin.setValue(value)
+            spin.blockSignals(False)
+        region_config = (region.config or {}) if region else {}
+        self.keyword_only_checkbox.blockSignals(True)
+        self.keyword_only_checkbox.setChecked(region_config.get("keyword_constraint", {}).get("enabled", False))
+        self.keyword_only_checkbox.blockSignals(False)
+        self.result_text.setPlainText(self.region_texts.get(region_id, ""))
+
+    def update_region_priority(self, value):
+        """更新当前区域的优先级"""
+        self.ocr_processor.update_region(self.current_region_id(), priority=value)
+
+    def update_region_staleness(self, value):
+        """更新当前区域可接受的最大延迟, 0表示等于检测间隔"""
+        self.ocr_processor.update_region(self.current_region_id(), max_staleness=value or None)
+
+    def update_region_keyword_only(self, checked):
+        """设置当前区域是否只按动作规则中的关键字识别"""
+        region_id = self.current_region_id()
+        region = self.ocr_processor.regions.get(region_id)
+        if region is None:
+            self.log_error(f"{region_id}尚未启动, 请开启OCR后再设置")
+            self.keyword_only_checkbox.blockSignals(True)
+            self.keyword_only_checkbox.setChecked(False)
+            self.keyword_only_checkbox.blockSignals(False)
+            return
+        config = dict(region.config or {}, keyword_constraint={"enabled": checked})
+        self.ocr_processor.update_region(region_id, config=config)
+        self.log(f"{region_id}{'只识别关键字' if checked else '恢复完整识别'}")
+
+    def pick_region_color_key(self):
+        """在当前区域的截图上取文字颜色, 该区域只保留这些颜色的文字再识别"""
+        region_id = self.current_region_id()
+        region = self.ocr_processor.regions.get(region_id)
+        try:
+            if region is None:
+                raise RuntimeError(f"{region_id}尚未启动, 请开启OCR后再设置")
+            image = self.grab_current_region()
+        except Exception as e:
+            self.log_error(f"截取区域画面失败: {str(e)}")
+            return
+        keys = (region.config or {}).get("color_key", {}).get("keys", [])
+        dialog = ColorKeyDialog(image, keys, self)
+        if dialog.exec_() != ColorKeyDialog.Accepted:
+            return
+        color_key = {"enabled": bool(dialog.keys), "keys": dialog.keys}
+        self.ocr_processor.update_region(region_id, config=dict(region.config or {}, color_key=color_key))
+        if dialog.keys:
+            self.log(f"{region_id}只识别{len(dialog.keys)}种颜色的文字")
+        else:
+            self.log(f"{region_id}已取消文字颜色过滤")
+
+    def dump_flight_record(self):
+        """把飞行记录器中最近的画面保存到磁盘"""
+        try:
+            path = self.ocr_processor.dump_flight_record("手动保存")
+            if path:
+                self.log(f"最近画面已保存到: {os.path.abspath(path)}")
+            else:
+                self.log("没有可保存的画面, 请先勾选\"记录最近画面\"并开启OCR")
+        except Exception as e:
+            self.log_error(f"保存最近画面失败: {str(e)}")
+
+    def toggle_profiling(self):
+        """开启或结束识别循环的性能分析"""
+        try:
+            self.ocr_processor.toggle_profiling()
+        except Exception as e:
+            self.log_error(f"性能分析失败: {str(e)}")
+        self.refresh_profile_button()
+
+    def on_profile_signal(self, signum, frame):
+        """收到SIGUSR1时开启或结束性能分析"""
+        # Python信号处理函数在主线程中运行, 区域统计定时器保证Qt事件循环中能及时处理信号
+        self.toggle_profiling()
+
+    def refresh_profile_button(self):
+        """按分析器状态更新按钮文字, 按帧数或时长自动结束后也能恢复"""
+        text = "结束性能分析" if self.ocr_processor.profiler.active else "开始性能分析"
+        if self.profile_button.text() != text:
+            self.profile_button.setText(text)
+
+    def refresh_region_stats(self):
+        """刷新各区域的截止时间错过次数、文字检测跳过的面积、流水线队列占用、截图和信号合并情况"""
+        self.refresh_profile_button()
+        stats = self.ocr_processor.get_region_stats()
+        detection = self.ocr_processor.get_detection_stats()
+        languages = self.ocr_processor.get_language_stats()
+        parts = []
+        for region_id, item in stats.items():
+            part = f"{region_id}: {item['misses']}(丢弃{item['shed']})"
+            if region_id in detection:
+                part += f" 跳过面积{detection[region_id]['skipped_ratio']:.0%}"
+            if region_id in self.region_stability:
+                part += f" 稳定度{self.region_stability[region_id]:.0%}"
+            if languages.get(region_id):
+                # 各语言被采用的帧数
+                hits = sorted(languages[region_id].items(), key=lambda item: -item[1]["hits"])
+                part += " 语言" + "/".join(f"{lang} {item['hits']}" for lang, item in hits)
+            parts.append(part)
+        text = "超时次数: " + ("  ".join(parts) if parts else "无")
+
+        stage_names = {"preprocess": "预处理", "recognize": "识别", "emit": "输出"}
+        pipeline = self.ocr_processor.get_pipeline_stats()
+        if pipeline:
+            queues = [
+                f"{stage_names.get(name, name)} {item['queued']}/{item['capacity']}(丢弃{item['dropped']})"
+                for name, item in pipeline.items()
+            ]
+            text += "\n队列: " + "  ".join(queues)
+
+        templates = self.action_handler.template_matcher.get_stats()
+        if templates:
+            items = [
+                f"{keyword} {item['mean_time'] * 1000:.1f}ms(命中{item['hits']}/{item['checks']})"
+                for keyword, item in templates.items()
+            ]
+            text += "\n模板匹配: " + "  ".join(items)
+
+        cpu = self.ocr_processor.get_cpu_stats()
+        if cpu["active"]:
+            text += f"\nCPU: {cpu['usage']:.0f}%/{cpu['budget']:g}%"
+            if cpu["level"]:
+                text += f" 降级{cpu['level']}/{cpu['levels']}级({cpu['step']})"
+
+        scroll = self.ocr_processor.get_scroll_stats()
+        if scroll["scrolled"] or scroll["unchanged"]:
+            text += (f"\n滚动检测: 滚动{scroll['scrolled']}帧 未变化{scroll['unchanged']}帧 "
+                     f"完整识别{scroll['full']}帧 实际识别{scroll['recognized_ratio']:.0%}的行")
+
+        capture = self.ocr_processor.get_capture_stats()
+        if capture["saved"]:
+            text += f"\n合并截图: {capture['grabs']}次截图覆盖{capture['regions']}个区域"
+
+        signals = self.coalescing_signals.get_stats()
+        if signals["coalesced"] or signals["dropped"]:
+            text += f"\n界面信号: 合并{signals['coalesced']}次 丢弃{signals['dropped']}次"
+        # 内容没有变化时不刷新控件
+        if self.region_stats_label.text() != text:
+            self.region_stats_label.setText(text)
 
     def toggle_ocr(self):
         """切换OCR状态"""
@@ -199,6 +496,9 @@ class MainWindow(QMainWindow):
             self.transparent_window = TransparentWindow()
         self.transparent_window.show()
 
+        for window in self.region_windows.values():
+            window.show()
+
         # 启动OCR处理器
         self.ocr_processor.start(self.transparent_window)
 
@@ -210,6 +510,8 @@ class MainWindow(QMainWindow):
         # 关闭透明窗口
         if self.transparent_window:
             self.transparent_window.hide()
+        for window in self.region_windows.values():
+            window.hide()
 
     def update_language_support(self):
         """更新语言支持状态"""
@@ -256,6 +558,9 @@ class MainWindow(QMainWindow):
         """窗口关闭时的处理"""
         try:
             self.stop_ocr()
+            self.ocr_processor.keyword_constraint.cleanup()
+            self.ocr_processor.shutdown_publisher()
+            self.action_handler.shutdown()
             event.accept()
         except Exception:
             event.accept()
@@ -281,12 +586,36 @@ class MainWindow(QMainWindow):
                     "sharpen": self.sharpen_checkbox.isChecked(),
                     "denoise": self.denoise_checkbox.isChecked(),
                     "threshold": self.threshold_checkbox.isChecked(),
-                    "scale_factor": self.scale_spin.value()
-                }
+                    "scale_factor": self.scale_spin.value(),
+                    "auto_scale": self.auto_scale_checkbox.isChecked(),
+                },
+                "text_detection": {
+                    "enabled": self.detection_checkbox.isChecked(),
+                },
+                "pipeline": {
+                    "enabled": self.pipeline_checkbox.isChecked(),
+                },
+                "consensus": {
+                    "enabled": self.consensus_checkbox.isChecked(),
+                },
+                "language_cascade": {
+                    "enabled": self.cascade_checkbox.isChecked(),
+                },
+                "scroll_detection": {
+                    "enabled": self.scroll_checkbox.isChecked(),
+                },
+                "flight_recorder": {
+                    "enabled": self.recorder_checkbox.isChecked(),
+                },
+                "publisher": {
+                    "enabled": self.publisher_checkbox.isChecked(),
+                },
             }
             
             # 更新OCR处理器配置
             self.ocr_processor.set_config(config)
+            self.ocr_processor.update_publisher()
+            self.ocr_processor.prewarm_engines()
             self.log("OCR设置已更新")
         except Exception as e:
             self.log_error(f"更新OCR设置出错: {str(e)}")
@@ -301,6 +630,12 @@ class MainWindow(QMainWindow):
             self.denoise_checkbox.setChecked(True)
             self.threshold_checkbox.setChecked(False)
             self.scale_spin.setValue(2.0)
+            self.auto_scale_checkbox.setChecked(False)
+            self.detection_checkbox.setChecked(False)
+            self.pipeline_checkbox.setChecked(False)
+            self.consensus_checkbox.setChecked(False)
+            self.cascade_checkbox.setChecked(False)
+            self.scroll_checkbox.setChecked(False)
             self.psm_combo.setCurrentIndex(0)  # 选择单一文本块模式
             
             # 重置语言设置（如果支持中文则设为中文+英文，否则只设为英文）
@@ -392,6 +727,7 @@ class MainWindow(QMainWindow):
         """更新OCR语言"""
         selected_lang = self.language_combo.itemData(self.language_combo.currentIndex())
         self.ocr_processor.set_language(selected_lang)
+        self.ocr_processor.prewarm_engines()
         self.log(f"已更新OCR语言为: {selected_lang}")
 
     def create_ocr_settings_ui(self):
@@ -463,6 +799,12 @@ class MainWindow(QMainWindow):
         self.scale_spin.valueChanged.connect(self.update_ocr_settings)
         scale_layout.addWidget(self.scale_spin)
         
+        # 根据文字高度自动缩放
+        self.auto_scale_checkbox = QCheckBox("自动缩放")
+        self.auto_scale_checkbox.setChecked(self.ocr_processor.config["image_preprocessing"]["auto_scale"])
+        self.auto_scale_checkbox.toggled.connect(self.update_ocr_settings)
+        scale_layout.addWidget(self.auto_scale_checkbox)
+        
         # 对比度设置
         contrast_layout = QHBoxLayout()
         contrast_layout.addWidget(QLabel("对比度增强:"))
@@ -494,6 +836,46 @@ class MainWindow(QMainWindow):
         self.threshold_checkbox.toggled.connect(self.update_ocr_settings)
         options_layout.addWidget(self.threshold_checkbox)
         
+        # 文字检测(没有文字的画面跳过OCR)
+        self.detection_checkbox = QCheckBox("文字检测")
+        self.detection_checkbox.setChecked(self.ocr_processor.config["text_detection"]["enabled"])
+        self.detection_checkbox.toggled.connect(self.update_ocr_settings)
+        options_layout.addWidget(self.detection_checkbox)
+        
+        # 流水线模式(截图与识别重叠进行, 重新开启OCR后生效)
+        self.pipeline_checkbox = QCheckBox("流水线模式")
+        self.pipeline_checkbox.setChecked(self.ocr_processor.config["pipeline"]["enabled"])
+        self.pipeline_checkbox.toggled.connect(self.update_ocr_settings)
+        options_layout.addWidget(self.pipeline_checkbox)
+        
+        # 多帧投票(配合较快的预处理档位使用)
+        self.consensus_checkbox = QCheckBox("多帧投票")
+        self.consensus_checkbox.setChecked(self.ocr_processor.config["consensus"]["enabled"])
+        self.consensus_checkbox.toggled.connect(self.update_ocr_settings)
+        options_layout.addWidget(self.consensus_checkbox)
+        
+        # 语言级联(组合语言时先用单个语言识别, 置信度不足再用组合模型)
+        self.cascade_checkbox = QCheckBox("语言级联")
+        self.cascade_checkbox.setChecked(self.ocr_processor.config["language_cascade"]["enabled"])
+        self.cascade_checkbox.toggled.connect(self.update_ocr_settings)
+        options_layout.addWidget(self.cascade_checkbox)
+        
+        # 滚动检测(聊天、日志窗格滚动时只识别新露出的部分)
+        self.scroll_checkbox = QCheckBox("滚动检测")
+        self.scroll_checkbox.setChecked(self.ocr_processor.config["scroll_detection"]["enabled"])
+        self.scroll_checkbox.toggled.connect(self.update_ocr_settings)
+        options_layout.addWidget(self.scroll_checkbox)
+        
+        # 预处理档位
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(QLabel("预处理档位:"))
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItem("自定义", None)
+        for name, label in (("quality", "高质量"), ("balanced", "均衡"), ("fast", "快速")):
+            self.profile_combo.addItem(label, name)
+        self.profile_combo.currentIndexChanged.connect(self.apply_preprocessing_profile)
+        profile_layout.addWidget(self.profile_combo)
+        
         # 引擎设置
         engine_layout = QHBoxLayout()
         
@@ -531,6 +913,7 @@ class MainWindow(QMainWindow):
         
         # 添加所有布局到预处理布局
         preprocess_layout.addLayout(enable_layout)
+        preprocess_layout.addLayout(profile_layout)
         preprocess_layout.addLayout(scale_layout)
         preprocess_layout.addLayout(contrast_layout)
         preprocess_layout.addLayout(options_layout)
@@ -539,10 +922,32 @@ class MainWindow(QMainWindow):
         
         return preprocess_layout
 
+    def apply_preprocessing_profile(self):
+        """把选中的预处理档位填入各预处理控件并更新设置"""
+        name = self.profile_combo.currentData()
+        if name is None:
+            return
+        profile = PREPROCESSING_PROFILES[name]
+        widgets = (self.contrast_spin, self.sharpen_checkbox, self.denoise_checkbox,
+                   self.threshold_checkbox, self.scale_spin)
+        # 逐个设置控件时暂不触发更新, 最后统一更新一次
+        for widget in widgets:
+            widget.blockSignals(True)
+        self.contrast_spin.setValue(profile["contrast"])
+        self.sharpen_checkbox.setChecked(profile["sharpen"])
+        self.denoise_checkbox.setChecked(profile["denoise"])
+        self.threshold_checkbox.setChecked(profile["threshold"])
+        self.scale_spin.setValue(profile["scale_factor"])
+        for widget in widgets:
+            widget.blockSignals(False)
+        self.update_ocr_settings()
+        self.log(f"已应用预处理档位: {self.profile_combo.currentText()}")
+
     def create_control_ui(self):
         """创建控制面板UI"""
         control_group = QGroupBox("控制面板")
-        control_layout = QHBoxLayout()
+        control_layout = QVBoxLayout()
+        toggle_layout = QHBoxLayout()
 
         self.toggle_button = QPushButton("开启OCR")
         self.toggle_button.setCheckable(True)
@@ -555,9 +960,84 @@ class MainWindow(QMainWindow):
         self.interval_spin.setValue(self.ocr_processor.interval)
         self.interval_spin.valueChanged.connect(self.update_interval)
 
-        control_layout.addWidget(self.toggle_button)
-        control_layout.addWidget(interval_label)
-        control_layout.addWidget(self.interval_spin)
+        toggle_layout.addWidget(self.toggle_button)
+        toggle_layout.addWidget(interval_label)
+        toggle_layout.addWidget(self.interval_spin)
+
+        # CPU预算: 超出时自动降低预处理档位、减少识别线程、放大识别周期
+        toggle_layout.addWidget(QLabel("CPU预算(%):"))
+        self.cpu_budget_spin = QSpinBox()
+        self.cpu_budget_spin.setRange(0, 100)
+        self.cpu_budget_spin.setSpecialValueText("不限")
+        self.cpu_budget_spin.setValue(self.ocr_processor.config["cpu_budget"]["percent"])
+        self.cpu_budget_spin.valueChanged.connect(self.update_cpu_budget)
+        toggle_layout.addWidget(self.cpu_budget_spin)
+
+        # 区域设置
+        region_layout = QHBoxLayout()
+        region_layout.addWidget(QLabel("区域:"))
+        self.region_combo = QComboBox()
+        self.region_combo.addItem(MAIN_REGION_ID)
+        self.region_combo.currentIndexChanged.connect(self.select_region)
+        region_layout.addWidget(self.region_combo)
+
+        add_region_btn = QPushButton("添加区域")
+        add_region_btn.clicked.connect(self.add_region)
+        region_layout.addWidget(add_region_btn)
+
+        remove_region_btn = QPushButton("删除区域")
+        remove_region_btn.clicked.connect(self.remove_region)
+        region_layout.addWidget(remove_region_btn)
+
+        region_layout.addWidget(QLabel("优先级:"))
+        self.priority_spin = QSpinBox()
+        self.priority_spin.setRange(0, 10)
+        self.priority_spin.valueChanged.connect(self.update_region_priority)
+        region_layout.addWidget(self.priority_spin)
+
+        region_layout.addWidget(QLabel("最大延迟(秒):"))
+        self.staleness_spin = QSpinBox()
+        self.staleness_spin.setRange(0, 600)
+        self.staleness_spin.setSpecialValueText("同间隔")
+        self.staleness_spin.valueChanged.connect(self.update_region_staleness)
+        region_layout.addWidget(self.staleness_spin)
+
+        self.keyword_only_checkbox = QCheckBox("只识别关键字")
+        self.keyword_only_checkbox.toggled.connect(self.update_region_keyword_only)
+        region_layout.addWidget(self.keyword_only_checkbox)
+
+        color_key_btn = QPushButton("文字颜色")
+        color_key_btn.clicked.connect(self.pick_region_color_key)
+        region_layout.addWidget(color_key_btn)
+
+        # 飞行记录器: 保留最近的画面, 动作误触发时可保存下来排查
+        recorder_layout = QHBoxLayout()
+        self.recorder_checkbox = QCheckBox("记录最近画面")
+        self.recorder_checkbox.setChecked(self.ocr_processor.config["flight_recorder"]["enabled"])
+        self.recorder_checkbox.toggled.connect(self.update_ocr_settings)
+        recorder_layout.addWidget(self.recorder_checkbox)
+        dump_btn = QPushButton("保存最近画面")
+        dump_btn.clicked.connect(self.dump_flight_record)
+        recorder_layout.addWidget(dump_btn)
+        self.profile_button = QPushButton("开始性能分析")
+        self.profile_button.clicked.connect(self.toggle_profiling)
+        recorder_layout.addWidget(self.profile_button)
+        # 通过Unix域套接字把识别结果和关键字命中发给其他进程
+        self.publisher_checkbox = QCheckBox("发布识别事件")
+        self.publisher_checkbox.setChecked(self.ocr_processor.config["publisher"]["enabled"])
+        self.publisher_checkbox.toggled.connect(self.update_ocr_settings)
+        recorder_layout.addWidget(self.publisher_checkbox)
+
+        # 各区域截止时间错过次数
+        self.region_stats_label = QLabel()
+        self.region_stats_timer = QTimer(self)
+        self.region_stats_timer.timeout.connect(self.refresh_region_stats)
+        self.region_stats_timer.start(1000)
+
+        control_layout.addLayout(toggle_layout)
+        control_layout.addLayout(region_layout)
+        control_layout.addLayout(recorder_layout)
+        control_layout.addWidget(self.region_stats_label)
         control_group.setLayout(control_layout)
         
         return control_group
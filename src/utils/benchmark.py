@@ -0,0 +1,320 @@
+"""
+OCR性能基准测试工具
+
+使用合成画面对比不同识别方式的耗时, 需要本机已安装Tesseract。
+
+用法:
+    python -m src.utils.benchmark --frames 20 line-ocr --lines 8
+    python -m src.utils.benchmark keywords --rules "Error 404,Hello World" --rules "OCR box"
+    python -m src.utils.benchmark templates --keywords "Error 404,Hello World"
+    python -m src.utils.benchmark color-key --noise 40
+    python -m src.utils.benchmark --frames 500 batch-preprocess --chunk 32
+"""
+import sys
+import time
+import random
+import argparse
+import statistics
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+from src.models.ocr_processor import OCRProcessor
+from src.models.ocr_signals import NullSignals
+from src.models.capture_source import SyntheticCaptureSource, DEFAULT_TEXTS
+from src.models.template_matcher import TemplateMatcher
+from src.models.color_key import key_from_color, isolate_text
+from src.utils.tesseract_finder import TesseractFinder
+
+
+def create_processor(lang="eng"):
+    """
+    创建用于基准测试的OCR处理器
+
+    Args:
+        lang: 识别语言
+
+    Returns:
+        OCRProcessor: 已设置好Tesseract路径的处理器
+    """
+    tesseract_path = TesseractFinder.find_tesseract_path()
+    if not tesseract_path:
+        raise RuntimeError("未找到Tesseract, 无法运行基准测试")
+    processor = OCRProcessor(NullSignals())
+    processor.set_tesseract_path(tesseract_path)
+    processor.set_language(lang)
+    return processor
+
+
+def measure(func, frames, repeat=1):
+    """
+    对每一帧执行func并记录耗时
+
+    Args:
+        func: 处理单帧的函数, 参数为帧
+        frames: 帧列表
+        repeat: 重复轮数
+
+    Returns:
+        tuple: (耗时列表(秒), 最后一轮的结果列表)
+    """
+    timings = []
+    results = []
+    for _ in range(repeat):
+        results = []
+        for frame in frames:
+            start = time.perf_counter()
+            results.append(func(frame))
+            timings.append(time.perf_counter() - start)
+    return timings, results
+
+
+def summarize(name, timings):
+    """输出耗时统计"""
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(f"{name:<24} 平均 {statistics.mean(timings) * 1000:8.1f}ms  "
+          f"中位数 {statistics.median(timings) * 1000:8.1f}ms  P95 {p95 * 1000:8.1f}ms")
+
+
+def bench_line_ocr(args):
+    """对比整块识别和按行并行识别的耗时"""
+    processor = create_processor(args.lang)
+    source = SyntheticCaptureSource(font_path=args.font, font_size=args.font_size, lines=args.lines, seed=0)
+    height = int(args.font_size * 1.6) * args.lines + 20
+    frames = [source.grab((0, 0, args.width, height)) for _ in range(args.frames)]
+
+    processor.set_config({"psm": 11, "line_parallel": {"enabled": False}})
+    processor.get_engine().warm_up()
+    single, single_texts = measure(lambda f: processor.recognize_image(f, processor.config).text, frames)
+
+    processor.set_config({"line_parallel": {"enabled": True, "workers": args.workers}})
+    parallel, parallel_texts = measure(lambda f: processor.recognize_image(f, processor.config).text, frames)
+    processor.shutdown_line_executor()
+
+    print(f"{args.frames}帧, 每帧{args.lines}行, {args.workers}个线程")
+    summarize("整块识别(psm 11)", single)
+    summarize("按行并行识别(psm 7)", parallel)
+    print(f"加速比: {statistics.mean(single) / statistics.mean(parallel):.2f}x")
+    same = sum(a.split() == b.split() for a, b in zip(single_texts, parallel_texts))
+    print(f"识别结果一致的帧: {same}/{len(frames)}")
+
+
+def bench_keywords(args):
+    """对比开放词表识别和关键字约束识别的耗时及关键字检出准确率"""
+    processor = create_processor(args.lang)
+    source = SyntheticCaptureSource(font_path=args.font, font_size=args.font_size, seed=0)
+    rng = random.Random(0)
+    height = int(args.font_size * 1.6) * args.lines + 20
+    samples = []
+    for _ in range(args.frames):
+        lines = [rng.choice(DEFAULT_TEXTS) for _ in range(args.lines)]
+        samples.append(("\n".join(lines), source.render(lines, args.width, height)))
+    frames = [image for _, image in samples]
+
+    def accuracy(keywords, texts):
+        """关键字检出结果与画面实际内容一致的帧数, 以及误报数和漏报数"""
+        correct = false_positive = false_negative = 0
+        for (truth_text, _), text in zip(samples, texts):
+            truth = any(keyword in truth_text for keyword in keywords)
+            detected = any(keyword in text for keyword in keywords)
+            correct += truth == detected
+            false_positive += detected and not truth
+            false_negative += truth and not detected
+        return correct, false_positive, false_negative
+
+    print(f"{args.frames}帧, 每帧{args.lines}行")
+    for rules in args.rules or ["Error 404,Hello World"]:
+        keywords = [keyword.strip() for keyword in rules.split(",") if keyword.strip()]
+        print(f"\n规则: {keywords}")
+        for enabled, name in ((False, "开放词表识别"), (True, "关键字约束识别")):
+            processor.set_keywords(keywords)
+            processor.set_config({"keyword_constraint": {"enabled": enabled}})
+            processor.get_engine().warm_up()
+            timings, results = measure(lambda f: processor.recognize_image(f, processor.config).text, frames)
+            summarize(name, timings)
+            correct, false_positive, false_negative = accuracy(keywords, results)
+            print(f"{'':<24} 检出准确 {correct}/{len(frames)}  误报 {false_positive}  漏报 {false_negative}")
+    processor.keyword_constraint.cleanup()
+
+
+def bench_templates(args):
+    """对比参考图像匹配和OCR子串匹配的每条规则耗时及检出准确率"""
+    keywords = [keyword.strip() for keyword in args.keywords.split(",") if keyword.strip()]
+    source = SyntheticCaptureSource(font_path=args.font, font_size=args.font_size, seed=0)
+    rng = random.Random(0)
+    height = int(args.font_size * 1.6) * args.lines + 20
+    samples = []
+    for _ in range(args.frames):
+        lines = [rng.choice(DEFAULT_TEXTS) for _ in range(args.lines)]
+        samples.append(("\n".join(lines), source.render(lines, args.width, height)))
+
+    matcher = TemplateMatcher(downsample=args.downsample)
+    for keyword in keywords:
+        matcher.render(keyword, args.font, args.font_size)
+    timings, results = measure(lambda f: {keyword for keyword, _, _ in matcher.match(f)},
+                               [image for _, image in samples])
+
+    print(f"{args.frames}帧, 每帧{args.lines}行, 缩小倍数{args.downsample}")
+    summarize("模板匹配(全部规则)", timings)
+    stats = matcher.get_stats()
+    for keyword in keywords:
+        correct = sum((keyword in truth) == (keyword in found) for (truth, _), found in zip(samples, results))
+        print(f"  {keyword:<22} 平均 {stats[keyword]['mean_time'] * 1000:8.2f}ms  "
+              f"检出准确 {correct}/{len(samples)}")
+
+    if args.ocr:
+        processor = create_processor(args.lang)
+        processor.get_engine().warm_up()
+        ocr_timings, texts = measure(lambda f: processor.recognize_image(f, processor.config).text,
+                                     [image for _, image in samples])
+        summarize("OCR子串匹配", ocr_timings)
+        for keyword in keywords:
+            correct = sum((keyword in truth) == (keyword in text) for (truth, _), text in zip(samples, texts))
+            print(f"  {keyword:<22} 检出准确 {correct}/{len(samples)}")
+
+
+def render_noisy(font, font_size, target, distractors, width, height, rng, noise):
+    """
+    在杂乱的彩色背景上绘制一行红色目标文字和若干行其他颜色的干扰文字
+
+    Args:
+        font: 字体
+        font_size: 字号
+        target: 红色目标文字
+        distractors: 干扰文字列表
+        width: 画面宽度
+        height: 画面高度
+        rng: random.Random实例
+        noise: 高斯噪声的标准差
+
+    Returns:
+        PIL.Image: RGB画面
+    """
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    pixels[:] = rng.choice([(235, 235, 235), (40, 45, 60), (200, 215, 230)])
+    for _ in range(12):
+        x, y = rng.randrange(width), rng.randrange(height)
+        color = tuple(rng.randrange(40, 230) for _ in range(3))
+        cv2.rectangle(pixels, (x, y), (x + rng.randrange(40, 200), y + rng.randrange(10, 60)), color, -1)
+    image = Image.fromarray(pixels)
+    draw = ImageDraw.Draw(image)
+    line_height = int(font_size * 1.6)
+    lines = list(distractors) + [target]
+    rng.shuffle(lines)
+    for index, line in enumerate(lines):
+        color = (220, 30, 30) if line is target else rng.choice([(30, 60, 200), (90, 90, 90), (20, 140, 40)])
+        draw.text((10, 10 + index * line_height), line, fill=color, font=font)
+    pixels = np.asarray(image).astype(np.float32)
+    if noise:
+        pixels += np.random.default_rng(rng.randrange(2 ** 32)).normal(0, noise, (height, width, 1))
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+
+def bench_color_key(args):
+    """对比常规预处理和按颜色键提取文字在杂乱背景上的识别耗时及目标文字检出准确率"""
+    source = SyntheticCaptureSource(font_path=args.font, font_size=args.font_size, seed=0)
+    rng = random.Random(0)
+    height = int(args.font_size * 1.6) * (args.distractors + 1) + 20
+    samples = []
+    for _ in range(args.frames):
+        target = rng.choice(DEFAULT_TEXTS)
+        distractors = [rng.choice(DEFAULT_TEXTS) for _ in range(args.distractors)]
+        samples.append((target, render_noisy(source.font, args.font_size, target, distractors, args.width, height,
+                                             rng, args.noise)))
+    frames = [image for _, image in samples]
+    keys = [key_from_color((220, 30, 30), args.hue_tolerance)]
+
+    mask_timings, _ = measure(lambda f: isolate_text(cv2.cvtColor(np.asarray(f), cv2.COLOR_RGB2BGR), keys), frames)
+    print(f"{args.frames}帧, 每帧1行红色目标文字和{args.distractors}行干扰文字, 噪声{args.noise}")
+    summarize("颜色键提取(仅掩码)", mask_timings)
+
+    processor = create_processor(args.lang)
+    processor.get_engine().warm_up()
+    baseline = None
+    for enabled, name in ((False, "常规预处理+OCR"), (True, "颜色键提取+OCR")):
+        processor.set_config({"color_key": {"enabled": enabled, "keys": keys}})
+        timings, texts = measure(lambda f: processor.recognize_image(f, processor.config).text, frames)
+        summarize(name, timings)
+        found = sum(target in text for (target, _), text in zip(samples, texts))
+        print(f"{'':<24} 目标文字检出 {found}/{len(frames)}")
+        if baseline is None:
+            baseline = statistics.mean(timings)
+        else:
+            print(f"延迟降低: {1 - statistics.mean(timings) / baseline:.0%}")
+
+
+def bench_batch_preprocess(args):
+    """对比逐帧预处理和批量预处理的吞吐量, 并检查两者的输出是否逐位一致(无需Tesseract)"""
+    source = SyntheticCaptureSource(font_path=args.font, font_size=args.font_size, seed=0)
+    stack = np.stack([np.asarray(source.grab((0, 0, args.width, args.height)).convert("RGB"))
+                      for _ in range(args.frames)])
+    processor = OCRProcessor(NullSignals())
+    print(f"{args.frames}帧 {args.width}x{args.height}, 每批{args.chunk}帧")
+    for profile in args.profiles.split(","):
+        processor.apply_profile(profile)
+        start = time.perf_counter()
+        singles = [processor.preprocess_image(frame) for frame in stack]
+        single_time = time.perf_counter() - start
+        start = time.perf_counter()
+        batches = list(processor.iter_preprocess_batches(stack, args.chunk))
+        batch_time = time.perf_counter() - start
+        outputs = [frame for batch in batches for frame in batch]
+        mismatches = sum(Image.fromarray(output).tobytes() != single.tobytes()
+                         for output, single in zip(outputs, singles))
+        print(f"{profile:<10} 逐帧 {single_time / args.frames * 1000:6.3f}ms/帧  "
+              f"批量 {batch_time / args.frames * 1000:6.3f}ms/帧  "
+              f"加速 {single_time / batch_time:4.2f}x  不一致 {mismatches}帧")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR盒子性能基准测试")
+    parser.add_argument("--lang", default="eng", help="识别语言")
+    parser.add_argument("--font", default=None, help="合成画面使用的字体路径")
+    parser.add_argument("--font-size", type=int, default=24, help="合成画面的字号")
+    parser.add_argument("--frames", type=int, default=20, help="测试帧数")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    line_parser = subparsers.add_parser("line-ocr", help="整块识别与按行并行识别的延迟对比")
+    line_parser.add_argument("--lines", type=int, default=8, help="每帧的文字行数")
+    line_parser.add_argument("--width", type=int, default=800, help="画面宽度")
+    line_parser.add_argument("--workers", type=int, default=4, help="并行线程数")
+    line_parser.set_defaults(func=bench_line_ocr)
+
+    keyword_parser = subparsers.add_parser("keywords", help="开放词表识别与关键字约束识别的延迟和准确率对比")
+    keyword_parser.add_argument("--rules", action="append", help="一组以逗号分隔的关键字, 可重复指定多组")
+    keyword_parser.add_argument("--lines", type=int, default=3, help="每帧的文字行数")
+    keyword_parser.add_argument("--width", type=int, default=600, help="画面宽度")
+    keyword_parser.set_defaults(func=bench_keywords)
+
+    template_parser = subparsers.add_parser("templates", help="参考图像匹配与OCR子串匹配的耗时和准确率对比")
+    template_parser.add_argument("--keywords", default="Error 404,Hello World", help="以逗号分隔的关键字")
+    template_parser.add_argument("--lines", type=int, default=3, help="每帧的文字行数")
+    template_parser.add_argument("--width", type=int, default=600, help="画面宽度")
+    template_parser.add_argument("--downsample", type=float, default=0.5, help="画面和模板的缩小倍数")
+    template_parser.add_argument("--no-ocr", dest="ocr", action="store_false", help="不运行OCR对比(无需Tesseract)")
+    template_parser.set_defaults(func=bench_templates)
+
+    color_parser = subparsers.add_parser("color-key", help="杂乱背景上常规预处理与颜色键提取的延迟和准确率对比")
+    color_parser.add_argument("--distractors", type=int, default=2, help="每帧的干扰文字行数")
+    color_parser.add_argument("--width", type=int, default=600, help="画面宽度")
+    color_parser.add_argument("--noise", type=float, default=20, help="背景高斯噪声的标准差")
+    color_parser.add_argument("--hue-tolerance", type=int, default=10, help="颜色键的色相容差")
+    color_parser.set_defaults(func=bench_color_key)
+
+    batch_parser = subparsers.add_parser("batch-preprocess", help="逐帧预处理与批量预处理的吞吐量对比")
+    batch_parser.add_argument("--chunk", type=int, default=32, help="每批的帧数")
+    batch_parser.add_argument("--width", type=int, default=640, help="画面宽度")
+    batch_parser.add_argument("--height", type=int, default=120, help="画面高度")
+    batch_parser.add_argument("--profiles", default="balanced,fast",
+                              help="以逗号分隔的预处理档位, quality档位的降噪耗时远大于其余步骤")
+    batch_parser.set_defaults(func=bench_batch_preprocess)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
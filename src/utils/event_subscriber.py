@@ -0,0 +1,59 @@
+"""
+识别事件订阅工具
+
+连接OCR盒子的事件发布套接字(界面中勾选"发布识别事件"), 实时打印各区域的文本变化和
+关键字命中, 也可以作为编写订阅程序的示例。
+
+用法:
+    python -m src.utils.event_subscriber
+    python -m src.utils.event_subscriber --socket /tmp/ocr_box_events.sock --matches-only
+"""
+import sys
+import time
+import argparse
+
+from src.models.event_publisher import (
+    EventSubscriber, DEFAULT_SOCKET, EVENT_SNAPSHOT, EVENT_DELTA, EVENT_MATCH,
+)
+
+
+def format_event(event):
+    """格式化一个事件, 显示发布到收到的延迟"""
+    latency = (time.time() - event.timestamp) * 1000
+    prefix = f"[{event.region_id} #{event.seq} {latency:.1f}ms]"
+    if event.kind == EVENT_MATCH:
+        return f"{prefix} 命中({event.source}): {', '.join(event.keywords)}"
+    if event.kind == EVENT_SNAPSHOT:
+        return f"{prefix} 完整文本:\n{event.text}"
+    added = [line for _, _, _, lines in event.changes for line in lines]
+    return f"{prefix} 变化{len(event.changes)}处: " + " | ".join(added)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR盒子识别事件订阅")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET, help="事件发布的Unix域套接字路径")
+    parser.add_argument("--matches-only", action="store_true", help="只显示关键字命中")
+    args = parser.parse_args(argv)
+
+    try:
+        subscriber = EventSubscriber(args.socket)
+    except OSError as e:
+        print(f"无法连接{args.socket}: {e}")
+        return 1
+
+    print(f"已连接: {args.socket}")
+    try:
+        with subscriber:
+            for event in subscriber:
+                if args.matches_only and event.kind != EVENT_MATCH:
+                    continue
+                if event.kind in (EVENT_SNAPSHOT, EVENT_DELTA, EVENT_MATCH):
+                    print(format_event(event), flush=True)
+    except KeyboardInterrupt:
+        pass
+    print("连接已断开")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+容量规划负载生成工具
+
+用合成画面(中英文混排)驱动OCRProcessor, 按"区域数 × 识别间隔"由低到高逐级加压,
+测量每一级的实际吞吐量和响应延迟(从任务释放到识别完成), 找出每种预处理档位和
+工作线程数下能持续承受的最大帧率以及开始饱和的负载。
+
+用法:
+    python -m src.utils.load_generator --regions 1,2,4,8 --intervals 1,0.5,0.25 --profiles fast,balanced
+    python -m src.utils.load_generator --workers 1,2,4 --width 640 --height 200 --font /path/to/simhei.ttf
+"""
+import sys
+import time
+import argparse
+import threading
+
+from src.models.ocr_processor import OCRProcessor, PREPROCESSING_PROFILES
+from src.models.ocr_region import OCRRegion
+from src.models.ocr_signals import NullSignals
+from src.models.capture_source import SyntheticCaptureSource
+from src.utils.tesseract_finder import TesseractFinder
+
+
+class LoadStep:
+    """一级负载的测量结果"""
+
+    __slots__ = ("regions", "interval", "duration", "latencies")
+
+    def __init__(self, regions, interval, duration, latencies):
+        self.regions = regions
+        self.interval = interval
+        self.duration = duration
+        self.latencies = sorted(latencies)
+
+    @property
+    def offered_rate(self):
+        """施加的负载(帧/秒)"""
+        return self.regions / self.interval
+
+    @property
+    def achieved_rate(self):
+        """实际完成的帧率(帧/秒)"""
+        return len(self.latencies) / self.duration if self.duration else 0.0
+
+    def percentile(self, ratio):
+        """响应延迟的分位数(秒), 没有完成的帧时为无穷大"""
+        if not self.latencies:
+            return float("inf")
+        return self.latencies[min(len(self.latencies) - 1, int(len(self.latencies) * ratio))]
+
+    @property
+    def saturated(self):
+        """实际帧率明显低于施加的负载, 或P95延迟超过识别间隔时视为饱和"""
+        return self.achieved_rate < 0.9 * self.offered_rate or self.percentile(0.95) > self.interval
+
+
+class LoadGenerator:
+    """
+    容量规划负载生成器
+    """
+
+    def __init__(self, width=480, height=160, step_seconds=10, warmup=2, font_path=None, lang="chi_sim+eng"):
+        """
+        初始化负载生成器
+
+        Args:
+            width: 每个区域的宽度
+            height: 每个区域的高度
+            step_seconds: 每一级负载的测量时长(秒)
+            warmup: 每一级负载开始后不计入统计的时长(秒)
+            font_path: 合成画面使用的字体, 绘制中文时需要指定支持中文的字体
+            lang: 识别语言
+        """
+        self.width = width
+        self.height = height
+        self.step_seconds = step_seconds
+        self.warmup = warmup
+        self.font_path = font_path
+        self.lang = lang
+        self._latencies = []
+        self._measuring = False
+        self._lock = threading.Lock()
+
+    def create_processor(self, tesseract_path, profile, workers):
+        """创建按档位和线程数配置好的处理器"""
+        processor = OCRProcessor(NullSignals())
+        processor.set_tesseract_path(tesseract_path)
+        processor.set_language(self.lang)
+        processor.apply_profile(profile)
+        processor.set_max_workers(workers)
+        lines = max(1, (self.height - 20) // 38)
+        processor.set_capture_source(SyntheticCaptureSource(font_path=self.font_path, lines=lines, seed=0))
+        processor.scheduler.listener = self.on_complete
+        processor.get_engine().warm_up()
+        return processor
+
+    def on_complete(self, region_id, release, start, end):
+        """记录一帧从释放到完成的响应延迟"""
+        with self._lock:
+            if self._measuring:
+                self._latencies.append(end - release)
+
+    def run_step(self, processor, regions, interval):
+        """
+        以指定的区域数和间隔运行一级负载
+
+        Returns:
+            LoadStep: 测量结果
+        """
+        for region_id in list(processor.regions):
+            processor.remove_region(region_id)
+        processor.capture_source.clear_regions()
+        for index in range(regions):
+            top = index * (self.height + 10)
+            bbox = (0, top, self.width, top + self.height)
+            # 合并截图时每个区域仍能截到自己的文字
+            processor.capture_source.add_region(bbox)
+            processor.add_region(OCRRegion(f"load{index}", bbox=bbox, interval=interval))
+
+        with self._lock:
+            self._latencies = []
+            self._measuring = False
+        processor.start(None)
+        try:
+            time.sleep(self.warmup)
+            with self._lock:
+                self._measuring = True
+            start = time.monotonic()
+            time.sleep(self.step_seconds)
+            with self._lock:
+                self._measuring = False
+                latencies = list(self._latencies)
+            duration = time.monotonic() - start
+        finally:
+            processor.stop()
+        return LoadStep(regions, interval, duration, latencies)
+
+    def ramp(self, tesseract_path, profile, workers, region_counts, intervals, patience=2):
+        """
+        按施加负载从低到高逐级运行, 连续patience级饱和后停止
+
+        Returns:
+            list: LoadStep列表
+        """
+        processor = self.create_processor(tesseract_path, profile, workers)
+        levels = sorted(((n, i) for n in region_counts for i in intervals), key=lambda item: item[0] / item[1])
+        steps = []
+        saturated_in_row = 0
+        for regions, interval in levels:
+            step = self.run_step(processor, regions, interval)
+            steps.append(step)
+            print(format_step(step), flush=True)
+            saturated_in_row = saturated_in_row + 1 if step.saturated else 0
+            if saturated_in_row >= patience:
+                break
+        return steps
+
+
+def format_step(step):
+    """格式化一级负载的结果"""
+    status = "饱和" if step.saturated else "正常"
+    return (f"  {step.regions:>3}个区域 × {step.interval:>5.2f}秒  施加 {step.offered_rate:6.1f}帧/秒  "
+            f"完成 {step.achieved_rate:6.1f}帧/秒  P50 {step.percentile(0.5) * 1000:8.1f}ms  "
+            f"P95 {step.percentile(0.95) * 1000:8.1f}ms  {status}")
+
+
+def summarize(steps):
+    """
+    汇总一组负载的最大可持续帧率和饱和点
+
+    Returns:
+        tuple: (实际帧率最高的未饱和LoadStep或None, 第一个饱和的LoadStep或None)
+    """
+    sustainable = None
+    saturation = None
+    for step in steps:
+        if step.saturated:
+            if saturation is None:
+                saturation = step
+        elif sustainable is None or step.achieved_rate > sustainable.achieved_rate:
+            sustainable = step
+    return sustainable, saturation
+
+
+def parse_list(value, convert):
+    """解析逗号分隔的列表"""
+    return [convert(item) for item in value.split(",") if item.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR盒子容量规划负载生成")
+    parser.add_argument("--regions", default="1,2,4,8", help="区域数量, 逗号分隔")
+    parser.add_argument("--intervals", default="1,0.5,0.25", help="识别间隔(秒), 逗号分隔")
+    parser.add_argument("--profiles", default="fast,balanced,quality", help="预处理档位, 逗号分隔")
+    parser.add_argument("--workers", default="1,2,4", help="工作线程数, 逗号分隔")
+    parser.add_argument("--width", type=int, default=480, help="区域宽度")
+    parser.add_argument("--height", type=int, default=160, help="区域高度")
+    parser.add_argument("--step-seconds", type=float, default=10, help="每一级负载的测量时长(秒)")
+    parser.add_argument("--warmup", type=float, default=2, help="每一级负载的预热时长(秒)")
+    parser.add_argument("--patience", type=int, default=2, help="连续多少级饱和后停止加压")
+    parser.add_argument("--lang", default="chi_sim+eng", help="识别语言")
+    parser.add_argument("--font", default=None, help="合成画面使用的字体路径(绘制中文需要)")
+    args = parser.parse_args(argv)
+
+    tesseract_path = TesseractFinder.find_tesseract_path()
+    if not tesseract_path:
+        print("未找到Tesseract, 无法运行负载测试")
+        return 1
+    profiles = parse_list(args.profiles, str)
+    unknown = [name for name in profiles if name not in PREPROCESSING_PROFILES]
+    if unknown:
+        print(f"未知的预处理档位: {', '.join(unknown)}")
+        return 1
+
+    generator = LoadGenerator(args.width, args.height, args.step_seconds, args.warmup, args.font, args.lang)
+    region_counts = parse_list(args.regions, int)
+    intervals = parse_list(args.intervals, float)
+    results = []
+    for profile in profiles:
+        for workers in parse_list(args.workers, int):
+            print(f"\n档位 {profile}, {workers}个工作线程:")
+            steps = generator.ramp(tesseract_path, profile, workers, region_counts, intervals, args.patience)
+            results.append((profile, workers, summarize(steps)))
+
+    print("\n汇总:")
+    for profile, workers, (sustainable, saturation) in results:
+        best = (f"最大可持续 {sustainable.achieved_rate:.1f}帧/秒"
+                f"({sustainable.regions}个区域 × {sustainable.interval:g}秒)") if sustainable else "最低负载即已饱和"
+        point = (f"饱和点 {saturation.offered_rate:.1f}帧/秒"
+                 f"({saturation.regions}个区域 × {saturation.interval:g}秒)") if saturation else "未达到饱和"
+        print(f"  {profile:<9} {workers}线程  {best}  {point}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
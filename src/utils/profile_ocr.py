@@ -0,0 +1,118 @@
+"""
+识别循环性能分析工具
+
+两种用法:
+- 指定--pid时向正在运行的OCR盒子发送SIGUSR1, 开启或结束其性能分析, 结果写入该进程
+  配置的输出目录并显示在操作日志中。
+- 不指定--pid时用合成画面在本进程中驱动识别循环, 按帧数或时长采集后写入pstats或
+  折叠栈文件。
+
+折叠栈文件可用flamegraph.pl生成火焰图, 或直接拖入speedscope查看。
+
+用法:
+    python -m src.utils.profile_ocr --pid 12345
+    python -m src.utils.profile_ocr --mode sample --seconds 20 --regions 3 --interval 0.2
+    python -m src.utils.profile_ocr --mode cprofile --frames 200 --output profiles
+"""
+import os
+import sys
+import time
+import signal
+import argparse
+
+from src.models.ocr_processor import OCRProcessor, PREPROCESSING_PROFILES
+from src.models.ocr_region import OCRRegion
+from src.models.ocr_signals import NullSignals
+from src.models.capture_source import SyntheticCaptureSource
+from src.models.frame_profiler import PROFILER_MODES, summarize_pstats
+from src.utils.tesseract_finder import TesseractFinder
+
+
+def signal_process(pid):
+    """
+    向正在运行的OCR盒子发送SIGUSR1
+
+    Returns:
+        int: 退出码
+    """
+    if not hasattr(signal, "SIGUSR1"):
+        print("当前系统不支持SIGUSR1, 请在界面中点击\"开始性能分析\"")
+        return 1
+    try:
+        os.kill(pid, signal.SIGUSR1)
+    except OSError as e:
+        print(f"发送信号失败: {e}")
+        return 1
+    print(f"已向进程{pid}发送SIGUSR1, 分析结果见该进程的操作日志")
+    return 0
+
+
+def profile_synthetic(args):
+    """
+    用合成画面驱动识别循环并采集性能数据
+
+    Returns:
+        int: 退出码
+    """
+    tesseract_path = TesseractFinder.find_tesseract_path()
+    if not tesseract_path:
+        print("未找到Tesseract, 无法运行识别循环")
+        return 1
+
+    processor = OCRProcessor(NullSignals())
+    processor.set_tesseract_path(tesseract_path)
+    processor.set_language(args.lang)
+    if args.profile:
+        processor.apply_profile(args.profile)
+    source = SyntheticCaptureSource(font_path=args.font)
+    processor.set_capture_source(source)
+    processor.get_engine().warm_up()
+    for index in range(args.regions):
+        top = index * 130
+        bbox = (0, top, 480, top + 120)
+        source.add_region(bbox)
+        processor.add_region(OCRRegion(f"profile{index}", bbox=bbox, interval=args.interval))
+
+    processor.config["profiler"]["directory"] = args.output
+    processor.start(None)
+    try:
+        processor.start_profiling(args.mode, args.frames, args.seconds)
+        # 按帧数结束时分析器会自行停止, 这里另外设置一个兜底时长
+        deadline = time.monotonic() + (args.seconds or 600)
+        while processor.profiler.active and time.monotonic() < deadline:
+            time.sleep(0.1)
+        path = processor.stop_profiling() or processor.profiler.last_output
+    finally:
+        processor.stop()
+
+    stats = processor.profiler.get_stats()
+    print(f"共分析{stats['frames']}帧, 结果已保存到: {os.path.abspath(path)}")
+    if args.mode == "cprofile" and stats["frames"]:
+        print(summarize_pstats(path, args.top))
+    elif args.mode == "sample":
+        print(f"采样{stats['samples']}次(等待中{stats['idle_samples']}次)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR盒子识别循环性能分析")
+    parser.add_argument("--pid", type=int, default=None, help="向该进程发送SIGUSR1, 开启或结束其性能分析")
+    parser.add_argument("--mode", choices=PROFILER_MODES, default="cprofile", help="分析方式")
+    parser.add_argument("--frames", type=int, default=100, help="分析多少帧后结束, 0表示不限")
+    parser.add_argument("--seconds", type=float, default=30, help="分析多少秒后结束, 0表示不限")
+    parser.add_argument("--regions", type=int, default=2, help="区域数量")
+    parser.add_argument("--interval", type=float, default=0.2, help="识别间隔(秒)")
+    parser.add_argument("--profile", choices=sorted(PREPROCESSING_PROFILES), default=None, help="预处理档位")
+    parser.add_argument("--lang", default="chi_sim+eng", help="识别语言")
+    parser.add_argument("--font", default=None, help="合成画面使用的字体路径")
+    parser.add_argument("--output", default="profiles", help="输出目录")
+    parser.add_argument("--top", type=int, default=15, help="cprofile模式下列出的函数数量")
+    args = parser.parse_args(argv)
+
+    if args.pid is not None:
+        return signal_process(args.pid)
+    return profile_synthetic(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
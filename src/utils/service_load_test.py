@@ -0,0 +1,185 @@
+"""
+本地OCR服务压力测试客户端
+
+多个线程并发向OCR服务发送合成画面, 统计每秒请求数和延迟分位数。
+
+用法:
+    python -m src.utils.service_load_test --url http://127.0.0.1:8765 --concurrency 8 --duration 30
+    python -m src.utils.service_load_test --unix-socket /tmp/ocr_box.sock
+"""
+import io
+import sys
+import json
+import time
+import socket
+import argparse
+import threading
+import http.client
+from urllib.parse import urlparse, urlencode
+
+from src.models.capture_source import SyntheticCaptureSource
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """通过Unix域套接字发送HTTP请求的连接"""
+
+    def __init__(self, socket_path, timeout=30):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+class OCRServiceClient:
+    """
+    OCR服务客户端
+    """
+
+    def __init__(self, url="http://127.0.0.1:8765", unix_socket=None, timeout=30):
+        """
+        初始化客户端
+
+        Args:
+            url: 服务地址
+            unix_socket: Unix域套接字路径, 指定后忽略url
+            timeout: 请求超时时间(秒)
+        """
+        self.url = urlparse(url)
+        self.unix_socket = unix_socket
+        self.timeout = timeout
+        self._connection = None
+
+    def _connect(self):
+        if self.unix_socket:
+            return UnixHTTPConnection(self.unix_socket, self.timeout)
+        return http.client.HTTPConnection(self.url.hostname, self.url.port or 80, timeout=self.timeout)
+
+    def recognize(self, image_bytes, **options):
+        """
+        识别一张图像
+
+        Args:
+            image_bytes: 图像文件内容(PNG/JPEG等)
+            **options: lang、psm、oem、preprocess等可选配置
+
+        Returns:
+            dict: 服务返回的结果, 包括text、words、batch_size、latency_ms
+        """
+        path = "/ocr" + (f"?{urlencode(options)}" if options else "")
+        for attempt in range(2):
+            if self._connection is None:
+                self._connection = self._connect()
+            try:
+                self._connection.request("POST", path, body=image_bytes,
+                                         headers={"Content-Type": "application/octet-stream"})
+                response = self._connection.getresponse()
+                payload = json.loads(response.read().decode("utf-8"))
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # 连接被服务端关闭时重连一次
+                self.close()
+                if attempt:
+                    raise
+        if response.status != 200:
+            raise RuntimeError(payload.get("error", f"HTTP {response.status}"))
+        return payload
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+def render_samples(count, width, height, font_path=None):
+    """生成若干张PNG编码的合成画面"""
+    source = SyntheticCaptureSource(font_path=font_path, lines=max(1, height // 40), seed=0)
+    samples = []
+    for _ in range(count):
+        buffer = io.BytesIO()
+        source.grab((0, 0, width, height)).save(buffer, format="PNG")
+        samples.append(buffer.getvalue())
+    return samples
+
+
+def percentile(ordered, ratio):
+    """已排序列表的分位数"""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def run_load_test(url, unix_socket, concurrency, duration, samples, options):
+    """
+    运行压力测试
+
+    Returns:
+        tuple: (延迟列表(秒), 批大小列表, 错误数, 实际运行时长)
+    """
+    latencies = []
+    batch_sizes = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(index):
+        client = OCRServiceClient(url, unix_socket)
+        count = 0
+        while time.monotonic() < deadline:
+            image_bytes = samples[(index + count) % len(samples)]
+            count += 1
+            start = time.perf_counter()
+            try:
+                result = client.recognize(image_bytes, **options)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                batch_sizes.append(result.get("batch_size", 1))
+        client.close()
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, batch_sizes, errors[0], time.monotonic() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR盒子本地服务压力测试")
+    parser.add_argument("--url", default="http://127.0.0.1:8765", help="服务地址")
+    parser.add_argument("--unix-socket", default=None, help="Unix域套接字路径")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发客户端数")
+    parser.add_argument("--duration", type=float, default=30, help="测试时长(秒)")
+    parser.add_argument("--width", type=int, default=480, help="图像宽度")
+    parser.add_argument("--height", type=int, default=120, help="图像高度")
+    parser.add_argument("--lang", default=None, help="识别语言")
+    parser.add_argument("--psm", type=int, default=None, help="页面分割模式")
+    parser.add_argument("--font", default=None, help="合成画面使用的字体路径")
+    args = parser.parse_args(argv)
+
+    options = {name: value for name, value in (("lang", args.lang), ("psm", args.psm)) if value is not None}
+    samples = render_samples(16, args.width, args.height, args.font)
+    latencies, batch_sizes, errors, elapsed = run_load_test(
+        args.url, args.unix_socket, args.concurrency, args.duration, samples, options
+    )
+    if not latencies:
+        print(f"没有成功的请求, 错误数: {errors}")
+        return 1
+
+    ordered = sorted(latencies)
+    print(f"并发 {args.concurrency}, 时长 {elapsed:.1f}秒, 成功 {len(latencies)}, 错误 {errors}")
+    print(f"吞吐量: {len(latencies) / elapsed:.1f} 请求/秒")
+    print(f"延迟: P50 {percentile(ordered, 0.5) * 1000:.1f}ms  P90 {percentile(ordered, 0.9) * 1000:.1f}ms  "
+          f"P99 {percentile(ordered, 0.99) * 1000:.1f}ms  最大 {ordered[-1] * 1000:.1f}ms")
+    print(f"平均批大小: {sum(batch_sizes) / len(batch_sizes):.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+长时间运行(浸泡)测试工具
+
+使用合成截图来源驱动完整的OCR流程, 周期性地启停OCR, 并定期记录内存(RSS和
+tracemalloc)、线程数和打开的文件描述符数量。运行结束时与预热后的基线比较,
+增长超过阈值即判定为资源泄漏。
+
+用法:
+    python -m src.utils.soak --hours 4 --regions 3 --interval 0.5
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import tracemalloc
+
+from PyQt5.QtCore import QCoreApplication
+
+from src.models.ocr_signals import OCRSignals
+from src.models.ocr_processor import OCRProcessor
+from src.models.ocr_region import OCRRegion
+from src.models.capture_source import SyntheticCaptureSource
+from src.utils.tesseract_finder import TesseractFinder
+
+
+def get_rss_bytes():
+    """
+    获取当前进程的常驻内存(RSS)
+
+    Returns:
+        int: 字节数, 无法获取时返回None
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+
+def count_open_fds():
+    """
+    获取当前进程打开的文件描述符数量
+
+    Returns:
+        int: 数量, 无法获取时返回None
+    """
+    for fd_dir in ("/proc/self/fd", "/dev/fd"):
+        if os.path.isdir(fd_dir):
+            return len(os.listdir(fd_dir))
+    try:
+        import psutil
+        process = psutil.Process()
+        return process.num_handles() if os.name == "nt" else process.num_fds()
+    except ImportError:
+        return None
+
+
+class ResourceSample:
+    """某一时刻的资源占用"""
+
+    __slots__ = ("elapsed", "rss", "traced", "threads", "fds", "frames")
+
+    def __init__(self, elapsed, rss, traced, threads, fds, frames):
+        self.elapsed = elapsed
+        self.rss = rss
+        self.traced = traced
+        self.threads = threads
+        self.fds = fds
+        self.frames = frames
+
+    def __str__(self):
+        rss = f"{self.rss / 1024 / 1024:.1f}MB" if self.rss is not None else "未知"
+        return (f"[{self.elapsed / 60:7.1f}分钟] RSS={rss} tracemalloc={self.traced / 1024 / 1024:.1f}MB "
+                f"线程={self.threads} 文件描述符={self.fds} 已识别帧={self.frames}")
+
+
+class SoakTest:
+    """
+    浸泡测试, 长时间驱动OCR流程并检测资源泄漏
+    """
+
+    def __init__(self, duration, regions=2, interval=0.5, cycle=300, sample_every=60, warmup=300,
+                 rss_limit_mb=50, traced_limit_mb=20, thread_slack=2, fd_slack=5, font_path=None):
+        """
+        初始化浸泡测试
+
+        Args:
+            duration: 运行时长(秒)
+            regions: 同时识别的区域数量
+            interval: 每个区域的识别间隔(秒)
+            cycle: 每隔多少秒停止并重新启动一次OCR, 0表示不启停
+            sample_every: 资源采样间隔(秒)
+            warmup: 预热时长(秒), 预热结束时的采样作为基线
+            rss_limit_mb: 允许的RSS增长上限(MB)
+            traced_limit_mb: 允许的tracemalloc增长上限(MB)
+            thread_slack: 允许的线程数增长
+            fd_slack: 允许的文件描述符增长
+            font_path: 合成画面使用的字体
+        """
+        self.duration = duration
+        self.region_count = regions
+        self.interval = interval
+        self.cycle = cycle
+        self.sample_every = sample_every
+        self.warmup = warmup
+        self.rss_limit = rss_limit_mb * 1024 * 1024
+        self.traced_limit = traced_limit_mb * 1024 * 1024
+        self.thread_slack = thread_slack
+        self.fd_slack = fd_slack
+
+        self.app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+        self.signals = OCRSignals()
+        self.frames = 0
+        self.errors = []
+        self.signals.text_detected.connect(self.on_text)
+        self.signals.error_message.connect(self.errors.append)
+
+        self.processor = OCRProcessor(self.signals, interval=interval)
+        source = SyntheticCaptureSource(font_path=font_path, change_every=5)
+        self.processor.set_capture_source(source)
+        for index in range(regions):
+            top = index * 200
+            bbox = (0, top, 480, top + 160)
+            # 合并截图时每个区域仍能截到自己的文字
+            source.add_region(bbox)
+            self.processor.add_region(OCRRegion(f"soak{index}", bbox=bbox))
+
+        self.samples = []
+        # 每次停止OCR后的线程数, 用于确认启停后回到稳定状态
+        self.idle_threads = []
+        self.baseline = None
+        self.baseline_snapshot = None
+
+    def on_text(self, region_id, text):
+        """统计识别完成的帧数"""
+        self.frames += 1
+
+    def sample(self, start):
+        """记录一次资源占用"""
+        current, _ = tracemalloc.get_traced_memory()
+        item = ResourceSample(time.monotonic() - start, get_rss_bytes(), current,
+                              threading.active_count(), count_open_fds(), self.frames)
+        self.samples.append(item)
+        print(item, flush=True)
+        return item
+
+    def pump(self, seconds):
+        """处理Qt事件(跨线程信号), 持续指定时长"""
+        end = time.monotonic() + seconds
+        while time.monotonic() < end:
+            self.app.processEvents()
+            time.sleep(0.05)
+
+    def run(self):
+        """
+        运行浸泡测试
+
+        Returns:
+            list: 失败原因列表, 为空表示通过
+        """
+        tesseract_path = TesseractFinder.find_tesseract_path()
+        if not tesseract_path:
+            return ["未找到Tesseract, 无法运行浸泡测试"]
+        self.processor.set_tesseract_path(tesseract_path)
+
+        tracemalloc.start(25)
+        start = time.monotonic()
+        last_sample = last_cycle = start
+        self.processor.start(None)
+        try:
+            while time.monotonic() - start < self.duration:
+                self.pump(1)
+                now = time.monotonic()
+
+                if self.cycle and now - last_cycle >= self.cycle:
+                    # 启停一次, 停止后线程数应回到启动前的水平
+                    self.processor.stop()
+                    self.pump(0.5)
+                    self.idle_threads.append(threading.active_count())
+                    self.processor.start(None)
+                    last_cycle = now
+
+                if now - last_sample >= self.sample_every:
+                    item = self.sample(start)
+                    last_sample = now
+                    if self.baseline is None and item.elapsed >= self.warmup:
+                        self.baseline = item
+                        self.baseline_snapshot = tracemalloc.take_snapshot()
+        finally:
+            self.processor.stop()
+            self.pump(0.5)
+            self.idle_threads.append(threading.active_count())
+
+        final = self.sample(start)
+        failures = self.check(final)
+        if failures and self.baseline_snapshot is not None:
+            print("tracemalloc增长最多的位置:")
+            diff = tracemalloc.take_snapshot().compare_to(self.baseline_snapshot, "lineno")
+            for stat in diff[:10]:
+                print(f"  {stat}")
+        tracemalloc.stop()
+        return failures
+
+    def check(self, final):
+        """将最终采样与基线比较, 返回失败原因"""
+        baseline = self.baseline or (self.samples[0] if self.samples else None)
+        if baseline is None or baseline is final:
+            return ["运行时间过短, 没有可比较的采样"]
+
+        failures = []
+        if final.rss is not None and baseline.rss is not None and final.rss - baseline.rss > self.rss_limit:
+            failures.append(f"RSS增长{(final.rss - baseline.rss) / 1024 / 1024:.1f}MB, 超过阈值")
+        if final.traced - baseline.traced > self.traced_limit:
+            failures.append(f"tracemalloc增长{(final.traced - baseline.traced) / 1024 / 1024:.1f}MB, 超过阈值")
+        if final.threads > baseline.threads + self.thread_slack:
+            failures.append(f"线程数从{baseline.threads}增长到{final.threads}")
+        if self.idle_threads and max(self.idle_threads) > self.idle_threads[0] + self.thread_slack:
+            failures.append(f"停止OCR后的线程数从{self.idle_threads[0]}增长到{max(self.idle_threads)}")
+        if final.fds is not None and baseline.fds is not None and final.fds > baseline.fds + self.fd_slack:
+            failures.append(f"文件描述符从{baseline.fds}增长到{final.fds}")
+        if final.frames == 0:
+            failures.append("没有识别任何帧")
+        return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OCR盒子浸泡测试")
+    parser.add_argument("--hours", type=float, default=4.0, help="运行时长(小时)")
+    parser.add_argument("--regions", type=int, default=2, help="区域数量")
+    parser.add_argument("--interval", type=float, default=0.5, help="识别间隔(秒)")
+    parser.add_argument("--cycle", type=float, default=300, help="启停周期(秒), 0表示不启停")
+    parser.add_argument("--sample-every", type=float, default=60, help="采样间隔(秒)")
+    parser.add_argument("--warmup", type=float, default=300, help="预热时长(秒)")
+    parser.add_argument("--rss-limit", type=float, default=50, help="RSS增长上限(MB)")
+    parser.add_argument("--traced-limit", type=float, default=20, help="tracemalloc增长上限(MB)")
+    parser.add_argument("--font", default=None, help="合成画面使用的字体路径")
+    args = parser.parse_args(argv)
+
+    test = SoakTest(
+        duration=args.hours * 3600,
+        regions=args.regions,
+        interval=args.interval,
+        cycle=args.cycle,
+        sample_every=args.sample_every,
+        warmup=args.warmup,
+        rss_limit_mb=args.rss_limit,
+        traced_limit_mb=args.traced_limit,
+        font_path=args.font,
+    )
+    failures = test.run()
+    if test.errors:
+        print(f"运行期间共有{len(test.errors)}条错误, 最后一条: {test.errors[-1]}")
+    if failures:
+        print("浸泡测试失败:")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("浸泡测试通过")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -46,6 +46,44 @@ class TesseractFinder:
         # 如果所有路径都不存在, 返回空
         return ""
     
+    @staticmethod
+    def find_tessdata_dir(tesseract_path):
+        """
+        查找Tesseract的语言数据目录(tessdata)
+        
+        Args:
+            tesseract_path: Tesseract可执行文件路径
+            
+        Returns:
+            str: 包含.traineddata文件的目录, 如果找不到则返回空字符串
+        """
+        possible_tessdata_dirs = []
+        
+        # 检查系统环境变量中的TESSDATA_PREFIX
+        if 'TESSDATA_PREFIX' in os.environ:
+            possible_tessdata_dirs.append(os.environ['TESSDATA_PREFIX'])
+        
+        # 从Tesseract路径推断出可能的tessdata目录位置
+        if tesseract_path:
+            tesseract_dir = os.path.dirname(tesseract_path)
+            possible_tessdata_dirs.extend([
+                os.path.join(tesseract_dir, 'tessdata'),  # 标准位置
+                os.path.join(tesseract_dir, '..', 'tessdata'),  # 上级目录
+                os.path.join(tesseract_dir, '..', 'share', 'tessdata'),  # Linux/macOS常见位置
+                os.path.join(tesseract_dir, '..', '..', 'share', 'tessdata'),  # 另一种常见位置
+                os.path.join(tesseract_dir, '..', 'share', 'tesseract-ocr', '5', 'tessdata'),  # Debian/Ubuntu
+                os.path.join(tesseract_dir, '..', 'share', 'tesseract-ocr', '4.00', 'tessdata'),
+            ])
+        
+        # 检查每个可能的tessdata目录
+        for tessdata_dir in possible_tessdata_dirs:
+            if os.path.isdir(tessdata_dir) and any(
+                file.endswith('.traineddata') for file in os.listdir(tessdata_dir)
+            ):
+                return os.path.normpath(tessdata_dir)
+        
+        return ""
+    
     @staticmethod
     def check_tesseract_languages(tesseract_path):
         """
@@ -86,29 +124,13 @@ class TesseractFinder:
         # 如果方法1失败, 尝试方法2: 直接检查Tesseract安装目录中的语言数据文件
         if not languages:
             try:
-                # 从Tesseract路径推断出可能的tessdata目录位置
-                tesseract_dir = os.path.dirname(tesseract_path)
-                possible_tessdata_dirs = [
-                    os.path.join(tesseract_dir, 'tessdata'),  # 标准位置
-                    os.path.join(tesseract_dir, '..', 'tessdata'),  # 上级目录
-                    os.path.join(tesseract_dir, '..', 'share', 'tessdata'),  # Linux/macOS常见位置
-                    os.path.join(tesseract_dir, '..', '..', 'share', 'tessdata'),  # 另一种常见位置
-                ]
-                
-                # 检查系统环境变量中的TESSDATA_PREFIX
-                if 'TESSDATA_PREFIX' in os.environ:
-                    possible_tessdata_dirs.insert(0, os.environ['TESSDATA_PREFIX'])
-                
-                # 检查每个可能的tessdata目录
-                for tessdata_dir in possible_tessdata_dirs:
-                    if os.path.isdir(tessdata_dir):
-                        # 查找所有.traineddata文件
-                        for file in os.listdir(tessdata_dir):
-                            if file.endswith('.traineddata'):
-                                lang = file.replace('.traineddata', '')
-                                languages.append(lang)
-                        if languages:
-                            break
+                tessdata_dir = TesseractFinder.find_tessdata_dir(tesseract_path)
+                if tessdata_dir:
+                    # 查找所有.traineddata文件
+                    for file in os.listdir(tessdata_dir):
+                        if file.endswith('.traineddata'):
+                            lang = file.replace('.traineddata', '')
+                            languages.append(lang)
             except Exception as e:
                 print(f"通过文件检查Tesseract语言包出错: {str(e)}")
         
@@ -0,0 +1,191 @@
+import os
+import sys
+import stat
+import threading
+import time
+import types
+
+import pytest
+
+from src.models.action_backend import (
+    ActionSequence,
+    Click,
+    PressKey,
+    PyAutoGUIBackend,
+    RecordingBackend,
+    TypeText,
+    WaitReady,
+    XdotoolBackend,
+)
+
+
+# 记录型后端上整个动作序列的延迟上限(秒), 只包括序列本身的开销
+SEQUENCE_LATENCY_LIMIT = 0.005
+
+
+def build_sequence():
+    return ActionSequence([Click(100, 200), WaitReady(1.0), TypeText("你好"), PressKey("enter")])
+
+
+def write_fake_xdotool(directory, focus_after):
+    """
+    生成模拟xdotool的脚本: 鼠标下的窗口为42, 第focus_after次查询焦点时窗口42才获得焦点,
+    每次调用的参数记录到calls文件中
+    """
+    calls = directory / "calls"
+    script = directory / "xdotool"
+    script.write_text(f"""#!{sys.executable}
+import sys
+calls = {str(calls)!r}
+with open(calls, "a") as f:
+    f.write(" ".join(sys.argv[1:]) + "\\n")
+command = sys.argv[1]
+if command == "getmouselocation":
+    print("X=100\\nY=200\\nSCREEN=0\\nWINDOW=42")
+elif command == "getwindowfocus":
+    count = sum(1 for line in open(calls) if line.startswith("getwindowfocus"))
+    print(42 if count >= {focus_after} else 7)
+elif command == "getactivewindow":
+    # 激活窗口是窗口管理器记录的另一层级的窗口, 与鼠标下的窗口永远不同
+    print(99)
+""")
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    return str(script), calls
+
+
+def test_sequence_latency():
+    backend = RecordingBackend()
+    build_sequence().run(backend)
+    backend.clear()
+
+    durations = []
+    for _ in range(20):
+        backend.clear()
+        timings = build_sequence().run(backend)
+        durations.append(backend.events[-1][0] - backend.events[0][0])
+        assert [name for name, _, _ in timings] == ["click", "wait_ready", "type_text", "press"]
+        assert all(ok for _, ok, _ in timings)
+    durations.sort()
+    assert durations[len(durations) // 2] < SEQUENCE_LATENCY_LIMIT
+    assert backend.actions() == [
+        ("click", (100, 200)),
+        ("wait_ready", (1.0,)),
+        ("type_text", ("你好",)),
+        ("press", ("enter",)),
+    ]
+
+
+def test_sequence_reports_wait_timeout():
+    timings = build_sequence().run(RecordingBackend(ready=False))
+    assert [ok for _, ok, _ in timings] == [True, False, True, True]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="模拟xdotool脚本需要POSIX环境")
+def test_xdotool_wait_ready_compares_focused_window(tmp_path):
+    path, calls = write_fake_xdotool(tmp_path, focus_after=3)
+    backend = XdotoolBackend(path, poll_interval=0.001)
+    assert backend.wait_ready(5.0)
+    commands = [line.split()[0] for line in calls.read_text().splitlines()]
+    assert commands == ["getmouselocation", "getwindowfocus", "getwindowfocus", "getwindowfocus"]
+
+
+@pytest.mark.skipif(os.name != "posix", reason="模拟xdotool脚本需要POSIX环境")
+def test_xdotool_wait_ready_timeout_backs_off(tmp_path):
+    path, calls = write_fake_xdotool(tmp_path, focus_after=10 ** 6)
+    backend = XdotoolBackend(path, poll_interval=0.005, max_poll_interval=0.05)
+    start = time.monotonic()
+    assert not backend.wait_ready(0.3)
+    assert time.monotonic() - start < 1.0
+    polls = sum(1 for line in calls.read_text().splitlines() if line.startswith("getwindowfocus"))
+    # 固定5ms轮询时0.3秒内会启动约60次xdotool
+    assert polls <= 15
+
+
+def fake_pyautogui(monkeypatch, active_after=None):
+    """
+    用模拟模块代替pyautogui, 记录输入操作
+
+    active_after为None时模拟无法查询窗口的平台, 否则第active_after次查询前台窗口时
+    点击位置的窗口才成为前台窗口
+    """
+    module = types.SimpleNamespace(events=[])
+    module.click = lambda x, y, _pause: module.events.append(("click", time.perf_counter()))
+    module.write = lambda text, _pause: module.events.append(("type_text", time.perf_counter()))
+    module.press = lambda key, _pause: module.events.append(("press", time.perf_counter()))
+    if active_after is not None:
+        queries = []
+        module.getWindowsAt = lambda x, y: ["target", "desktop"]
+        module.getActiveWindow = lambda: queries.append(1) or ("target" if len(queries) >= active_after else "other")
+    monkeypatch.setitem(sys.modules, "pyautogui", module)
+    return module
+
+
+def test_pyautogui_backend_waits_without_window_query(monkeypatch):
+    module = fake_pyautogui(monkeypatch)
+    backend = PyAutoGUIBackend(settle_delay=0.05)
+    timings = ActionSequence([Click(100, 200), WaitReady(1.0), TypeText("hello"), PressKey("enter")]).run(backend)
+    assert all(ok for _, ok, _ in timings)
+    events = dict(module.events)
+    # 点击后至少等待固定时间才开始输入
+    assert events["type_text"] - events["click"] >= 0.05
+
+
+def test_pyautogui_backend_settle_delay_bounded_by_timeout(monkeypatch):
+    fake_pyautogui(monkeypatch)
+    backend = PyAutoGUIBackend(settle_delay=5.0)
+    start = time.monotonic()
+    assert backend.wait_ready(0.05)
+    assert time.monotonic() - start < 1.0
+
+
+def test_pyautogui_backend_polls_foreground_window(monkeypatch):
+    module = fake_pyautogui(monkeypatch, active_after=3)
+    backend = PyAutoGUIBackend(settle_delay=5.0, poll_interval=0.01)
+    timings = ActionSequence([Click(100, 200), WaitReady(1.0), TypeText("hello")]).run(backend)
+    assert [ok for _, ok, _ in timings] == [True, True, True]
+    events = dict(module.events)
+    # 点击的窗口成为前台窗口后立即输入, 不等待固定时间
+    assert 0.02 <= events["type_text"] - events["click"] < 1.0
+
+
+def test_pyautogui_backend_wait_timeout(monkeypatch):
+    fake_pyautogui(monkeypatch, active_after=10 ** 6)
+    backend = PyAutoGUIBackend(poll_interval=0.01)
+    backend.click(100, 200)
+    assert not backend.wait_ready(0.05)
+
+
+def test_action_handler_runs_off_calling_thread():
+    try:
+        from src.models.action_handler import ActionHandler
+    except Exception as e:
+        # pyautogui在没有图形界面的环境中导入时就会失败
+        pytest.skip(f"无法导入pyautogui: {e}")
+    from src.models.ocr_signals import NullSignals
+
+    class BlockingBackend(RecordingBackend):
+        def __init__(self):
+            super().__init__()
+            self.release = threading.Event()
+            self.thread = None
+
+        def wait_ready(self, timeout):
+            self.thread = threading.current_thread()
+            self.release.wait(timeout)
+            return super().wait_ready(timeout)
+
+    backend = BlockingBackend()
+    handler = ActionHandler(NullSignals(), backend=backend)
+    handler.keyword = "测试"
+    try:
+        start = time.perf_counter()
+        handler.process_text("这是测试文本")
+        # 等待窗口就绪期间调用方(界面线程)不被阻塞
+        assert time.perf_counter() - start < 0.1
+        backend.release.set()
+        handler.executor.submit(lambda: None).result(timeout=5)
+        assert backend.thread is not threading.current_thread()
+        assert [action for action, _ in backend.actions()] == ["click", "wait_ready", "type_text", "press"]
+        assert [name for name, _, _ in handler.last_timings] == ["click", "wait_ready", "type_text", "press"]
+    finally:
+        handler.shutdown()
@@ -0,0 +1,92 @@
+import itertools
+
+import cv2
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.models.capture_source import SyntheticCaptureSource
+from src.models.ocr_processor import OCRProcessor
+from src.models.ocr_signals import NullSignals
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return OCRProcessor(NullSignals())
+
+
+@pytest.fixture(scope="module")
+def noise_frames():
+    return np.random.default_rng(1).integers(0, 256, (5, 33, 61, 3), dtype=np.uint8)
+
+
+@pytest.fixture(scope="module")
+def text_frames():
+    source = SyntheticCaptureSource(lines=2, seed=0)
+    return np.stack([np.asarray(source.grab((0, 0, 240, 80))) for _ in range(4)])
+
+
+def assert_identical(processor, frames, batches, config=None):
+    """批量结果与逐帧preprocess_image的结果逐位一致(模式、尺寸和像素)"""
+    outputs = [frame for batch in batches for frame in batch]
+    assert len(outputs) == len(frames)
+    for output, frame in zip(outputs, frames):
+        single = processor.preprocess_image(frame, config)
+        batch_image = Image.fromarray(output)
+        assert batch_image.mode == single.mode
+        assert batch_image.size == single.size
+        assert batch_image.tobytes() == single.tobytes()
+
+
+def preprocessing_config(processor, **options):
+    config = dict(processor.config)
+    config["image_preprocessing"] = {**config["image_preprocessing"], "enabled": True, "auto_scale": False, **options}
+    config["color_key"] = dict(config["color_key"], enabled=False)
+    return config
+
+
+@pytest.mark.parametrize("sharpen, threshold", list(itertools.product((False, True), repeat=2)))
+@pytest.mark.parametrize("contrast", [1.0, 1.5, 0.6, 2.3])
+@pytest.mark.parametrize("scale", [1.0, 2.0, 1.2, 0.5, 0.73])
+def test_batch_matches_single_frames(processor, noise_frames, text_frames, sharpen, threshold, contrast, scale):
+    config = preprocessing_config(processor, denoise=False, sharpen=sharpen, threshold=threshold,
+                                  contrast=contrast, scale_factor=scale)
+    for frames in (noise_frames, text_frames):
+        before = frames.copy()
+        # 生成器输入, 且批次大小不能整除帧数
+        batches = list(processor.iter_preprocess_batches(iter(frames), 3, config))
+        assert np.array_equal(before, frames)
+        assert_identical(processor, frames, batches, config)
+
+
+@pytest.mark.parametrize("sharpen, threshold", list(itertools.product((False, True), repeat=2)))
+@pytest.mark.parametrize("contrast, scale", [(1.0, 1.0), (1.5, 1.2), (0.6, 0.73)])
+def test_batch_matches_single_frames_with_denoise(processor, noise_frames, sharpen, threshold, contrast, scale):
+    # 降噪很慢, 只用小画面覆盖
+    config = preprocessing_config(processor, denoise=True, sharpen=sharpen, threshold=threshold,
+                                  contrast=contrast, scale_factor=scale)
+    batches = list(processor.iter_preprocess_batches(noise_frames, 2, config))
+    assert_identical(processor, noise_frames, batches, config)
+
+
+def test_batch_matches_single_frames_with_color_key(processor, text_frames):
+    config = preprocessing_config(processor, scale_factor=1.2)
+    config["color_key"] = dict(config["color_key"], enabled=True, keys=[(0, 0, 0, 179, 255, 120)], cleanup=1)
+    assert_identical(processor, text_frames, [processor.preprocess_batch(text_frames, config)], config)
+
+
+def test_auto_scale_groups_frames_by_scale(processor):
+    source = SyntheticCaptureSource(texts=["Hello World OCR box synthetic"], lines=3, seed=0)
+    small = np.asarray(source.grab((0, 0, 480, 120)))
+    # 把左上角放大两倍, 得到同样大小但文字高度不同的画面
+    large = cv2.resize(small[:60, :240], None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+    frames = np.stack([small, small, large, small])
+    config = preprocessing_config(processor, auto_scale=True, scale_factor=1.0, threshold=True)
+    scales = processor.get_batch_scales(frames, config)
+    assert scales[0] == scales[1] == scales[3] != scales[2]
+
+    with pytest.raises(ValueError):
+        processor.preprocess_batch(frames, config)
+    batches = list(processor.iter_preprocess_batches(frames, 4, config))
+    assert [len(batch) for batch in batches] == [2, 1, 1]
+    assert_identical(processor, frames, batches, config)
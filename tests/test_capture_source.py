@@ -0,0 +1,31 @@
+import numpy as np
+
+from src.models.capture_coordinator import CaptureCoordinator
+from src.models.capture_source import SyntheticCaptureSource
+
+
+def test_coalesced_grab_matches_individual_grabs():
+    bboxes = {"a": (0, 0, 240, 100), "b": (0, 110, 240, 210), "c": (250, 0, 400, 80)}
+    # 内容不变, 才能与随后逐个截取的画面比较
+    source = SyntheticCaptureSource(lines=2, change_every=1000, seed=0)
+    for bbox in bboxes.values():
+        source.add_region(bbox)
+
+    # 固定开销很大时所有区域合并为一次截图
+    coordinator = CaptureCoordinator(source, grab_overhead=10 ** 9)
+    frames = coordinator.capture(bboxes)
+    assert coordinator.get_stats()["grabs"] == 1
+
+    for key, bbox in bboxes.items():
+        expected = np.asarray(source.grab(bbox))
+        assert frames[key].shape == expected.shape
+        # 每个区域都截到了自己的文字, 而不是空白
+        assert (frames[key] < 128).any()
+        assert np.array_equal(frames[key], expected)
+
+
+def test_unregistered_bbox_is_its_own_block():
+    source = SyntheticCaptureSource(lines=1, change_every=1000, seed=0)
+    first = np.asarray(source.grab((500, 500, 700, 560)))
+    assert (first < 128).any()
+    assert np.array_equal(first, np.asarray(source.grab((500, 500, 700, 560))))
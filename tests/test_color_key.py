@@ -0,0 +1,32 @@
+import cv2
+import numpy as np
+
+from src.models.color_key import build_text_mask, key_from_color
+
+
+def hue_strip():
+    """全部180个色相的高饱和度、高亮度像素, BGR格式"""
+    hsv = np.stack([np.arange(180), np.full(180, 255), np.full(180, 255)], axis=-1).astype(np.uint8)
+    return cv2.cvtColor(hsv[None], cv2.COLOR_HSV2BGR)
+
+
+def test_red_key_wraps_around_zero():
+    key = key_from_color((255, 0, 0), hue_tolerance=10)
+    assert key[0] > key[3]
+    mask = build_text_mask(hue_strip(), [key])[0]
+    assert mask[0] and mask[175] and mask[5]
+    assert not mask[60]
+
+
+def test_max_hue_tolerance_matches_all_hues():
+    for rgb in ((255, 0, 0), (0, 255, 0), (0, 0, 255)):
+        key = key_from_color(rgb, hue_tolerance=90)
+        assert (key[0], key[3]) == (0, 179)
+        assert build_text_mask(hue_strip(), [key]).all()
+
+
+def test_large_hue_tolerance_excludes_only_the_opposite_hue():
+    key = key_from_color((255, 0, 0), hue_tolerance=89)
+    mask = build_text_mask(hue_strip(), [key])[0]
+    assert not mask[90]
+    assert np.count_nonzero(mask) == 179
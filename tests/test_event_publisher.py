@@ -0,0 +1,57 @@
+import socket
+import time
+
+import pytest
+
+from src.models.event_publisher import EVENT_DELTA, EVENT_SNAPSHOT, EventPublisher, EventSubscriber
+from src.models.text_delta import TextDelta, TextDiffer
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="需要Unix域套接字")
+
+
+@pytest.fixture
+def publisher(tmp_path):
+    publisher = EventPublisher(str(tmp_path / "events.sock"))
+    publisher.start()
+    yield publisher
+    publisher.stop()
+
+
+def subscribe(publisher):
+    subscriber = EventSubscriber(publisher.path, timeout=5)
+    # 订阅连接由发布端的线程接受, 等它登记后再发布
+    while publisher.get_stats()["subscribers"] == 0:
+        time.sleep(0.01)
+    return subscriber
+
+
+def receive_region(subscriber, region_id):
+    while True:
+        event = subscriber.receive()
+        if event.region_id == region_id:
+            return event
+
+
+def test_subscriber_applies_deltas(publisher):
+    differ = TextDiffer()
+    publisher.publish_delta("r", 1, differ.diff("a\nb\nc", "r"))
+    with subscribe(publisher) as subscriber:
+        assert receive_region(subscriber, "r").text == "a\nb\nc"
+        publisher.publish_delta("r", 2, differ.diff("a\nB\nc\nd", "r"))
+        event = receive_region(subscriber, "r")
+        assert event.kind == EVENT_DELTA
+        assert event.text == "a\nB\nc\nd"
+
+
+def test_large_delta_is_sent_as_snapshot(publisher):
+    lines = [f"line {i}" for i in range(140000)]
+    # 每隔一行修改一次, 变化数超过uint16的范围
+    changes = [("replace", i, i + 1, [lines[i] + " x"]) for i in range(1, len(lines), 2)]
+    edited = TextDelta("r", changes, len(lines), None).apply(lines)
+    delta = TextDelta("r", changes, len(lines), "\n".join(edited))
+    assert len(delta.changes) > 0xFFFF
+    with subscribe(publisher) as subscriber:
+        publisher.publish_delta("r", 1, delta)
+        event = receive_region(subscriber, "r")
+        assert event.kind == EVENT_SNAPSHOT
+        assert event.text == delta.text
@@ -0,0 +1,31 @@
+import os
+
+from src.models.keyword_constraint import KeywordConstraint
+
+
+def constraint_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(".txt"))
+
+
+def test_unused_files_are_removed(tmp_path):
+    constraint = KeywordConstraint(str(tmp_path))
+    # 逐字输入关键字, 每次都生成新的约束
+    for typed in ("E", "Er", "Err", "Error 404"):
+        assert constraint.update([typed])
+        assert len(constraint_files(tmp_path)) == 2
+    assert os.path.exists(constraint.variables["user_words_file"])
+    assert os.path.exists(constraint.variables["user_patterns_file"])
+    with open(constraint.variables["user_words_file"], encoding="utf-8") as f:
+        assert f.read().split() == ["404", "Error"]
+
+    assert constraint.update([])
+    assert not constraint.active
+    assert constraint_files(tmp_path) == []
+
+
+def test_unchanged_keywords_keep_files(tmp_path):
+    constraint = KeywordConstraint(str(tmp_path))
+    constraint.update(["警告"])
+    files = constraint_files(tmp_path)
+    assert not constraint.update([" 警告 "])
+    assert constraint_files(tmp_path) == files
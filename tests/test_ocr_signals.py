@@ -0,0 +1,54 @@
+import sys
+
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from src.models.ocr_signals import CoalescingSignals, OCRSignals
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication(sys.argv)
+
+
+def test_text_detected_keeps_latest_per_region(app):
+    target = OCRSignals()
+    received = []
+    target.text_detected.connect(lambda region_id, text: received.append((region_id, text)))
+    signals = CoalescingSignals(target)
+
+    signals.text_detected.emit("a", "第一帧")
+    signals.text_detected.emit("b", "另一个区域")
+    signals.text_detected.emit("a", "第二帧")
+    signals.flush()
+
+    assert sorted(received) == [("a", "第二帧"), ("b", "另一个区域")]
+    assert signals.get_stats()["coalesced"] == 1
+
+
+def test_reset_region_diffs_reused_region_from_scratch(app):
+    from src.models.text_delta import TextDiffer
+
+    target = OCRSignals()
+    received = []
+    target.text_delta.connect(received.append)
+    signals = CoalescingSignals(target)
+    producer = TextDiffer()
+
+    signals.text_delta.emit(producer.diff("旧区域\n第二行", "r"))
+    signals.flush()
+    signals.text_delta.emit(producer.diff("旧区域\n第三行", "r"))
+    signals.reset_region("r")
+    signals.flush()
+    # 删除前暂存的差异被丢弃
+    assert len(received) == 1
+
+    # 重新使用同一个区域标识的新区域
+    producer.reset("r")
+    signals.text_delta.emit(producer.diff("新区域", "r"))
+    signals.flush()
+    delta = received[-1]
+    # 相对空白的显示框计算, 而不是旧区域的文本
+    assert delta.old_line_count == 1
+    assert delta.apply([""]) == ["新区域"]
@@ -0,0 +1,113 @@
+import numpy as np
+
+from src.models.ocr_result import OCRResult, WORD_DTYPE
+from src.models.scroll_tracker import ScrollTracker
+
+
+WIDTH = 64
+HEIGHT = 400
+# 每行文字占12行像素, 行间距20
+LINE_PITCH = 20
+LINE_HEIGHT = 12
+LINE_OFFSET = 4
+
+
+def line_band(index):
+    """第index行文字的像素, 不同行的内容各不相同"""
+    rng = np.random.default_rng(index)
+    return rng.integers(0, 256, size=(LINE_HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+
+def render(first_line, offset=0):
+    """从第first_line行开始绘制一屏文字, offset为整体向上移动的行数"""
+    frame = np.full((HEIGHT, WIDTH, 3), 255, dtype=np.uint8)
+    index = first_line
+    while True:
+        top = (index - first_line) * LINE_PITCH + LINE_OFFSET - offset
+        if top >= HEIGHT:
+            return frame
+        if top >= 0 and top + LINE_HEIGHT <= HEIGHT:
+            frame[top:top + LINE_HEIGHT] = line_band(index)
+        index += 1
+
+
+def line_result(lines, shift=0):
+    """每行一个单词的识别结果, lines为(行号, 在画面中的行位置)列表"""
+    words = np.zeros(len(lines), dtype=WORD_DTYPE)
+    for i, (_, position) in enumerate(lines):
+        words[i] = (0, position * LINE_PITCH + LINE_OFFSET - shift, WIDTH, LINE_HEIGHT, 90.0, i)
+    return OCRResult(words, [f"line{index}" for index, _ in lines])
+
+
+def full_result(first_line):
+    return line_result([(first_line + i, i) for i in range(HEIGHT // LINE_PITCH)])
+
+
+def edit(frame, row):
+    """修改画面中的一行像素, 模拟原地更新的数字或被编辑的文字"""
+    frame = frame.copy()
+    frame[row] = 255 - frame[row]
+    return frame
+
+
+def prepare(frame, result):
+    tracker = ScrollTracker()
+    assert tracker.plan("r", frame)[0] == "full"
+    tracker.store("r", result, "full", HEIGHT, HEIGHT)
+    return tracker
+
+
+def test_identical_frame_is_unchanged():
+    frame = render(0)
+    tracker = prepare(frame, full_result(0))
+    mode, cached = tracker.plan("r", frame.copy())
+    assert mode == "unchanged"
+    assert cached.texts == full_result(0).texts
+
+
+def test_in_place_change_is_recognized_again():
+    frame = render(0)
+    tracker = prepare(frame, full_result(0))
+    # 第7行只有一行像素变化, 绝大部分行仍然一致, 也不能沿用上一帧结果
+    edited_top = 7 * LINE_PITCH + LINE_OFFSET
+    mode, plan = tracker.plan("r", edit(frame, edited_top + 5))
+    assert mode == "scroll"
+    assert plan.shift == 0
+    assert plan.strip_top <= edited_top
+    assert plan.strip_bottom >= edited_top + LINE_HEIGHT
+    assert plan.above.texts == tuple(f"line{i}" for i in range(7))
+    assert plan.below.texts == tuple(f"line{i}" for i in range(8, 20))
+
+    stitched = plan.stitch(line_result([(7, 7)]))
+    assert stitched.texts == full_result(0).texts
+    assert (np.diff(stitched.words["top"]) > 0).all()
+
+
+def test_scroll_with_edited_line_recognizes_edited_rows():
+    previous = render(0)
+    tracker = prepare(previous, full_result(0))
+    # 向上滚动两行, 同时原来的第10行被编辑
+    shift = 2 * LINE_PITCH
+    edited_top = 10 * LINE_PITCH + LINE_OFFSET - shift
+    mode, plan = tracker.plan("r", edit(render(0, shift), edited_top + 3))
+    assert mode == "scroll"
+    assert plan.shift == shift
+    # 被编辑的行及其之后的内容都在条带中重新识别, 不沿用旧结果
+    assert plan.strip_top <= edited_top
+    assert plan.strip_bottom == HEIGHT
+    assert plan.above.texts == tuple(f"line{i}" for i in range(2, 10))
+    assert not plan.below.texts
+    expected_tops = [(i - 2) * LINE_PITCH + LINE_OFFSET for i in range(2, 10)]
+    assert plan.above.words["top"].tolist() == expected_tops
+
+
+def test_plain_scroll_keeps_overlap():
+    previous = render(0)
+    tracker = prepare(previous, full_result(0))
+    shift = 3 * LINE_PITCH
+    mode, plan = tracker.plan("r", render(0, shift))
+    assert mode == "scroll"
+    assert plan.shift == shift
+    assert plan.above.texts == tuple(f"line{i}" for i in range(3, 20))
+    assert plan.strip_top >= HEIGHT - shift - LINE_PITCH
+    assert plan.strip_bottom == HEIGHT